@@ -23,7 +23,14 @@ class BaseController(Controller):
             (
                 ["-v", "--version"],
                 {"action": "version", "version": get_version_message()},
-            )
+            ),
+            (
+                ["--no-cache"],
+                {
+                    "help": "always fetch data from the RPC, without using the caches of RPC responses",
+                    "action": "store_true",
+                },
+            ),
         ]
 
     @ex(help="Show the app version")
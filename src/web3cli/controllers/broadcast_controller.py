@@ -0,0 +1,105 @@
+import json
+import sys
+
+from cement import ex
+
+from web3cli.exceptions import Web3CliError
+from web3cli.framework.controller import Controller
+from web3cli.helpers import args
+from web3cli.helpers.args import parse_block_number
+from web3cli.helpers.client_factory import make_client
+from web3cli.helpers.tx import get_broadcast_urls
+from web3core.helpers.batch import (
+    broadcast_batch,
+    read_signed_txs,
+    summarize_batch,
+    track_receipts,
+    wait_for_block,
+)
+from web3core.helpers.broadcast import broadcast_raw_tx, raise_if_not_accepted
+
+
+class BroadcastController(Controller):
+    """Handler of the `w3 broadcast` command"""
+
+    class Meta:
+        label = "broadcast"
+        help = "send pre-signed transactions"
+        stacked_type = "embedded"
+        stacked_on = "base"
+
+    @ex(
+        help="Send the pre-signed transactions in the given JSONL file, as written by the --sign-to option, in nonce order and as fast as possible.  The outcome of each transaction is printed as a JSON line.",
+        arguments=[
+            (
+                ["file"],
+                {"help": "file with the signed transactions; use - to read from stdin"},
+            ),
+            args.block(
+                "--at-block",
+                help="wait until this block is mined, then send the transactions; use +N to count from the current block, e.g. +1 for the next block",
+                default=None,
+            ),
+            (
+                ["--wait"],
+                {
+                    "help": "wait for the transactions to be mined, and print their status",
+                    "action": "store_true",
+                },
+            ),
+            args.batch_concurrency(),
+            args.batch_timeout(),
+            args.tx_broadcast(
+                "--rpcs",
+                dest="broadcast",
+                help="send the transactions to all the HTTP RPCs of the chain at the same time, or to the N fastest ones with --rpcs N",
+            ),
+            *args.chain_and_rpc(),
+        ],
+    )
+    def broadcast(self) -> None:
+        try:
+            txs = read_signed_txs(self.app.pargs.file)
+        except (OSError, ValueError) as e:
+            raise Web3CliError(f"Could not read signed transactions: {e}")
+        if not txs:
+            raise Web3CliError(f"No transactions in {self.app.pargs.file}")
+        for tx in txs:
+            if tx["chain_id"] not in (None, self.app.chain.chain_id):
+                raise Web3CliError(
+                    f"Tx {tx['hash']} was signed for chain ID {tx['chain_id']}, not for {self.app.chain.name}"
+                )
+        # Prepare everything before the target block
+        w3 = make_client(self.app, head_cache=None).w3
+        send = None
+        urls = get_broadcast_urls(self.app)
+        if urls:
+            send = lambda raw: raise_if_not_accepted(broadcast_raw_tx(raw, urls))
+        if self.app.pargs.at_block is not None:
+            at_block = str(self.app.pargs.at_block)
+            if at_block.startswith("+"):
+                if not at_block[1:].isdigit():
+                    raise Web3CliError(
+                        f"Block offset must be +N with N a non-negative integer, got {at_block}"
+                    )
+                block = w3.eth.block_number + int(at_block[1:])
+            else:
+                block = parse_block_number(self.app, w3, "at_block")
+            self.app.log.info(f"Waiting for block {block}...")
+            wait_for_block(w3, block)
+        # Send, without retrying: retries would land after the target block
+        for tx in broadcast_batch(
+            w3, txs, self.app.pargs.concurrency, retries=0, send=send
+        ):
+            if tx["status"] == "failed":
+                self.app.log.warning(
+                    f"Could not send tx with nonce {tx['nonce']}: {tx['error']}"
+                )
+        if self.app.pargs.wait:
+            sent = [tx for tx in txs if tx["status"] == "sent"]
+            list(track_receipts(w3, sent, self.app.pargs.timeout))
+        for tx in txs:
+            record = {k: tx[k] for k in ["hash", "nonce", "status", "gas_used", "error"]}  # type: ignore
+            sys.stdout.write(json.dumps(record) + "\n")
+        if len(txs) > 1:
+            self.app.log.info(f"Summary: {summarize_batch(txs)}")
@@ -1,8 +1,10 @@
 import decimal
 from time import sleep
-from typing import Tuple
+from typing import Any, Callable, Iterator, Optional, Tuple
 
 from cement import ex
+from eth_typing import HexStr
+from web3 import Web3
 from web3client.base_client import BaseClient
 from web3client.erc20_client import Erc20Client
 
@@ -17,9 +19,23 @@ from web3cli.helpers.client_factory import (
 )
 from web3cli.helpers.render import render
 from web3cli.helpers.token import approve
-from web3cli.helpers.tx import send_contract_tx
+from web3cli.helpers.tx import (
+    get_broadcast_urls,
+    get_nonce_manager,
+    get_sign_to_nonces,
+    send_contract_tx,
+)
+from web3core.helpers.batch import (
+    SignedTxRecord,
+    broadcast_batch,
+    wait_for_block,
+    write_signed_txs,
+)
+from web3core.helpers.broadcast import broadcast_raw_tx, raise_if_not_accepted
 from web3core.helpers.misc import yes_or_exit
+from web3core.helpers.nonce import NonceManager
 from web3core.helpers.resolve import resolve_address
+from web3core.helpers.tx import sign_contract_txs
 
 
 class CompoundV2Controller(Controller):
@@ -321,11 +337,26 @@ class CompoundV2Controller(Controller):
             (
                 ["--interval"],
                 {
-                    "help": "Interval between redeem attempts, in seconds",
+                    "help": "Interval between redeem attempts, in seconds; by default, all attempts are sent at the same time",
                     "type": float,
                     "default": 0.0,
                 },
             ),
+            (
+                ["--fee-bump"],
+                {
+                    "help": "Multiply the gas fees of each redeem attempt by this factor with respect to the previous one",
+                    "type": float,
+                    "default": 1.0,
+                },
+            ),
+            (
+                ["--on-block"],
+                {
+                    "help": "Send the redeem attempts as soon as the block after the repay is mined, instead of right after the repay",
+                    "action": "store_true",
+                },
+            ),
             *args.tx_args(),
             *args.chain_and_rpc(),
             *args.signer_and_gas(),
@@ -373,38 +404,90 @@ class CompoundV2Controller(Controller):
                 f" 2. attempt to redeem the same amount as quick as possible, for {self.app.pargs.n} times"
             )
             yes_or_exit(logger=self.app.log.info)
-        # Get nonce
-        nonce = signer.get_nonce()
-        # Force no call simulation
-        self.app.pargs.call = False
+        # Pre-sign repay and redeems with a fixed gas limit and consecutive
+        # nonces, so that nothing is left to do between the repay and the
+        # redeems but sending them
+        dry_run, _, _, gas_limit = args.parse_tx_args(self.app)
+        if not gas_limit:
+            raise DefiError(
+                "Specify a gas limit with --gas-limit, to sign the transactions in advance"
+            )
+        n = self.app.pargs.n
+        nonce_manager: Optional[NonceManager] = None
+        if self.app.get_option("nonce_manager") and not dry_run:
+            nonce_manager = get_nonce_manager(self.app, signer)
+        if self.app.pargs.sign_to and not dry_run:
+            nonces = get_sign_to_nonces(
+                self.app, signer, self.app.pargs.sign_to, n + 1, nonce_manager
+            )
+        elif nonce_manager:
+            nonces = nonce_manager.reserve_many(n + 1)
+        else:
+            first = signer.w3.eth.get_transaction_count(
+                Web3.to_checksum_address(signer.user_address), "pending"
+            )
+            nonces = list(range(first, first + n + 1))
+        try:
+            txs = sign_contract_txs(
+                signer,
+                [signer.functions["repayBorrow"](amount_in_wei)]
+                + [signer.functions["redeemUnderlying"](amount_in_wei)] * n,
+                nonces,
+                gas_limit,
+                self.app.priority_fee,
+                self.app.pargs.fee_bump,
+            )
+        except Exception as e:
+            if nonce_manager:
+                for nonce in reversed(nonces):
+                    nonce_manager.fail(nonce, e)
+            raise
+        if dry_run:
+            render(self.app, [{"nonce": t["nonce"], "hash": t["hash"]} for t in txs])
+            return
+        if self.app.pargs.sign_to:
+            write_signed_txs(self.app.pargs.sign_to, txs)
+            self.app.log.info(f"Signed txs appended to {self.app.pargs.sign_to}")
+            return
+        repay_tx, redeem_txs = txs[0], txs[1:]
+        w3 = signer.w3
+        send: Callable[[HexStr], Any] = w3.eth.send_raw_transaction
+        urls = get_broadcast_urls(self.app)
+        if urls:
+            send = lambda raw: raise_if_not_accepted(broadcast_raw_tx(raw, urls))
         # Repay
-        repay_tx = send_contract_tx(
-            self.app,
-            signer,
-            signer.functions["repayBorrow"](amount_in_wei),
-            nonce=nonce,
-        )
-        nonce += 1
-        self.app.log.info(f"Repaid: {repay_tx}")
+        try:
+            send(repay_tx["raw"])
+        except Exception as e:
+            if nonce_manager:
+                for nonce in reversed(nonces):
+                    nonce_manager.fail(nonce, e)
+            raise
+        self.app.log.info(f"Repaid: {repay_tx['hash']}")
         # Spam-redeem
-        for i in range(1, self.app.pargs.n + 1):
-            try:
-                redeem_tx = send_contract_tx(
-                    self.app,
-                    signer,
-                    signer.functions["redeemUnderlying"](amount_in_wei),
-                    nonce=nonce,
-                )
-            except Exception as e:
-                self.app.log.warning(f"Attempt {i}: Error in spamming: {e}")
-                if self.app.pargs.interval > 0:
+        if self.app.pargs.on_block:
+            wait_for_block(w3, w3.eth.block_number + 1, poll_interval=0.05)
+
+        def iter_redeems() -> Iterator[SignedTxRecord]:
+            if self.app.pargs.interval <= 0:
+                yield from broadcast_batch(w3, redeem_txs, n, retries=0, send=send)
+                return
+            for i, redeem_tx in enumerate(redeem_txs):
+                if i > 0:
                     sleep(self.app.pargs.interval)
-                continue
+                yield from broadcast_batch(w3, [redeem_tx], retries=0, send=send)
 
-            nonce += 1
-            self.app.log.info(f"Attempt {i}: tx sent: {redeem_tx}")
-            if self.app.pargs.interval > 0:
-                sleep(self.app.pargs.interval)
+        for i, redeem_tx in enumerate(iter_redeems(), 1):
+            if redeem_tx["status"] == "failed":
+                self.app.log.warning(
+                    f"Attempt {i}: Error in spamming: {redeem_tx['error']}"
+                )
+                if nonce_manager:
+                    nonce_manager.fail(
+                        redeem_tx["nonce"], Exception(redeem_tx["error"])
+                    )
+            else:
+                self.app.log.info(f"Attempt {i}: tx sent: {redeem_tx['hash']}")
 
     def get_underlying(self, pool: BaseClient) -> Tuple[BaseClient, str, int]:
         """Return underlying token client, symbol and decimals.  For ETH pools,
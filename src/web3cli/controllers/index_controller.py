@@ -0,0 +1,176 @@
+import json
+import sys
+from typing import Any, Union, cast
+
+from cement import ex
+from playhouse.shortcuts import model_to_dict
+from web3.types import BlockIdentifier
+
+from web3cli.exceptions import Web3CliError
+from web3cli.framework.controller import Controller
+from web3cli.helpers import args
+from web3cli.helpers.args import parse_block
+from web3cli.helpers.client_factory import make_client
+from web3cli.helpers.render import render_table
+from web3core.helpers.events import LogDecoder
+from web3core.helpers.index import add_contracts, query_index, sync_index
+from web3core.helpers.resolve import resolve_address
+from web3core.models.log import IndexedContract
+
+
+class IndexController(Controller):
+    """Handler of the `w3 index` commands"""
+
+    class Meta:
+        label = "index"
+        help = "sync the events of some contracts to a local table, and query them without using the RPC"
+        stacked_type = "nested"
+        stacked_on = "base"
+
+    @ex(
+        help="Start indexing the events of the given contracts",
+        arguments=[
+            (["contracts"], {"help": "Contract names or addresses", "nargs": "+"}),
+            args.block(
+                "--from-block",
+                "--from",
+                help="Index events starting from this block",
+                required=True,
+                default=None,
+            ),
+            *args.chain_and_rpc(),
+        ],
+    )
+    def add(self) -> None:
+        block = cast(BlockIdentifier, parse_block(self.app, "from_block"))
+        from_block = (
+            block
+            if isinstance(block, int)
+            else make_client(self.app).w3.eth.get_block(block)["number"]
+        )
+        addresses = [
+            resolve_address(c, chain=self.app.chain.name)
+            for c in self.app.pargs.contracts
+        ]
+        added = add_contracts(self.app.chain.name, addresses, from_block)
+        self.app.log.info(
+            f"Added {added} contracts to the index; run `w3 index sync` to fetch their events"
+        )
+
+    @ex(help="List the indexed contracts", arguments=[args.chain()])
+    def list(self) -> None:
+        render_table(
+            self.app,
+            data=[
+                [c.address, c.from_block, c.last_block]
+                for c in IndexedContract.get_by_chain(self.app.chain.name)
+            ],
+            headers=["ADDRESS", "FROM BLOCK", "SYNCED UP TO BLOCK"],
+            wrap=42,
+        )
+
+    @ex(
+        help="Fetch the events of the indexed contracts, from the last synced block up to the latest block.  The last synced blocks are always fetched again, to roll back events from reorged blocks.",
+        arguments=[
+            (
+                ["--contracts"],
+                {
+                    "help": "Sync only these contracts, instead of all indexed contracts",
+                    "nargs": "+",
+                    "default": [],
+                },
+            ),
+            (
+                ["--reorg-depth"],
+                {
+                    "help": "Number of recent blocks to fetch again at each sync",
+                    "type": int,
+                    "default": 12,
+                },
+            ),
+            (
+                ["--chunk-size"],
+                {
+                    "help": "Number of blocks fetched with each request, at most",
+                    "type": int,
+                    "default": 2000,
+                },
+            ),
+            (
+                ["--concurrency"],
+                {
+                    "help": "Number of requests made at the same time",
+                    "type": int,
+                    "default": 4,
+                },
+            ),
+            *args.chain_and_rpc(),
+        ],
+    )
+    def sync(self) -> None:
+        addresses = [
+            resolve_address(c, chain=self.app.chain.name)
+            for c in self.app.pargs.contracts
+        ]
+        if not IndexedContract.get_by_chain(self.app.chain.name, addresses):
+            raise Web3CliError(
+                "No contracts to sync, add some with `w3 index add <contracts> --from-block <block>`"
+            )
+        n_logs = sync_index(
+            make_client(self.app).w3,
+            self.app.chain.name,
+            addresses,
+            reorg_depth=self.app.pargs.reorg_depth,
+            chunk_size=self.app.pargs.chunk_size,
+            concurrency=self.app.pargs.concurrency,
+            decoder=LogDecoder(self.app.chain.name),
+            on_chunk=lambda start, end, n: self.app.log.info(
+                f"Synced {n} events in blocks {start}-{end}"
+            ),
+        )
+        self.app.log.info(f"Synced {n_logs} events")
+
+    @ex(
+        help="Query the indexed events, and print them as JSON lines ordered by block",
+        arguments=[
+            (["--event"], {"help": "Name of the event, e.g. Transfer"}),
+            (
+                ["--address", "--contracts"],
+                {
+                    "help": "Consider only events emitted by these contracts",
+                    "nargs": "+",
+                    "default": [],
+                },
+            ),
+            (["--topic0"], {"help": "Consider only events with this topic0"}),
+            args.block("--from-block", "--from", default=None),
+            args.block("--to-block", "--to", default=None),
+            (["--limit"], {"help": "Maximum number of events", "type": int}),
+            args.chain(),
+        ],
+    )
+    def query(self) -> None:
+        logs = query_index(
+            self.app.chain.name,
+            addresses=[
+                resolve_address(a, chain=self.app.chain.name)
+                for a in self.app.pargs.address
+            ],
+            event=self.app.pargs.event,
+            topic0=self.app.pargs.topic0,
+            from_block=self.parse_block_number("from_block"),
+            to_block=self.parse_block_number("to_block"),
+            limit=self.app.pargs.limit,
+        )
+        for log in logs:
+            sys.stdout.write(json.dumps(model_to_dict(log)) + "\n")
+
+    def parse_block_number(self, label: str) -> Union[int, None]:
+        """Return the block number passed in the given argument, if any;
+        the index can be queried only by block number"""
+        if getattr(self.app.pargs, label) is None:
+            return None
+        block: Any = parse_block(self.app, label)
+        if not isinstance(block, int):
+            raise Web3CliError(f"Block '{block}' must be a number")
+        return block
@@ -0,0 +1,140 @@
+import json
+import sys
+from typing import Any, Dict
+
+from cement import ex
+from web3._utils.encoding import Web3JsonEncoder
+
+from web3cli.framework.controller import Controller
+from web3cli.helpers import args
+from web3cli.helpers.args import parse_block_number
+from web3cli.helpers.client_factory import make_client
+from web3core.helpers.events import LogDecoder
+from web3core.helpers.jsonl import JsonlWriter
+from web3core.helpers.logs import LogFetcher, read_checkpoint, write_checkpoint
+from web3core.helpers.resolve import resolve_address
+
+
+class LogsController(Controller):
+    """Handler of the `w3 logs` command"""
+
+    class Meta:
+        label = "logs"
+        help = "fetch past events"
+        stacked_type = "embedded"
+        stacked_on = "base"
+
+    @ex(
+        help="Fetch the events emitted in the given block range, as JSON lines ordered by block.  The range is split in chunks that are fetched concurrently; chunks are halved automatically when the RPC complains about too many results, or times out.",
+        arguments=[
+            (
+                ["--contracts"],
+                {
+                    "help": "Consider only events emitted by these smart contracts",
+                    "nargs": "+",
+                    "default": [],
+                },
+            ),
+            (
+                ["--topics"],
+                {
+                    "help": "Consider only events with these topics",
+                    "nargs": "+",
+                    "default": [],
+                },
+            ),
+            args.block(
+                "--from-block",
+                "--from",
+                help="First block of the range; can be a number or a block identifier such as 'latest'",
+                required=True,
+                default=None,
+            ),
+            args.block(
+                "--to-block",
+                "--to",
+                help="Last block of the range, included; defaults to 'latest'",
+            ),
+            (
+                ["--chunk-size"],
+                {
+                    "help": "Number of blocks fetched with each request, at most",
+                    "type": int,
+                    "default": 2000,
+                },
+            ),
+            (
+                ["--concurrency"],
+                {
+                    "help": "Number of requests made at the same time",
+                    "type": int,
+                    "default": 4,
+                },
+            ),
+            (
+                ["-o", "--output"],
+                {"help": "Append the events to this file instead of printing them"},
+            ),
+            (
+                ["--checkpoint"],
+                {
+                    "help": "Save the progress in this file, and resume from it when the command is run again with the same arguments.  Best used with --output.",
+                },
+            ),
+            args.subscribe_decode(),
+            *args.chain_and_rpc(),
+        ],
+    )
+    def logs(self) -> None:
+        client = make_client(self.app)
+        from_block = parse_block_number(self.app, client.w3, "from_block")
+        to_block = parse_block_number(self.app, client.w3, "to_block")
+        addresses = [
+            resolve_address(a, chain=self.app.chain.name)
+            for a in self.app.pargs.contracts
+        ]
+        fetcher = LogFetcher(
+            client.w3,
+            addresses,
+            self.app.pargs.topics,
+            self.app.pargs.chunk_size,
+            self.app.pargs.concurrency,
+        )
+        # Resume from the checkpoint
+        checkpoint = self.app.pargs.checkpoint
+        query: Dict[str, Any] = {
+            "chain": self.app.chain.name,
+            "addresses": addresses,
+            "topics": self.app.pargs.topics,
+            "from_block": from_block,
+        }
+        if checkpoint:
+            next_block = read_checkpoint(checkpoint, query)
+            if next_block is not None:
+                self.app.log.info(f"Resuming from block {next_block}")
+                from_block = next_block
+        # Fetch and write the logs
+        writer = JsonlWriter(self.app.pargs.output) if self.app.pargs.output else None
+        decoder = LogDecoder(self.app.chain.name) if self.app.pargs.decode else None
+        n_logs = 0
+        for start, end, logs in fetcher.iter_chunks(from_block, to_block):
+            for log in logs:
+                record = dict(log)
+                decoded = decoder.decode(log) if decoder else None
+                if decoded:
+                    record["decoded"] = decoded
+                if writer:
+                    writer.write(record)
+                else:
+                    sys.stdout.write(json.dumps(record, cls=Web3JsonEncoder) + "\n")
+            n_logs += len(logs)
+            self.app.log.debug(f"Fetched {len(logs)} events in blocks {start}-{end}")
+            if checkpoint:
+                if writer:
+                    writer.sync()
+                else:
+                    sys.stdout.flush()
+                write_checkpoint(checkpoint, query, end + 1)
+        if writer:
+            writer.close()
+        self.app.log.info(f"Fetched {n_logs} events up to block {to_block}")
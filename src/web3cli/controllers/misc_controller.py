@@ -9,9 +9,14 @@ from web3cli.exceptions import Web3CliError
 from web3cli.framework.controller import Controller
 from web3cli.helpers import args
 from web3cli.helpers.args import parse_block
+from web3cli.helpers.balance import render_balance_series
 from web3cli.helpers.client_factory import make_client
 from web3cli.helpers.render import render
+from web3core.helpers.balances import make_coin_balance_getter
+from web3core.helpers.blocks import find_block_at
 from web3core.helpers.client_factory import make_base_client
+from web3core.helpers.fees import DEFAULT_PERCENTILES, get_fee_stats
+from web3core.helpers.misc import to_timestamp
 from web3core.helpers.resolve import resolve_address
 
 
@@ -25,9 +30,9 @@ class MiscController(Controller):
         stacked_on = "base"
 
     @ex(
-        help="Get the balance of the given address in the blockchain coin (ETH, BNB, AVAX, etc)",
+        help="Get the balance of the given address in the blockchain coin (ETH, BNB, AVAX, etc).  With many addresses, or with --from-block, print the balances as CSV.",
         arguments=[
-            (["address"], {"action": "store"}),
+            (["address"], {"help": "one or more addresses", "nargs": "+"}),
             args.block(),
             (
                 ["-u", "--unit"],
@@ -36,17 +41,32 @@ class MiscController(Controller):
                     "default": "ether",
                 },
             ),
+            *args.series_args(),
             *args.chain_and_rpc(),
         ],
     )
     def balance(self) -> None:
-        address = resolve_address(self.app.pargs.address, chain=self.app.chain.name)
-        balance = make_client(self.app).w3.eth.get_balance(
-            Web3.to_checksum_address(address),
+        addresses = [
+            resolve_address(a, chain=self.app.chain.name)
+            for a in self.app.pargs.address
+        ]
+        w3 = make_client(self.app).w3
+        unit = self.app.pargs.unit
+        if len(addresses) > 1 or self.app.pargs.from_block is not None:
+            render_balance_series(
+                self.app,
+                w3,
+                make_coin_balance_getter(w3),
+                addresses,
+                (lambda b: Web3.from_wei(b, unit)) if unit != "wei" else None,
+            )
+            return
+        balance = w3.eth.get_balance(
+            Web3.to_checksum_address(addresses[0]),
             block_identifier=parse_block(self.app, "block"),
         )
-        if self.app.pargs.unit != "wei":
-            balance = Web3.from_wei(balance, self.app.pargs.unit)
+        if unit != "wei":
+            balance = Web3.from_wei(balance, unit)
         render(self.app, balance)
 
     @ex(
@@ -99,6 +119,42 @@ class MiscController(Controller):
         else:
             render(self.app, datetime.utcfromtimestamp(timestamp).isoformat())
 
+    @ex(
+        help="Get the first block mined at or after the given time.  Block timestamps are cached, so that repeated searches need few requests.",
+        arguments=[
+            (
+                ["time"],
+                {
+                    "help": "ISO8601 date, e.g. 2026-01-01 or 2026-01-01T12:00:00+02:00, or Unix timestamp.  Dates without timezone are in UTC."
+                },
+            ),
+            (
+                ["--before"],
+                {
+                    "help": "Get the last block mined at or before the given time, instead",
+                    "action": "store_true",
+                },
+            ),
+            *args.chain_and_rpc(),
+        ],
+    )
+    def block_at(self) -> None:
+        try:
+            timestamp = to_timestamp(self.app.pargs.time)
+        except ValueError as e:
+            raise Web3CliError(str(e))
+        w3 = make_client(self.app).w3
+        search_timestamp = timestamp + 1 if self.app.pargs.before else timestamp
+        try:
+            block = find_block_at(w3, self.app.chain.name, search_timestamp)
+        except ValueError as e:
+            if not self.app.pargs.before:
+                raise Web3CliError(str(e))
+            block = w3.eth.block_number + 1  # all blocks are before the time
+        if self.app.pargs.before and block == 0:
+            raise Web3CliError("No block was mined before the given time")
+        render(self.app, block - 1 if self.app.pargs.before else block)
+
     @ex(
         help="Get the number of the given block, as an integer; defaults to the latest block",
         arguments=[args.block("block", nargs="?"), *args.chain_and_rpc()],
@@ -148,6 +204,44 @@ class MiscController(Controller):
         base_fee_in_gwei = Web3.from_wei(base_fee_in_wei, "gwei")
         render(self.app, base_fee_in_gwei)
 
+    @ex(
+        help="Get statistics on the fees paid in recent blocks, in gwei: base fee trend and priority fee percentiles.  Uses a single eth_feeHistory call.",
+        arguments=[
+            (
+                ["--blocks"],
+                {
+                    "help": "number of recent blocks to consider; defaults to the fee_history_blocks config option",
+                    "type": int,
+                },
+            ),
+            (
+                ["--percentiles"],
+                {
+                    "help": "percentiles of the priority fees to compute",
+                    "nargs": "+",
+                    "type": int,
+                    "default": list(DEFAULT_PERCENTILES),
+                },
+            ),
+            *args.chain_and_rpc(),
+        ],
+    )
+    def fees(self) -> None:
+        if any(p < 0 or p > 100 for p in self.app.pargs.percentiles):
+            raise Web3CliError("Percentiles must be between 0 and 100")
+        try:
+            stats = get_fee_stats(
+                make_client(self.app).w3,
+                self.app.chain.name,
+                self.app.pargs.blocks or self.app.get_option("fee_history_blocks"),
+                self.app.pargs.percentiles,
+            )
+        except KeyError:
+            raise Web3CliError(
+                f"Could not find fee history. Please check that chain '{self.app.chain.name}' is EIP-1599 compatible."
+            )
+        render(self.app, stats)
+
     @ex(
         help="Return the Keccak-256 hash of the given text",
         arguments=[(["text"], {"action": "store"})],
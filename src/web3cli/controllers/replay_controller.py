@@ -6,6 +6,7 @@ from web3cli.helpers import args
 from web3cli.helpers.client_factory import make_client, make_wallet
 from web3cli.helpers.render import render, render_web3py
 from web3core.helpers.misc import yes_or_exit
+from web3core.helpers.tx import build_replay_tx
 
 
 class ReplayController(Controller):
@@ -22,11 +23,11 @@ class ReplayController(Controller):
         arguments=[
             (["hash"], {"help": "hash of the transaction"}),
             *args.chain_and_rpc(),
-            args.signer(),
+            *args.signer_and_gas(),
             (
                 ["--fee-multiplier"],
                 {
-                    "help": "multiply gas price by this factor with respect to the original tx; set to zero to estimate it based on current chain conditions",
+                    "help": "multiply gas price by this factor with respect to the original tx; set to zero to estimate it based on current chain conditions, using --priority-fee as tip",
                     "default": 0,
                     "type": float,
                 },
@@ -54,40 +55,13 @@ class ReplayController(Controller):
         original_tx = make_client(self.app).get_tx(self.app.pargs.hash)
         # Build replay transaction
         signer = make_wallet(self.app)
-        tx = signer.build_base_tx()
-        # Make sure you call the same contract
-        tx["to"] = original_tx["to"]
-        # Make sure you call the same method with same args
-        if original_tx.get("input"):
-            tx["data"] = original_tx["input"]
-        # Make sure you pay the same amount
-        tx["value"] = original_tx["value"]
-        # Make sure you send the same type of transaction
-        if original_tx.get("type"):
-            tx["type"] = original_tx["type"]
-        # Make sure you use the right amount of gas
-        tx["gas"] = int(int(original_tx["gas"]) * self.app.pargs.gas_multiplier)
-        # For post EIP-1559 transactions, use the same tip and max gas
-        if self.app.pargs.fee_multiplier != 0 and original_tx.get("maxFeePerGas"):
-            tx["maxFeePerGas"] = int(
-                original_tx["maxFeePerGas"] * self.app.pargs.fee_multiplier
-            )
-        if self.app.pargs.fee_multiplier != 0 and original_tx.get(
-            "maxPriorityFeePerGas"
-        ):
-            tx["maxPriorityFeePerGas"] = int(
-                original_tx["maxPriorityFeePerGas"] * self.app.pargs.fee_multiplier
-            )
-        # For pre EIP-1559 transactions, use the same gas price
-        if (
-            self.app.pargs.fee_multiplier != 0
-            and original_tx.get("gasPrice")
-            and not original_tx.get("maxFeePerGas")
-            and not original_tx.get("maxPriorityFeePerGas")
-        ):
-            tx["gasPrice"] = int(
-                original_tx["gasPrice"] * self.app.pargs.fee_multiplier
-            )
+        base_tx = signer.build_base_tx(max_priority_fee_in_gwei=self.app.priority_fee)
+        tx = build_replay_tx(
+            original_tx,
+            base_tx,
+            fee_multiplier=self.app.pargs.fee_multiplier,
+            gas_multiplier=self.app.pargs.gas_multiplier,
+        )
         # Optionally override type field
         if self.app.pargs.type is not None:
             tx["type"] = self.app.pargs.type
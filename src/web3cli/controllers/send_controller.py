@@ -1,9 +1,24 @@
+import re
+
 from cement import ex
 
+from web3cli.exceptions import Web3CliError
 from web3cli.framework.controller import Controller
 from web3cli.helpers import args
-from web3cli.helpers.render import render
-from web3cli.helpers.send import send_coin_or_token
+from web3cli.helpers.client_factory import get_gas_cache, make_wallet
+from web3cli.helpers.render import render, render_table
+from web3cli.helpers.send import prepare_batch, send_coin_or_token
+from web3cli.helpers.tx import get_broadcast_urls, get_nonce_manager
+from web3core.helpers.batch import (
+    broadcast_batch,
+    make_signed_tx_record,
+    read_batch_csv,
+    summarize_batch,
+    track_receipts,
+    write_batch_results_csv,
+    write_signed_txs,
+)
+from web3core.helpers.broadcast import broadcast_raw_tx, raise_if_not_accepted
 from web3core.helpers.misc import to_number, yes_or_exit
 from web3core.helpers.resolve import resolve_address
 
@@ -18,18 +33,19 @@ class SendController(Controller):
         stacked_on = "base"
 
     @ex(
-        help="Send a coin or token to the given address, and show the transaction hash",
+        help="Send a coin or token to the given address, and show the transaction hash; use --batch to make many transfers from a CSV file",
         arguments=[
             (
                 ["to"],
                 {
                     "help": "receiver of the funds; can be an actual address or an address tag",
+                    "nargs": "?",
                 },
             ),
-            (["amount"], {"help": "how much to send"}),
+            (["amount"], {"help": "how much to send", "nargs": "?"}),
             (
                 ["ticker"],
-                {"help": "ticker of the coin or token to send"},
+                {"help": "ticker of the coin or token to send", "nargs": "?"},
             ),
             (
                 ["unit"],
@@ -41,9 +57,20 @@ class SendController(Controller):
             *args.chain_and_rpc(),
             *args.signer_and_gas(),
             args.force(),
+            *args.batch_args(),
         ],
     )
     def send(self) -> None:
+        if self.app.pargs.batch:
+            return self.send_batch()
+        # Single transfers are sent right away
+        for flag in ["dry_run", "sign_to", "broadcast"]:
+            if getattr(self.app.pargs, flag):
+                raise Web3CliError(
+                    f"The --{flag.replace('_', '-')} option requires --batch"
+                )
+        if not self.app.pargs.ticker:
+            raise Web3CliError("Please specify receiver, amount and ticker")
         # Parse arguments
         to_address = resolve_address(self.app.pargs.to, chain=self.app.chain.name)
         amount = to_number(self.app.pargs.amount)
@@ -65,3 +92,100 @@ class SendController(Controller):
             unit=self.app.pargs.unit,
         )
         render(self.app, tx_hash)
+
+    def send_batch(self) -> None:
+        """Make the transfers in the batch file: sign them all upfront
+        with consecutive nonces, broadcast them a few at a time, then wait
+        for the receipts and write the results to a CSV file"""
+        # Parse arguments
+        try:
+            rows = read_batch_csv(self.app.pargs.batch)
+        except (OSError, ValueError) as e:
+            raise Web3CliError(f"Could not read batch file: {e}")
+        if not rows:
+            raise Web3CliError(f"No transfers in {self.app.pargs.batch}")
+        output = self.app.pargs.output or (
+            re.sub(r"\.csv$", "", self.app.pargs.batch) + ".results.csv"
+        )
+        dry_run = self.app.pargs.dry_run
+        if not self.app.pargs.force and not dry_run:
+            totals: dict[str, float] = {}
+            for row in rows:
+                what = f"{row['ticker'].lower()} {row['unit']}".strip()
+                totals[what] = totals.get(what, 0) + to_number(row["amount"])
+            print(
+                f"You are about to make {len(rows)} transfers on the {self.app.chain.name} chain from {self.app.signer.address}, for a total of {', '.join(f'{v} {k}' for k, v in totals.items())}."
+            )
+            yes_or_exit(logger=self.app.log.info)
+        # Sign all transactions
+        wallet = make_wallet(self.app)
+        nonce_manager = None
+        if self.app.get_option("nonce_manager") and not dry_run:
+            nonce_manager = get_nonce_manager(self.app, wallet)
+        txs = prepare_batch(
+            self.app,
+            wallet,
+            rows,
+            nonce_manager=nonce_manager,
+            sign_to=self.app.pargs.sign_to,
+        )
+        if self.app.pargs.sign_to:
+            write_signed_txs(
+                self.app.pargs.sign_to,
+                [
+                    make_signed_tx_record(t["params"], t["raw"], t["hash"], "transfer")
+                    for t in txs
+                ],
+            )
+            self.app.log.info(
+                f"{len(txs)} signed transactions appended to {self.app.pargs.sign_to}"
+            )
+            return
+        if dry_run:
+            render_table(
+                self.app,
+                ["To", "Amount", "Ticker", "Nonce", "Hash"],
+                [
+                    [
+                        t["row"]["to"],
+                        t["row"]["amount"],
+                        t["row"]["ticker"],
+                        t["nonce"],
+                        t["hash"],
+                    ]
+                    for t in txs
+                ],
+            )
+            return
+        # Broadcast
+        self.app.log.info(f"Broadcasting {len(txs)} transactions...")
+        send = None
+        urls = get_broadcast_urls(self.app)
+        if urls:
+            send = lambda raw: raise_if_not_accepted(broadcast_raw_tx(raw, urls))
+        for tx in broadcast_batch(
+            wallet.w3, txs, self.app.pargs.concurrency, send=send
+        ):
+            if tx["status"] == "failed":
+                self.app.log.warning(
+                    f"Could not send tx with nonce {tx['nonce']}: {tx['error']}"
+                )
+                if nonce_manager:
+                    nonce_manager.fail(tx["nonce"], Web3CliError(tx["error"]))
+        sent = [tx for tx in txs if tx["status"] == "sent"]
+        if len(sent) < len(txs):
+            self.app.log.warning(
+                "Transactions with a nonce higher than a failed one will not be mined until the nonce gap is filled"
+            )
+        # Track receipts
+        self.app.log.info(f"Waiting for {len(sent)} receipts...")
+        gas_cache = get_gas_cache(self.app)
+        for tx in track_receipts(
+            wallet.w3, sent, self.app.pargs.timeout, self.app.pargs.concurrency
+        ):
+            self.app.log.debug(f"Tx {tx['hash']}: {tx['status']}")
+            if gas_cache and tx["status"] == "success":
+                gas_cache.add_tx(self.app.chain.chain_id, tx["params"], tx["gas_used"])
+        write_batch_results_csv(output, txs)
+        self.app.log.info(f"Results written to {output}")
+        render(self.app, summarize_batch(txs))
@@ -1,22 +1,20 @@
 import asyncio
-import json
-from typing import Any
+from typing import Any, Coroutine, List
 
-import requests
 from cement import ex
-from web3.types import TxData
-from web3client.types import AsyncSubscriptionCallback, SubscriptionType
 
-from web3cli.exceptions import Web3CliError
 from web3cli.framework.controller import Controller
 from web3cli.helpers import args
-from web3cli.helpers.client_factory import make_client
-from web3cli.helpers.render import render
-from web3cli.helpers.telegram import send_tg_message
-from web3core.helpers.misc import decode_escapes, replace_all
-from web3core.helpers.resolve import resolve_address
-from web3core.helpers.rpc import check_ws_or_raise
-from web3core.helpers.validation import is_valid_url
+from web3cli.helpers.subscribe import (
+    make_subscription_from_args,
+    make_subscriptions_from_config,
+)
+from web3core.helpers.metrics import log_metrics, serve_metrics
+from web3core.helpers.subscribe import (
+    Subscription,
+    run_subscriptions,
+    shard_subscription,
+)
 
 
 class SubscribeController(Controller):
@@ -32,57 +30,40 @@ class SubscribeController(Controller):
     @ex(
         help="Show new blocks as they are mined.  Uses the 'newHeads' subscription.",
         arguments=[
+            args.subscribe_reorgs(),
+            args.subscribe_confirmations(),
             *args.subscribe_actions(),
             *args.tg_args(),
+            *args.subscribe_metrics(),
             *args.chain_and_rpc(),
         ],
         aliases=["block", "headers"],
     )
     def blocks(self) -> None:
-        check_ws_or_raise(self.app.rpc.url)
+        subscription = make_subscription_from_args(self.app, "newHeads")
         self.app.log.info("Subscribing to new blocks, press Ctrl+C to stop...")
-        asyncio.run(
-            make_client(self.app).async_subscribe(
-                on_notification=self.get_callback(),
-                subscription_type="newHeads",
-                on_connection_closed=lambda _, __: self.app.log.warning(
-                    "Connection closed, reconnecting..."
-                ),
-            )
-        )
+        self.listen([subscription])
 
     @ex(
         help="Show new transactions before they are mined.  Uses the 'newPendingTransactions' subscription, which is supported only by chains with a mempool.",
         arguments=[
             args.subscribe_senders(),
+            args.subscribe_full_txs(),
+            *args.subscribe_fetch_args(),
+            *args.subscribe_aggregate(),
             *args.subscribe_actions(),
             *args.tg_args(),
+            *args.subscribe_metrics(),
             *args.chain_and_rpc(),
         ],
         aliases=["pending_txs", "txs"],
     )
     def pending(self) -> None:
-        check_ws_or_raise(self.app.rpc.url)
+        subscription = make_subscription_from_args(self.app, "newPendingTransactions")
         self.app.log.info(
             "Subscribing to new pending transactions, press Ctrl+C to stop..."
         )
-        asyncio.run(
-            make_client(self.app).async_subscribe(
-                on_notification=self.get_callback(),
-                subscription_type="newPendingTransactions",
-                tx_from=[
-                    resolve_address(a, chain=self.app.chain.name)
-                    for a in self.app.pargs.senders
-                ],
-                tx_on_fetch=lambda tx, data: self.app.log.debug(
-                    f"Fetched tx {tx['hash'].hex()} from {tx['from']}"
-                ),
-                tx_on_fetch_error=lambda e, data: self.app.log.warning(e),
-                on_connection_closed=lambda _, __: self.app.log.warning(
-                    "Connection closed, reconnecting..."
-                ),
-            )
-        )
+        self.listen([subscription])
 
     @ex(
         help="Show contract events as they are emitted.  Uses the 'logs' subscription.",
@@ -103,100 +84,70 @@ class SubscribeController(Controller):
                     "default": [],
                 },
             ),
+            args.subscribe_shard_size(),
+            args.subscribe_shard_connections(),
             args.subscribe_senders(),
+            *args.subscribe_fetch_args(),
+            args.subscribe_decode(),
+            *args.subscribe_aggregate(),
             *args.subscribe_actions(),
             *args.tg_args(),
+            *args.subscribe_metrics(),
             *args.chain_and_rpc(),
         ],
         aliases=["logs"],
     )
     def events(self) -> None:
-        check_ws_or_raise(self.app.rpc.url)
-        self.app.log.info("Subscribing to new events, press Ctrl+C to stop...")
-        asyncio.run(
-            make_client(self.app).async_subscribe(
-                on_notification=self.get_callback(),
-                subscription_type="logs",
-                logs_addresses=[
-                    resolve_address(a, chain=self.app.chain.name)
-                    for a in self.app.pargs.contracts
-                ],
-                logs_topics=self.app.pargs.topics,
-                tx_from=[
-                    resolve_address(a, chain=self.app.chain.name)
-                    for a in self.app.pargs.senders
-                ],
-                tx_on_fetch=lambda tx, data: self.app.log.debug(
-                    f"Fetched tx {tx['hash'].hex()} from {tx['from']}"
-                ),
-                tx_on_fetch_error=lambda e, data: self.app.log.warning(e),
-                on_connection_closed=lambda _, __: self.app.log.warning(
-                    "Connection closed, reconnecting..."
-                ),
-            )
+        subscriptions = shard_subscription(
+            make_subscription_from_args(self.app, "logs"),
+            self.app.pargs.shard_size,
+            self.app.pargs.shard_connections,
         )
+        if len(subscriptions) > 1:
+            self.app.log.info(f"Split the filter in {len(subscriptions)} subscriptions")
+        self.app.log.info("Subscribing to new events, press Ctrl+C to stop...")
+        self.listen(subscriptions)
 
-    def get_callback(self) -> AsyncSubscriptionCallback:
-        """Return the callback to invoke when a notification is received,
-        based on the command arguments."""
+    @ex(
+        help="Run many subscriptions at once, declared in a YAML file.  Subscriptions on the same RPC share a single websocket connection.  Each item of the list accepts the keys: type (one of blocks, pending, events), name, chain, rpc, contracts, topics, senders, full_txs, fetch_concurrency, fetch_rate, decode, reorgs, confirmations, aggregate_window, aggregate_slide, aggregate_sum, aggregate_top, shard_size, shard_connections, print, telegram, post, message, silent, digest_window, digest_count, jsonl, jsonl_max_size, jsonl_max_age, jsonl_gzip.",
+        arguments=[
+            (["file"], {"help": "YAML file with a 'subscriptions' list"}),
+            *args.subscribe_metrics(),
+        ],
+    )
+    def run(self) -> None:
+        subscriptions = make_subscriptions_from_config(self.app, self.app.pargs.file)
+        self.app.log.info(
+            f"Running {len(subscriptions)} subscriptions, press Ctrl+C to stop..."
+        )
+        self.listen(subscriptions)
 
-        async def callback(data: Any, sub_type: SubscriptionType, tx: TxData) -> None:
-            # PRINT CALLBACK
-            if self.app.pargs.print:
-                render(self.app, data)
-            # TELEGRAM CALLBACK
-            if self.app.pargs.telegram:
-                # Find block number
-                try:
-                    block = int(
-                        data.get("blockNumber", None) or data.get("number", None), 16
-                    )
-                except:
-                    block = None
-                # Find tx hash
-                try:
-                    tx_hash = data.get("transactionHash", None)
-                except:
-                    tx_hash = data if type(data) is str else None
-                # Replace placeholders in the message
-                msg = replace_all(
-                    self.app.pargs.message,
-                    {
-                        "{data}": json.dumps(data, indent=4),
-                        "{tx}": tx_hash,
-                        "{block}": block,
-                    },
-                )
-                # Send the message
-                send_tg_message(
-                    self.app,
-                    body=decode_escapes(msg),
-                    chat_id=self.app.pargs.telegram
-                    if self.app.pargs.telegram != "config"
-                    else None,
-                    disable_web_page_preview=True,
-                    silent=self.app.pargs.silent,
-                )
-            # POST CALLBACK
-            if self.app.pargs.post:
-                url = self.app.pargs.post[0]
-                if not is_valid_url(url):
-                    raise Web3CliError(f"Invalid URL: {url}")
-                payload = {
-                    "notification_data": data,
-                    "notification_type": sub_type,
-                    "tx_data": tx,
-                }
-                response = requests.post(
-                    url=url,
-                    data=json.dumps(payload),
-                    headers={"Content-Type": "application/json"},
-                    timeout=self.app.get_option("post_callback_timeout"),
-                )
-                self.app.log.debug(f"POST callback response: {response.text}")
-                if response.status_code != 200:
-                    self.app.log.error(
-                        f"POST callback failed with code {response.status_code} and response: {response.text}"
-                    )
+    def listen(self, subscriptions: List[Subscription]) -> None:
+        """Run the given subscriptions until the user stops the command,
+        exposing or logging the metrics if requested"""
+        if self.app.pargs.metrics_port:
+            serve_metrics(self.app.pargs.metrics_port)
+            self.app.log.info(
+                f"Serving metrics at http://127.0.0.1:{self.app.pargs.metrics_port}/metrics"
+            )
+        asyncio.run(self.run_with_metrics(subscriptions))
 
-        return callback
+    async def run_with_metrics(self, subscriptions: List[Subscription]) -> None:
+        """Run the subscriptions, and log the metrics periodically if
+        requested"""
+        coroutines: List[Coroutine[Any, Any, None]] = [
+            run_subscriptions(
+                subscriptions,
+                on_subscribe=lambda s: self.app.log.debug(
+                    f"Subscribed to '{s.name}' with ID {s.id}"
+                ),
+                on_connection_closed=lambda _, rpc_url: self.app.log.warning(
+                    f"Connection to {rpc_url} closed, reconnecting..."
+                ),
+            )
+        ]
+        if self.app.pargs.metrics_interval:
+            coroutines.append(
+                log_metrics(self.app.log.info, self.app.pargs.metrics_interval)
+            )
+        await asyncio.gather(*coroutines)
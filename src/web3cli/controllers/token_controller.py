@@ -7,10 +7,12 @@ from playhouse.shortcuts import model_to_dict
 from web3cli.exceptions import Web3CliError
 from web3cli.framework.controller import Controller
 from web3cli.helpers import args
+from web3cli.helpers.balance import render_balance_series
 from web3cli.helpers.client_factory import make_contract_client, make_contract_wallet
 from web3cli.helpers.render import render, render_table
 from web3cli.helpers.tx import send_contract_tx
 from web3core.exceptions import ContractNotFound
+from web3core.helpers.balances import make_token_balance_getter
 from web3core.helpers.misc import yes_or_exit
 from web3core.helpers.resolve import resolve_address
 from web3core.models.contract import Contract
@@ -156,18 +158,39 @@ class TokenController(Controller):
         render(self.app, decimals)
 
     @ex(
-        help="Show the balance of the given token for the given address",
+        help="Show the balance of the given token for the given address.  With many addresses, or with --from-block, print the balances as CSV.",
         arguments=[
             (["token"], {"help": "Token to check, by name"}),
-            (["address"], {"help": "Address or name of the account to check"}),
+            (
+                ["address"],
+                {"help": "Address or name of the accounts to check", "nargs": "+"},
+            ),
             (["--wei"], {"help": "Print the output in wei", "action": "store_true"}),
             args.block(),
+            *args.series_args(),
             *args.chain_and_rpc(),
         ],
     )
     def balance(self) -> None:
-        address = resolve_address(self.app.pargs.address, chain=self.app.chain.name)
+        addresses = [
+            resolve_address(a, chain=self.app.chain.name)
+            for a in self.app.pargs.address
+        ]
         client = make_contract_client(self.app, self.app.pargs.token)
+        if len(addresses) > 1 or self.app.pargs.from_block is not None:
+            # Decimals are read once for the whole series
+            unit = None
+            if not self.app.pargs.wei:
+                unit = decimal.Decimal(10 ** client.functions.decimals().call())
+            render_balance_series(
+                self.app,
+                client.w3,
+                make_token_balance_getter(client.functions.balanceOf),
+                addresses,
+                (lambda b: b / unit) if unit else None,
+            )
+            return
+        address = addresses[0]
         block = args.parse_block(self.app, "block")
         balance_in_wei = client.functions["balanceOf"](address).call(
             block_identifier=block
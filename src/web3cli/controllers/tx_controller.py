@@ -1,12 +1,29 @@
+import json
+import sys
+from typing import Any, Callable, Dict, Tuple, Type, Union, cast
+
 from cement import ex
 from web3 import Web3
+from web3._utils.encoding import Web3JsonEncoder
 from web3.datastructures import AttributeDict
+from web3.exceptions import TimeExhausted, TransactionNotFound
+from web3.types import TxParams
+from web3client.base_client import BaseClient
 from web3client.helpers.tx import parse_raw_tx
 
+from web3cli.exceptions import Web3CliError
 from web3cli.framework.controller import Controller
 from web3cli.helpers import args
-from web3cli.helpers.client_factory import make_client
+from web3cli.helpers.args import parse_tx_hashes
+from web3cli.helpers.client_factory import make_client, make_wallet
 from web3cli.helpers.render import render
+from web3cli.helpers.tx import get_broadcast_urls, save_to_history
+from web3core.helpers.broadcast import broadcast_raw_tx, raise_if_not_accepted
+from web3core.helpers.parallel import iter_parallel
+from web3core.helpers.receipts import ReceiptTracker
+from web3core.helpers.stuck import Replacer, StuckTxWatcher
+from web3core.helpers.tx import build_replacement_tx, get_fee_fields
+from web3core.models.tx import Tx
 
 
 class TxController(Controller):
@@ -19,29 +36,229 @@ class TxController(Controller):
         stacked_on = "base"
 
     @ex(
-        help="Fetch the given transaction from the blockchain",
+        help="Fetch the given transaction from the blockchain.  Many hashes are fetched concurrently, and printed as JSON lines.",
         arguments=[
-            (["hash"], {"help": "hash of the transaction"}),
+            *args.tx_hashes_args(),
             *args.chain_and_rpc(),
         ],
     )
     def get(self) -> None:
         client = make_client(self.app)
-        tx = client.w3.eth.get_transaction(self.app.pargs.hash)
-        render(self.app, tx)
+        self.render_many(client.w3.eth.get_transaction, TransactionNotFound)
 
     @ex(
-        help="Fetch the receipt of the given transaction from the blockchain",
+        help="Fetch the receipt of the given transaction from the blockchain, waiting for the transaction to be mined.  Many hashes are checked at each new block, and printed as JSON lines as soon as they are mined.",
         arguments=[
-            (["hash"], {"help": "hash of the transaction"}),
+            *args.tx_hashes_args(),
+            (
+                ["--no-wait"],
+                {
+                    "help": "do not wait for pending transactions to be mined; report them as not found",
+                    "action": "store_true",
+                },
+            ),
+            (
+                ["--timeout"],
+                {
+                    "help": "seconds to wait for each transaction to be mined",
+                    "type": float,
+                    "default": 120,
+                },
+            ),
+            (
+                ["--confirmations"],
+                {
+                    "help": "wait until the block of the transaction is this deep in the chain, counting the block itself",
+                    "type": int,
+                    "default": 1,
+                },
+            ),
             *args.chain_and_rpc(),
         ],
         aliases=["rc", "receipt"],
     )
     def get_receipt(self) -> None:
-        client = make_client(self.app)
-        receipt = client.w3.eth.wait_for_transaction_receipt(self.app.pargs.hash)
-        render(self.app, receipt)
+        w3 = make_client(self.app).w3
+        if self.app.pargs.no_wait:
+            self.render_many(w3.eth.get_transaction_receipt, TransactionNotFound)
+            return
+        hashes = parse_tx_hashes(self.app)
+        tracker = ReceiptTracker(
+            w3,
+            hashes,
+            confirmations=self.app.pargs.confirmations,
+            timeout=self.app.pargs.timeout,
+            concurrency=self.app.pargs.concurrency,
+            retries=self.app.pargs.retries,
+        )
+        if len(hashes) == 1 and self.app.pargs.hash == hashes:
+            result = next(tracker.track())
+            if result["status"] in ("timeout", "unconfirmed"):
+                raise TimeExhausted(result["error"])
+            render(self.app, result["receipt"])
+            return
+        n_errors = 0
+        for result in tracker.track():
+            record: Dict[str, Any]
+            if result["receipt"] is None:
+                record = {"hash": result["hash"]}
+            else:
+                record = dict(result["receipt"])
+                record["confirmations"] = result["confirmations"]
+            if result["status"] in ("timeout", "unconfirmed"):
+                n_errors += 1
+                record["error"] = result["error"]
+            sys.stdout.write(json.dumps(record, cls=Web3JsonEncoder) + "\n")
+            sys.stdout.flush()
+        if n_errors:
+            self.app.log.warning(f"{n_errors} of {len(hashes)} transactions timed out")
+
+    @ex(
+        help="Watch the given pending transactions until they are mined, and replace those that are stuck for more than --stuck-blocks blocks with a copy that has the same nonce and higher fees.  Without hashes, watch the transactions of the signer in the history that have no receipt yet.  The outcome of each transaction is printed as a JSON line.",
+        arguments=[
+            *args.tx_hashes_args(),
+            (
+                ["--stuck-blocks"],
+                {
+                    "help": "replace a transaction if it is not mined this many blocks after it was sent",
+                    "type": int,
+                    "default": 3,
+                },
+            ),
+            (
+                ["--fee-bump"],
+                {
+                    "help": "multiply the fees of a stuck transaction by this factor; nodes require at least 1.1",
+                    "type": float,
+                    "default": 1.125,
+                },
+            ),
+            (
+                ["--max-bumps"],
+                {
+                    "help": "replace each transaction at most this many times",
+                    "type": int,
+                    "default": 5,
+                },
+            ),
+            (
+                ["--max-fee"],
+                {
+                    "help": "never pay more than this max fee per gas, in gwei",
+                    "type": float,
+                },
+            ),
+            (
+                ["--no-bump"],
+                {
+                    "help": "only report stuck transactions, do not replace them",
+                    "action": "store_true",
+                },
+            ),
+            (
+                ["--timeout"],
+                {
+                    "help": "seconds to wait for the transactions to be mined",
+                    "type": float,
+                    "default": 600,
+                },
+            ),
+            args.tx_broadcast(),
+            *args.chain_and_rpc(),
+            *args.signer_and_gas(),
+        ],
+    )
+    def watch(self) -> None:
+        wallet = make_wallet(self.app)
+        # Fetch the transactions to watch
+        history: Dict[str, Tx] = {}
+        if self.app.pargs.hash or self.app.pargs.file:
+            hashes = parse_tx_hashes(self.app)
+        else:
+            history = {
+                tx.hash: tx
+                for tx in Tx.get_pending(self.app.chain.name, wallet.user_address)
+            }
+            hashes = list(history)
+            if not hashes:
+                self.app.log.info(
+                    f"No pending transactions of {wallet.user_address} in the history"
+                )
+                return
+        txs = []
+        n_errors = 0
+        record: Dict[str, Any]
+        for hash, tx, error in iter_parallel(
+            wallet.w3.eth.get_transaction,  # type: ignore
+            hashes,
+            self.app.pargs.concurrency,
+            self.app.pargs.retries,
+            no_retry=TransactionNotFound,
+        ):
+            if error is not None:
+                n_errors += 1
+                record = {"original": hash, "status": "not_found", "error": str(error)}
+                sys.stdout.write(json.dumps(record) + "\n")
+            else:
+                txs.append(tx)
+        # Watch them
+        watcher = StuckTxWatcher(
+            wallet.w3,
+            txs,
+            stuck_blocks=self.app.pargs.stuck_blocks,
+            max_bumps=self.app.pargs.max_bumps,
+            replace=None if self.app.pargs.no_bump else self.get_replacer(wallet),
+            timeout=self.app.pargs.timeout,
+            concurrency=self.app.pargs.concurrency,
+            retries=self.app.pargs.retries,
+            logger=self.app.log.info,
+        )
+        self.app.log.info(f"Watching {len(watcher)} transactions...")
+        for watched in watcher.watch():
+            if watched["status"] != "success":
+                n_errors += 1
+            if watched["original"] in history:
+                save_to_history(self.app, history[watched["original"]], watched)
+            record = {
+                k: watched[k]  # type: ignore
+                for k in ["original", "hash", "nonce", "status", "bumps", "error"]
+            }
+            if watched["receipt"]:
+                record["gas_used"] = watched["receipt"]["gasUsed"]
+                record["block_number"] = watched["receipt"]["blockNumber"]
+            sys.stdout.write(json.dumps(record) + "\n")
+            sys.stdout.flush()
+        if n_errors:
+            self.app.log.warning(
+                f"{n_errors} of {len(hashes)} transactions were not mined successfully"
+            )
+
+    def get_replacer(self, wallet: BaseClient) -> Replacer:
+        """Return a function that signs and sends a replacement for a
+        stuck transaction of the given wallet"""
+        urls = get_broadcast_urls(self.app)
+        max_fee = self.app.pargs.max_fee
+        fee_bump = self.app.pargs.fee_bump
+
+        def replace(tx: Dict[str, Any]) -> Tuple[Union[str, bytes], TxParams]:
+            if tx["from"].lower() != wallet.user_address.lower():
+                raise Web3CliError(f"Tx was sent by {tx['from']}, not by the signer")
+            base_tx = wallet.build_base_tx(
+                nonce=tx["nonce"],
+                gas_limit=int(tx["gas"]),
+                max_priority_fee_in_gwei=self.app.priority_fee,
+            )
+            replacement = build_replacement_tx(tx, base_tx, fee_bump)
+            fees = cast(Dict[str, int], get_fee_fields(replacement))
+            if max_fee and max(fees.values()) > Web3.to_wei(max_fee, "gwei"):
+                raise Web3CliError(f"Replacement fees {fees} exceed --max-fee")
+            signed_tx = wallet.sign_tx(replacement)
+            if urls:
+                raise_if_not_accepted(broadcast_raw_tx(signed_tx.rawTransaction, urls))
+                return signed_tx.hash, replacement
+            return wallet.send_signed_tx(signed_tx), replacement
+
+        return replace
 
     @ex(
         help="Decode a raw transaction",
@@ -64,3 +281,36 @@ class TxController(Controller):
         client = make_client(self.app)
         raw_tx = client.w3.eth.get_raw_transaction(self.app.pargs.hash)
         render(self.app, Web3.to_hex(raw_tx))
+
+    def render_many(
+        self,
+        fetch: Callable[[Any], Any],
+        no_retry: Union[Type[Exception], Tuple[Type[Exception], ...]] = (),
+    ) -> None:
+        """Fetch the given data for the hashes passed to the CLI.
+
+        A single hash passed as argument is rendered as usual.  Otherwise,
+        hashes are fetched concurrently, and the results are printed as JSON
+        lines in the same order as the hashes.  Requests that fail are
+        retried, unless the exception is of the `no_retry` types; hashes
+        that could not be fetched are printed as {"hash": ..., "error": ...}"""
+        hashes = parse_tx_hashes(self.app)
+        if len(hashes) == 1 and self.app.pargs.hash == hashes:
+            render(self.app, fetch(hashes[0]))
+            return
+        n_errors = 0
+        for hash, result, error in iter_parallel(
+            fetch,
+            hashes,
+            self.app.pargs.concurrency,
+            self.app.pargs.retries,
+            no_retry=no_retry,
+        ):
+            if error is not None:
+                n_errors += 1
+                record = {"hash": hash, "error": str(error)}
+            else:
+                record = dict(result)
+            sys.stdout.write(json.dumps(record, cls=Web3JsonEncoder) + "\n")
+        if n_errors:
+            self.app.log.warning(f"Could not fetch {n_errors} of {len(hashes)} hashes")
@@ -1,15 +1,19 @@
 import argparse
 import json
 import os
+import sys
 from typing import Any, List, Literal, Tuple, Union
 
 from web3.types import ABI
 
 from web3cli.exceptions import SignerNotResolved, Web3CliError
 from web3cli.framework.app import App
+from web3cli.helpers.client_factory import get_read_cache_args
 from web3cli.helpers.signer import get_signer
 from web3core.exceptions import RpcIsInvalid
 from web3core.helpers.blocks import BLOCK_PREDEFINED_IDENTIFIERS, get_block_type
+from web3core.helpers.client_factory import make_base_client
+from web3core.helpers.fees import get_priority_fee, parse_percentile
 from web3core.helpers.rpc import is_rpc_uri_valid
 from web3core.models.chain import Chain, Rpc
 from web3core.models.signer import Signer
@@ -126,16 +130,41 @@ def parse_signer(app: App) -> Signer:
         )
 
 
-def parse_priority_fee(app: App) -> int:
+def parse_priority_fee(app: App) -> float:
     """If the --priority-fee argument was passed to the CLI, return it; otherwise,
-    return its default value from the config file"""
+    return its default value from the config file.
+
+    The fee can also be given as a percentile, e.g. p50, in which case
+    it is computed from the tips paid in recent blocks, using the
+    eth_feeHistory method"""
     if app.pargs.priority_fee:
         priority_fee = app.pargs.priority_fee
     else:
         priority_fee = app.get_option("default_priority_fee")
     if not priority_fee:
         raise Web3CliError("Priority fee not defined, should not be here")
-    return priority_fee
+    try:
+        percentile = parse_percentile(priority_fee)
+    except ValueError as e:
+        raise Web3CliError(str(e))
+    if percentile is None:
+        try:
+            return float(priority_fee)
+        except ValueError:
+            raise Web3CliError(
+                f"Invalid priority fee '{priority_fee}': must be a number in gwei or a percentile like p50"
+            )
+    if not hasattr(app, "rpc"):
+        raise Web3CliError("Priority fee percentiles require a chain and an RPC")
+    client = make_base_client(
+        chain=app.chain, node_uri=app.rpc.url, **get_read_cache_args(app)
+    )
+    return get_priority_fee(
+        client.w3,
+        app.chain.name,
+        percentile,
+        blocks=app.get_option("fee_history_blocks"),
+    )
 
 
 def parse_block(app: App, label: str = "block") -> Union[str, int]:
@@ -160,6 +189,38 @@ def parse_block(app: App, label: str = "block") -> Union[str, int]:
         return int(value, 16)
 
 
+def parse_block_number(app: App, w3: Any, label: str = "block") -> int:
+    """Return the block passed to the CLI as a block number, fetching
+    it from the blockchain if the block is a hash or a predefined
+    identifier such as 'latest'"""
+    block = parse_block(app, label)
+    if isinstance(block, int):
+        return block
+    return w3.eth.get_block(block)["number"]
+
+
+def parse_tx_hashes(app: App, label: str = "hash") -> List[str]:
+    """Return the transaction hashes passed to the CLI, either as
+    arguments, in the file given with --file, or via stdin, if the
+    hash argument is '-'.  Files and stdin must contain one hash per
+    line; empty lines are ignored."""
+    values: List[str] = list(getattr(app.pargs, label) or [])
+    lines: List[str] = []
+    if "-" in values:
+        values.remove("-")
+        lines += sys.stdin.read().splitlines()
+    if app.pargs.file:
+        try:
+            with open(app.pargs.file) as file:
+                lines += file.read().splitlines()
+        except OSError as e:
+            raise Web3CliError(f"Could not read hashes from file: {e}")
+    hashes = values + [line.strip() for line in lines if line.strip()]
+    if not hashes:
+        raise Web3CliError("No transaction hash given")
+    return hashes
+
+
 def parse_tx_args(
     app: App,
     dry_run_dest: str = "dry_run",
@@ -310,6 +371,31 @@ def tx_gas_limit(
     )
 
 
+def tx_broadcast(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--broadcast"],
+        {
+            "help": "send the signed transaction to all the HTTP RPCs of the chain at the same time, or to the N fastest ones with --broadcast N",
+            "nargs": "?",
+            "const": "all",
+            "default": None,
+        }
+        | kwargs,
+    )
+
+
+def tx_sign_to(*name_or_flags: str, **kwargs: Any) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--sign-to"],
+        {
+            "help": "sign the transaction with the next nonce without sending it, and append it to this JSONL file, to be sent later with `w3 broadcast`",
+        }
+        | kwargs,
+    )
+
+
 def swap_dex(*name_or_flags: str, **kwargs: Any) -> Tuple[List[str], dict[str, Any]]:
     return (
         list(name_or_flags) or ["dex"],
@@ -443,8 +529,7 @@ def priority_fee(
     return (
         list(name_or_flags) or ["--priority-fee", "--tip"],
         {
-            "help": "max priority fee (tip) in gwei you are willing to spend for a transaction",
-            "type": float,
+            "help": "max priority fee (tip) in gwei you are willing to spend for a transaction, or a percentile of the tips paid in recent blocks, e.g. p50",
             # default set in `parse_priority_fee`
         }
         | kwargs,
@@ -547,11 +632,357 @@ def subscribe_senders(
     )
 
 
+def subscribe_decode(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--decode"],
+        {
+            "help": "Decode the events using the ABI of the emitting contract or, if the contract is not stored, any stored ABI with a matching event.  The decoded event is added to the notification data in the 'decoded' field.",
+            "action": argparse.BooleanOptionalAction,
+            "default": False,
+        }
+        | kwargs,
+    )
+
+
+def subscribe_metrics_port(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--metrics-port"],
+        {
+            "help": "Expose metrics in the Prometheus text format at http://127.0.0.1:PORT/metrics: notifications per subscription, callback latency per action, queue depth, reconnections and head lag",
+            "type": int,
+        }
+        | kwargs,
+    )
+
+
+def subscribe_metrics_interval(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--metrics-interval"],
+        {
+            "help": "Log a summary of the metrics every this many seconds",
+            "type": float,
+        }
+        | kwargs,
+    )
+
+
+def subscribe_aggregate_window(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--aggregate-window", "--window"],
+        {
+            "help": "Instead of acting on each notification, act once every this many seconds on the aggregates of the notifications received in the window: total count, count by contract and event (or by recipient for transactions), sums of the --aggregate-sum arguments and top senders",
+            "type": float,
+        }
+        | kwargs,
+    )
+
+
+def subscribe_aggregate_slide(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--aggregate-slide", "--slide"],
+        {
+            "help": "Emit the aggregates every this many seconds, over the last --aggregate-window seconds (sliding window).  By default, windows do not overlap (tumbling window).",
+            "type": float,
+        }
+        | kwargs,
+    )
+
+
+def subscribe_aggregate_sum(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--aggregate-sum", "--sum"],
+        {
+            "help": "Sum the values of these decoded event arguments, by contract and event; for example, use '--sum value' to get the total volume of Transfer events by token",
+            "nargs": "+",
+            "default": [],
+        }
+        | kwargs,
+    )
+
+
+def subscribe_aggregate_top(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--aggregate-top", "--top"],
+        {
+            "help": "How many of the most frequent transaction senders to include in the aggregates; requires transaction data, i.e. --senders or --full-txs",
+            "type": int,
+            "default": 10,
+        }
+        | kwargs,
+    )
+
+
+def subscribe_shard_size(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--shard-size"],
+        {
+            "help": "Split long lists of contracts (or topic0 alternatives) into several subscriptions with at most this many items each, since some nodes reject or throttle very large filters.  The events of the shards are merged back into a single stream ordered by block, with a delay of one second.",
+            "type": int,
+            "default": 1000,
+        }
+        | kwargs,
+    )
+
+
+def subscribe_shard_connections(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--shard-connections"],
+        {
+            "help": "Spread the shards created by --shard-size over this many websocket connections",
+            "type": int,
+            "default": 1,
+        }
+        | kwargs,
+    )
+
+
+def subscribe_reorgs(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--reorgs"],
+        {
+            "help": "Detect chain reorganizations from the received headers, and send a notification of type 'reorg' with the orphaned blocks when one happens",
+            "action": argparse.BooleanOptionalAction,
+            "default": False,
+        }
+        | kwargs,
+    )
+
+
+def subscribe_confirmations(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--confirmations", "--confs"],
+        {
+            "help": "Notify blocks only after they have this many confirmations.  Blocks orphaned before reaching the confirmations are never notified.",
+            "type": int,
+            "default": 0,
+        }
+        | kwargs,
+    )
+
+
+def subscribe_full_txs(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--full-txs"],
+        {
+            "help": "Ask the node to send full transaction objects instead of hashes, so that --senders does not need to fetch each transaction.  Supported by geth and some providers; if the node sends hashes anyway, transactions are fetched as usual.",
+            "action": argparse.BooleanOptionalAction,
+            "default": False,
+        }
+        | kwargs,
+    )
+
+
+def subscribe_fetch_concurrency(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--fetch-concurrency"],
+        {
+            "help": "With --senders, maximum number of transactions fetched at the same time",
+            "type": int,
+            "default": 10,
+        }
+        | kwargs,
+    )
+
+
+def subscribe_fetch_rate(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--fetch-rate"],
+        {
+            "help": "With --senders, maximum number of transactions fetched per second.  Leave blank for no limit.",
+            "type": float,
+        }
+        | kwargs,
+    )
+
+
+def tx_hashes(*name_or_flags: str, **kwargs: Any) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["hash"],
+        {
+            "help": "hash of one or more transactions; use - to read them from stdin, one per line",
+            "nargs": "*",
+        }
+        | kwargs,
+    )
+
+
+def tx_hashes_file(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--file"],
+        {"help": "read the transaction hashes from this file, one per line"} | kwargs,
+    )
+
+
+def tx_fetch_concurrency(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--concurrency"],
+        {
+            "help": "number of transactions fetched at the same time, when fetching many",
+            "type": int,
+            "default": 8,
+        }
+        | kwargs,
+    )
+
+
+def tx_fetch_retries(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--retries"],
+        {
+            "help": "number of times a failed request is retried, with exponential backoff",
+            "type": int,
+            "default": 2,
+        }
+        | kwargs,
+    )
+
+
+def series_from_block(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return block(
+        *(name_or_flags or ["--from-block", "--from"]),
+        **{
+            "help": "Fetch a time series starting from this block, and print it as CSV",
+            "default": None,
+        }
+        | kwargs,
+    )
+
+
+def series_to_block(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return block(
+        *(name_or_flags or ["--to-block", "--to"]),
+        **{"help": "Last block of the time series, included"} | kwargs,
+    )
+
+
+def series_step(*name_or_flags: str, **kwargs: Any) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--step"],
+        {
+            "help": "Number of blocks between two points of the time series",
+            "type": int,
+            "default": 1,
+        }
+        | kwargs,
+    )
+
+
+def series_concurrency(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--concurrency"],
+        {
+            "help": "Number of requests made at the same time",
+            "type": int,
+            "default": 8,
+        }
+        | kwargs,
+    )
+
+
+def series_output(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["-o", "--output"],
+        {"help": "Write the CSV to this file instead of printing it"} | kwargs,
+    )
+
+
+def batch_file(*name_or_flags: str, **kwargs: Any) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--batch"],
+        {
+            "help": "make many transfers, reading them from this CSV file, with columns to, amount, ticker and optionally unit"
+        }
+        | kwargs,
+    )
+
+
+def batch_output(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["-o", "--output"],
+        {
+            "help": "write the results of the batch to this CSV file; by default, the batch file with a .results.csv suffix"
+        }
+        | kwargs,
+    )
+
+
+def batch_concurrency(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--concurrency"],
+        {
+            "help": "number of transactions broadcast at the same time",
+            "type": int,
+            "default": 4,
+        }
+        | kwargs,
+    )
+
+
+def batch_timeout(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--timeout"],
+        {
+            "help": "seconds to wait for the receipt of each transaction of the batch",
+            "type": float,
+            "default": 120,
+        }
+        | kwargs,
+    )
+
+
 def tg_message(*name_or_flags: str, **kwargs: Any) -> Tuple[List[str], dict[str, Any]]:
     return (
         list(name_or_flags) or ["--message"],
         {
-            "help": "Message to send to the Telegram chat.  Use {data} to place the notification data in the message.",
+            "help": "Message to send to the Telegram chat.  Use {data} to place the notification data in the message, {tx} for the transaction hash and {block} for the block number.  With --decode, use {event} for the event name, {args} for all of its arguments and {args.NAME} for a single argument.",
             "default": "🚨 *New notification from web3cli:*\n\n{data}",
         }
         | kwargs,
@@ -569,9 +1000,86 @@ def tg_silent(*name_or_flags: str, **kwargs: Any) -> Tuple[List[str], dict[str,
     )
 
 
+def tg_digest_window(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--digest-window"],
+        {
+            "help": "Group the Telegram notifications received within this many seconds into a single message, to avoid hitting the Telegram rate limits during bursts",
+            "type": float,
+        }
+        | kwargs,
+    )
+
+
+def tg_digest_count(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--digest-count"],
+        {
+            "help": "Group the Telegram notifications in messages of this many notifications.  Can be combined with --digest-window, in which case a message is sent when the first of the two limits is reached.",
+            "type": int,
+        }
+        | kwargs,
+    )
+
+
 def tg_args() -> List[Tuple[List[str], dict[str, Any]]]:
     """Shortcut for commands that send Telegram notifications"""
-    return [tg_message(), tg_silent()]
+    return [tg_message(), tg_silent(), tg_digest_window(), tg_digest_count()]
+
+
+def subscribe_jsonl(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--jsonl"],
+        {
+            "help": "Append notifications to this file, one JSON per line, with fields: notification_data, notification_type, tx_data and received_at.  Much faster than --print, use it together with --no-print to capture busy streams.",
+        }
+        | kwargs,
+    )
+
+
+def subscribe_jsonl_max_size(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--jsonl-max-size"],
+        {
+            "help": "Rotate the --jsonl file when it exceeds this size, in megabytes",
+            "type": float,
+        }
+        | kwargs,
+    )
+
+
+def subscribe_jsonl_max_age(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--jsonl-max-age"],
+        {
+            "help": "Rotate the --jsonl file when it is older than this many seconds",
+            "type": float,
+        }
+        | kwargs,
+    )
+
+
+def subscribe_jsonl_gzip(
+    *name_or_flags: str, **kwargs: Any
+) -> Tuple[List[str], dict[str, Any]]:
+    return (
+        list(name_or_flags) or ["--jsonl-gzip"],
+        {
+            "help": "Compress the rotated --jsonl files with gzip",
+            "action": "store_true",
+        }
+        | kwargs,
+    )
 
 
 def subscribe_actions() -> List[Tuple[List[str], dict[str, Any]]]:
@@ -580,6 +1088,65 @@ def subscribe_actions() -> List[Tuple[List[str], dict[str, Any]]]:
         subscribe_telegram(),
         subscribe_post(),
         subscribe_print(),
+        subscribe_jsonl(),
+        subscribe_jsonl_max_size(),
+        subscribe_jsonl_max_age(),
+        subscribe_jsonl_gzip(),
+    ]
+
+
+def subscribe_aggregate() -> List[Tuple[List[str], dict[str, Any]]]:
+    """Shortcut for commands that can aggregate notifications over time
+    windows"""
+    return [
+        subscribe_aggregate_window(),
+        subscribe_aggregate_slide(),
+        subscribe_aggregate_sum(),
+        subscribe_aggregate_top(),
+    ]
+
+
+def subscribe_fetch_args() -> List[Tuple[List[str], dict[str, Any]]]:
+    """Shortcut for commands that fetch transactions to filter them by sender"""
+    return [subscribe_fetch_concurrency(), subscribe_fetch_rate()]
+
+
+def subscribe_metrics() -> List[Tuple[List[str], dict[str, Any]]]:
+    """Shortcut for commands that can expose subscription metrics"""
+    return [subscribe_metrics_port(), subscribe_metrics_interval()]
+
+
+def tx_hashes_args() -> List[Tuple[List[str], dict[str, Any]]]:
+    """Shortcut for commands that fetch one or more transactions by hash"""
+    return [
+        tx_hashes(),
+        tx_hashes_file(),
+        tx_fetch_concurrency(),
+        tx_fetch_retries(),
+    ]
+
+
+def series_args() -> List[Tuple[List[str], dict[str, Any]]]:
+    """Shortcut for commands that can fetch a time series over a block range"""
+    return [
+        series_from_block(),
+        series_to_block(),
+        series_step(),
+        series_concurrency(),
+        series_output(),
+    ]
+
+
+def batch_args() -> List[Tuple[List[str], dict[str, Any]]]:
+    """Shortcut for commands that can make many transactions from a CSV file"""
+    return [
+        batch_file(),
+        batch_output(),
+        batch_concurrency(),
+        batch_timeout(),
+        tx_dry_run(),
+        tx_broadcast(),
+        tx_sign_to(),
     ]
 
 
@@ -591,7 +1158,14 @@ def signer_and_gas() -> List[Tuple[List[str], dict[str, Any]]]:
 def tx_args() -> List[Tuple[List[str], dict[str, Any]]]:
     """Shortcut for commands that want to use the
     send_contract_tx helper function"""
-    return [tx_return(), tx_dry_run(), tx_call(), tx_gas_limit()]
+    return [
+        tx_return(),
+        tx_dry_run(),
+        tx_call(),
+        tx_gas_limit(),
+        tx_broadcast(),
+        tx_sign_to(),
+    ]
 
 
 def chain_and_rpc() -> List[Tuple[List[str], dict[str, Any]]]:
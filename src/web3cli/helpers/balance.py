@@ -0,0 +1,48 @@
+"""Helper functions to print the balances of many addresses at many
+blocks"""
+
+import sys
+from typing import Any, Callable, List
+
+from web3 import Web3
+
+from web3cli.exceptions import Web3CliError
+from web3cli.framework.app import App
+from web3cli.helpers.args import parse_block_number
+from web3core.helpers.balances import (
+    BalanceGetter,
+    get_block_range,
+    iter_balances,
+    write_balances_csv,
+)
+
+
+def render_balance_series(
+    app: App,
+    w3: Web3,
+    get_balance: BalanceGetter,
+    addresses: List[str],
+    convert: Callable[[int], Any] = None,
+) -> None:
+    """Print as CSV the balances of the given addresses, at the blocks
+    selected with the arguments in args.series_args(), or at the block
+    given with --block if --from-block is not given.  Use --output to
+    write the CSV to a file instead."""
+    try:
+        if app.pargs.from_block is None:
+            blocks = [parse_block_number(app, w3, "block")]
+        else:
+            blocks = get_block_range(
+                parse_block_number(app, w3, "from_block"),
+                parse_block_number(app, w3, "to_block"),
+                app.pargs.step,
+            )
+    except ValueError as e:
+        raise Web3CliError(str(e))
+    balances = iter_balances(get_balance, addresses, blocks, app.pargs.concurrency)
+    if app.pargs.output:
+        with open(app.pargs.output, "w", newline="") as file:
+            n_rows = write_balances_csv(file, balances, convert)
+        app.log.info(f"Wrote {n_rows} balances to {app.pargs.output}")
+    else:
+        write_balances_csv(sys.stdout, balances, convert)
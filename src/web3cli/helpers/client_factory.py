@@ -1,4 +1,4 @@
-from typing import Any, Union, cast
+from typing import Any, Dict, Union, cast
 
 from web3client.base_client import BaseClient
 
@@ -8,9 +8,59 @@ from web3core.helpers.client_factory import (
     make_contract_client as make_contract_client_,
 )
 from web3core.helpers.client_factory import make_contract_client_from_address_and_abi
+from web3core.helpers.gas_cache import GasCache, open_gas_cache
+from web3core.helpers.head_cache import HeadCache, open_head_cache
+from web3core.helpers.rpc_cache import RpcCache, open_rpc_cache
 from web3core.models.contract import Contract
 
 
+def get_rpc_cache(app: App) -> RpcCache:
+    """Return the disk cache for immutable RPC responses, or None if
+    the cache is disabled in the config file or with --no-cache"""
+    if not app.get_option("rpc_cache") or getattr(app.pargs, "no_cache", False):
+        return None
+    return open_rpc_cache(
+        app.get_option("rpc_cache_file"),
+        int(app.get_option("rpc_cache_max_size") * 1e6),
+    )
+
+
+def get_head_cache(app: App) -> HeadCache:
+    """Return the cache shared among processes for head-dependent RPC
+    responses, or None if the cache is not enabled in the config file,
+    or disabled with --no-cache"""
+    if not app.get_option("head_cache") or getattr(app.pargs, "no_cache", False):
+        return None
+    return open_head_cache(app.get_option("head_cache_file"))
+
+
+def get_gas_cache(app: App) -> GasCache:
+    """Return the history of the gas used by past transactions, or None
+    if it is disabled in the config file or with --no-cache"""
+    if not app.get_option("gas_cache") or getattr(app.pargs, "no_cache", False):
+        return None
+    return open_gas_cache(app.get_option("gas_cache_file"))
+
+
+def get_gas_cache_args(app: App) -> Dict[str, Any]:
+    """Return the arguments of GasCache.get_gas_limit from the config"""
+    return {
+        "percentile": app.get_option("gas_cache_percentile"),
+        "margin": app.get_option("gas_cache_margin"),
+        "min_samples": app.get_option("gas_cache_min_samples"),
+    }
+
+
+def get_read_cache_args(app: App) -> Dict[str, Any]:
+    """Return the caching arguments of make_base_client for clients that
+    only read from the blockchain"""
+    return {
+        "rpc_cache": get_rpc_cache(app),
+        "head_cache": get_head_cache(app),
+        "head_cache_ttl": app.get_option("head_cache_ttl"),
+    }
+
+
 def make_client(app: App, log: bool = False, **client_args: Any) -> BaseClient:
     """Client suitable to read from the blockchain"""
     return cast(
@@ -19,7 +69,7 @@ def make_client(app: App, log: bool = False, **client_args: Any) -> BaseClient:
             chain=app.chain,
             node_uri=app.rpc.url,
             logger=app.log.info if log else None,
-            **client_args,
+            **(get_read_cache_args(app) | client_args),
         ),
     )
 
@@ -32,7 +82,7 @@ def make_wallet(app: App, log: bool = False, **client_args: Any) -> BaseClient:
         password=app.app_key,
         node_uri=app.rpc.url,
         logger=app.log.info if log else None,
-        **client_args,
+        **({"rpc_cache": get_rpc_cache(app)} | client_args),
     )
 
 
@@ -48,7 +98,7 @@ def make_contract_client(
         chain=app.chain,
         node_uri=app.rpc.url,
         logger=app.log.info if log else None,
-        **client_args,
+        **(get_read_cache_args(app) | client_args),
     )
 
 
@@ -66,7 +116,7 @@ def make_contract_wallet(
         password=app.app_key,
         node_uri=app.rpc.url,
         logger=app.log.info if log else None,
-        **client_args,
+        **({"rpc_cache": get_rpc_cache(app)} | client_args),
     )
 
 
@@ -81,7 +131,7 @@ def make_erc20_client_from_address(
         type="erc20",
         node_uri=app.rpc.url,
         logger=app.log.info if log else None,
-        **client_args,
+        **(get_read_cache_args(app) | client_args),
     )
 
 
@@ -98,5 +148,5 @@ def make_erc20_wallet_from_address(
         type="erc20",
         node_uri=app.rpc.url,
         logger=app.log.info if log else None,
-        **client_args,
+        **({"rpc_cache": get_rpc_cache(app)} | client_args),
     )
@@ -2,14 +2,28 @@
 to an arbitrary address"""
 
 from decimal import Decimal
-from typing import Union
+from typing import Any, Dict, List, Union
 
 from eth_typing.encoding import HexStr
 from web3 import Web3
+from web3.exceptions import ContractLogicError
+from web3.types import Nonce, TxParams, Wei
+from web3client.base_client import BaseClient
 
 from web3cli.exceptions import Web3CliError
 from web3cli.framework.app import App
-from web3cli.helpers.client_factory import make_contract_wallet, make_wallet
+from web3cli.helpers.client_factory import (
+    get_gas_cache,
+    get_gas_cache_args,
+    make_contract_wallet,
+    make_wallet,
+)
+from web3cli.helpers.tx import get_sign_to_nonces
+from web3core.helpers.batch import BatchRow, SignedBatchTx
+from web3core.helpers.gas_cache import get_gas_key
+from web3core.helpers.misc import to_number
+from web3core.helpers.nonce import NonceManager
+from web3core.helpers.parallel import iter_parallel
 from web3core.helpers.resolve import resolve_address
 from web3core.models.address import Address
 from web3core.models.contract import Contract
@@ -125,3 +139,129 @@ def send_erc20_token_in_token_units(
     decimals = client.functions.decimals().call()
     amount = int(Decimal(amount) * 10**decimals)
     return send_erc20_token_in_decimals(app, ticker, to, amount)
+
+
+def prepare_batch(
+    app: App,
+    wallet: BaseClient,
+    rows: List[BatchRow],
+    gas_margin: float = 1.2,
+    concurrency: int = 8,
+    nonce_manager: NonceManager = None,
+    sign_to: str = None,
+) -> List[SignedBatchTx]:
+    """Build and sign one transfer for each row of a batch, with
+    consecutive nonces.
+
+    Recipients are resolved once, token contracts are loaded and their
+    decimals fetched once per ticker, the gas fees are fetched once for
+    the whole batch, and the gas limits are estimated concurrently, or
+    taken from the gas cache for tokens transferred before.
+
+    If a nonce manager is given, the nonces are reserved with it;
+    otherwise they start from the pending nonce of the signer.  If the
+    transactions will be signed to a file, the nonces also follow those
+    of the signer already in the file."""
+    # Resolve recipients and tokens only once
+    recipients = {
+        to: resolve_address(to, [Address, Signer], chain=app.chain.name)
+        for to in set(row["to"] for row in rows)
+    }
+    tokens: Dict[str, Any] = {}
+    for ticker in set(row["ticker"].lower() for row in rows):
+        if ticker == app.chain.coin.lower():
+            continue
+        token = Contract.get_by_name_and_chain(ticker, app.chain.name)
+        if not token or not token.type in ("erc20", "weth"):
+            raise Web3CliError(
+                f"No ERC20 contract with name {ticker} on {app.chain.name}"
+            )
+        tokens[ticker] = make_contract_wallet(app, token)
+    decimals = {
+        ticker: client.functions.decimals().call()
+        for ticker, client in tokens.items()
+        if any(r["ticker"].lower() == ticker and not r["unit"] for r in rows)
+    }
+    # Build the transactions, without nonce and gas limit
+    template = wallet.build_base_tx(
+        nonce=Nonce(0), gas_limit=0, max_priority_fee_in_gwei=app.priority_fee
+    )
+    txs: List[TxParams] = []
+    for row in rows:
+        ticker = row["ticker"].lower()
+        to = recipients[row["to"]]
+        amount = to_number(row["amount"])
+        if ticker not in tokens:
+            tx: TxParams = {
+                "to": to,
+                "value": Web3.to_wei(amount, row["unit"] or "ether"),
+            }
+        else:
+            if not row["unit"]:
+                amount = int(Decimal(row["amount"]) * 10 ** decimals[ticker])
+            elif row["unit"] != "smallest" or type(amount) != int:
+                raise Web3CliError(
+                    f"Invalid amount {row['amount']} {row['unit']} for token {ticker}"
+                )
+            tx = {
+                "to": tokens[ticker].contract_address,
+                "value": Wei(0),
+                "data": tokens[ticker].contract.encodeABI(
+                    fn_name="transfer", args=[to, amount]
+                ),
+            }
+        txs.append(template | tx)
+    # Take gas limits from past transfers, if possible
+    gas_cache = get_gas_cache(app)
+    if gas_cache:
+        gas_cache_args = get_gas_cache_args(app)
+        for tx in txs:
+            key = get_gas_key(tx.get("data"))
+            if key:
+                gas_limit = gas_cache.get_gas_limit(
+                    app.chain.chain_id, tx["to"], key, **gas_cache_args  # type: ignore
+                )
+                if gas_limit:
+                    tx["gas"] = gas_limit
+    # Estimate the other gas limits concurrently
+    for tx, gas, error in iter_parallel(
+        lambda tx: wallet.w3.eth.estimate_gas(
+            {k: v for k, v in tx.items() if k in ("from", "to", "value", "data")}  # type: ignore
+        ),
+        [tx for tx in txs if not tx["gas"]],
+        concurrency,
+        retries=2,
+        no_retry=ContractLogicError,
+    ):
+        if error:
+            raise Web3CliError(
+                f"Could not estimate gas for transfer to {tx['to']!r}: {error}"
+            )
+        tx["gas"] = int(gas * gas_margin)
+    # Sign with consecutive nonces
+    if sign_to:
+        nonces = get_sign_to_nonces(app, wallet, sign_to, len(txs), nonce_manager)
+    elif nonce_manager:
+        nonces = nonce_manager.reserve_many(len(txs))
+    else:
+        first = wallet.w3.eth.get_transaction_count(
+            Web3.to_checksum_address(wallet.user_address), "pending"
+        )
+        nonces = list(range(first, first + len(txs)))
+    signed_txs: List[SignedBatchTx] = []
+    for row, tx, nonce in zip(rows, txs, nonces):
+        params = tx | {"nonce": Nonce(nonce)}
+        signed = wallet.sign_tx(params)
+        signed_txs.append(
+            {
+                "row": row,
+                "params": params,
+                "nonce": nonce,
+                "hash": Web3.to_hex(signed.hash),
+                "raw": Web3.to_hex(signed.rawTransaction),
+                "status": "signed",
+                "gas_used": None,
+                "error": None,
+            }
+        )
+    return signed_txs
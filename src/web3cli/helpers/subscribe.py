@@ -0,0 +1,448 @@
+"""Helper functions to build subscriptions and their callbacks, either
+from the CLI arguments or from a YAML configuration file"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, TypedDict
+
+import requests
+from web3.types import TxData
+from web3client.types import AsyncSubscriptionCallback, SubscriptionType
+
+from web3cli.exceptions import Web3CliError
+from web3cli.framework.app import App
+from web3cli.helpers import args
+from web3cli.helpers.render import render
+from web3cli.helpers.telegram import send_tg_message
+from web3core.helpers import yaml
+from web3core.helpers.aggregate import WindowAggregator
+from web3core.helpers.client_factory import make_base_client
+from web3core.helpers.events import DecodedLog, LogDecoder
+from web3core.helpers.jsonl import JsonlWriter
+from web3core.helpers.metrics import REGISTRY
+from web3core.helpers.misc import decode_escapes, replace_all
+from web3core.helpers.resolve import resolve_address
+from web3core.helpers.rpc import check_ws_or_raise, is_ws_or_ipc
+from web3core.helpers.subscribe import Subscription, shard_subscription
+from web3core.helpers.telegram import Digest
+from web3core.helpers.validation import is_valid_url
+from web3core.models.chain import Chain
+
+SUBSCRIPTION_TYPES: Dict[str, SubscriptionType] = {
+    "blocks": "newHeads",
+    "newHeads": "newHeads",
+    "pending": "newPendingTransactions",
+    "newPendingTransactions": "newPendingTransactions",
+    "events": "logs",
+    "logs": "logs",
+}
+"""Subscription types accepted in the configuration file, mapped to
+the corresponding eth_subscribe types"""
+
+JSONL_WRITERS: Dict[str, JsonlWriter] = {}
+"""Open JSONL files, by absolute path"""
+
+
+class SubscribeActions(TypedDict):
+    """What to do when a notification is received; see the
+    arguments in args.subscribe_actions() and args.tg_args()"""
+
+    print: bool
+    telegram: str
+    post: str
+    message: str
+    silent: bool
+    digest_window: float
+    digest_count: int
+    jsonl: str
+    jsonl_max_size: float
+    jsonl_max_age: float
+    jsonl_gzip: bool
+
+
+def get_actions_from_args(app: App) -> SubscribeActions:
+    """Return the actions requested via CLI arguments"""
+    return {
+        "print": app.pargs.print,
+        "telegram": app.pargs.telegram,
+        "post": app.pargs.post[0] if app.pargs.post else None,
+        "message": app.pargs.message,
+        "silent": app.pargs.silent,
+        "digest_window": app.pargs.digest_window,
+        "digest_count": app.pargs.digest_count,
+        "jsonl": app.pargs.jsonl,
+        "jsonl_max_size": app.pargs.jsonl_max_size,
+        "jsonl_max_age": app.pargs.jsonl_max_age,
+        "jsonl_gzip": app.pargs.jsonl_gzip,
+    }
+
+
+def get_actions_from_config(config: Dict[str, Any]) -> SubscribeActions:
+    """Return the actions requested for a subscription in the
+    configuration file, using the same defaults as the CLI"""
+    return {
+        "print": config.get("print", True),
+        "telegram": config.get("telegram"),
+        "post": config.get("post"),
+        "message": config.get("message", args.tg_message()[1]["default"]),
+        "silent": config.get("silent", False),
+        "digest_window": config.get("digest_window"),
+        "digest_count": config.get("digest_count"),
+        "jsonl": config.get("jsonl"),
+        "jsonl_max_size": config.get("jsonl_max_size"),
+        "jsonl_max_age": config.get("jsonl_max_age"),
+        "jsonl_gzip": config.get("jsonl_gzip", False),
+    }
+
+
+class AggregateOptions(TypedDict):
+    """How to aggregate notifications over time windows; see the
+    arguments in args.subscribe_aggregate()"""
+
+    window: float
+    slide: float
+    sum: List[str]
+    top: int
+
+
+def get_aggregate_options_from_args(app: App) -> AggregateOptions:
+    """Return the aggregation options given via CLI arguments"""
+    return {
+        "window": getattr(app.pargs, "aggregate_window", None),
+        "slide": getattr(app.pargs, "aggregate_slide", None),
+        "sum": getattr(app.pargs, "aggregate_sum", []),
+        "top": getattr(app.pargs, "aggregate_top", 10),
+    }
+
+
+def get_aggregate_options_from_config(config: Dict[str, Any]) -> AggregateOptions:
+    """Return the aggregation options for a subscription in the
+    configuration file"""
+    return {
+        "window": config.get("aggregate_window"),
+        "slide": config.get("aggregate_slide"),
+        "sum": config.get("aggregate_sum") or [],
+        "top": config.get("aggregate_top", 10),
+    }
+
+
+def make_notification_handler(
+    app: App,
+    actions: SubscribeActions,
+    aggregate: AggregateOptions,
+    chain: Chain,
+    decode: bool = False,
+) -> AsyncSubscriptionCallback:
+    """Return the function to invoke on each notification: either the
+    callback running the actions, or, if an aggregation window is given,
+    an aggregator that runs the actions once per window, on the
+    aggregates."""
+    if not aggregate["window"]:
+        return make_callback(app, actions, LogDecoder(chain.name) if decode else None)
+    callback = make_callback(app, actions)
+    aggregator = WindowAggregator(
+        lambda aggregates: callback(aggregates, "aggregate", None),  # type: ignore
+        window=aggregate["window"],
+        slide=aggregate["slide"],
+        sum_args=aggregate["sum"],
+        top=aggregate["top"],
+        decoder=LogDecoder(chain.name) if decode or aggregate["sum"] else None,
+        logger=app.log.error,
+    )
+    return aggregator.add
+
+
+def make_callback(
+    app: App, actions: SubscribeActions, decoder: LogDecoder = None
+) -> AsyncSubscriptionCallback:
+    """Return the callback to invoke when a notification is received,
+    based on the given actions.
+
+    If a decoder is given, logs are decoded and the decoded event is
+    added to the notification data, in the 'decoded' field.
+
+    If a digest window or count is given, Telegram messages are grouped
+    and sent together."""
+
+    if actions["post"] and not is_valid_url(actions["post"]):
+        raise Web3CliError(f"Invalid URL: {actions['post']}")
+
+    def send_telegram(msg: str) -> None:
+        with REGISTRY.timer("w3_callback_duration_seconds", action="telegram"):
+            send_tg_message(
+                app,
+                body=msg,
+                chat_id=(
+                    actions["telegram"] if actions["telegram"] != "config" else None
+                ),
+                disable_web_page_preview=True,
+                silent=actions["silent"],
+            )
+
+    digest = (
+        Digest(send_telegram, actions["digest_window"], actions["digest_count"])
+        if actions["telegram"] and (actions["digest_window"] or actions["digest_count"])
+        else None
+    )
+
+    writer = get_jsonl_writer(actions) if actions["jsonl"] else None
+
+    async def callback(data: Any, sub_type: SubscriptionType, tx: TxData) -> None:
+        # DECODE LOGS
+        decoded = decoder.decode(data) if decoder and sub_type == "logs" else None
+        if decoded:
+            data = data | {"decoded": decoded}
+        # JSONL CALLBACK
+        if writer:
+            with REGISTRY.timer("w3_callback_duration_seconds", action="jsonl"):
+                await writer.write_async(
+                    {
+                        "notification_data": data,
+                        "notification_type": sub_type,
+                        "tx_data": tx,
+                        "received_at": time.time(),
+                    }
+                )
+        # PRINT CALLBACK
+        if actions["print"]:
+            with REGISTRY.timer("w3_callback_duration_seconds", action="print"):
+                render(app, data)
+        # TELEGRAM CALLBACK
+        if actions["telegram"]:
+            # Find block number
+            try:
+                block = int(
+                    data.get("blockNumber", None) or data.get("number", None), 16
+                )
+            except:
+                block = None
+            # Find tx hash
+            try:
+                tx_hash = data.get("transactionHash", None)
+            except:
+                tx_hash = data if type(data) is str else None
+            # Replace placeholders in the message
+            placeholders = {
+                "{data}": json.dumps(data, indent=4),
+                "{tx}": tx_hash,
+                "{block}": block,
+            }
+            if decoded:
+                placeholders |= get_decoded_placeholders(decoded)
+            msg = replace_all(actions["message"], placeholders)
+            # Send the message, or add it to the digest
+            if digest:
+                await digest.add(decode_escapes(msg))
+            else:
+                await asyncio.to_thread(send_telegram, decode_escapes(msg))
+        # POST CALLBACK
+        if actions["post"]:
+            payload = {
+                "notification_data": data,
+                "notification_type": sub_type,
+                "tx_data": tx,
+            }
+            with REGISTRY.timer("w3_callback_duration_seconds", action="post"):
+                response = await asyncio.to_thread(
+                    requests.post,
+                    url=actions["post"],
+                    data=json.dumps(payload),
+                    headers={"Content-Type": "application/json"},
+                    timeout=app.get_option("post_callback_timeout"),
+                )
+            app.log.debug(f"POST callback response: {response.text}")
+            if response.status_code != 200:
+                app.log.error(
+                    f"POST callback failed with code {response.status_code} and response: {response.text}"
+                )
+
+    return callback
+
+
+def get_jsonl_writer(actions: SubscribeActions) -> JsonlWriter:
+    """Return the writer for the JSONL file in the given actions; the
+    writer is shared by all the subscriptions writing to the same file"""
+    path = os.path.abspath(os.path.expanduser(actions["jsonl"]))
+    if path not in JSONL_WRITERS:
+        JSONL_WRITERS[path] = JsonlWriter(
+            path,
+            max_bytes=(
+                int(actions["jsonl_max_size"] * 1024 * 1024)
+                if actions["jsonl_max_size"]
+                else None
+            ),
+            max_age=actions["jsonl_max_age"],
+            compress=actions["jsonl_gzip"],
+        )
+    return JSONL_WRITERS[path]
+
+
+def get_decoded_placeholders(decoded: DecodedLog) -> Dict[str, Any]:
+    """Return the message placeholders for a decoded event: {event},
+    {args} and {args.NAME} for each argument"""
+    placeholders: Dict[str, Any] = {
+        "{event}": decoded["event"],
+        "{args}": json.dumps(decoded["args"], indent=4),
+    }
+    for name, value in decoded["args"].items():
+        placeholders["{args." + name + "}"] = value
+    return placeholders
+
+
+def make_tx_fetch_args(
+    app: App,
+    chain: Chain,
+    senders: List[str],
+    full_txs: bool = False,
+    concurrency: int = 10,
+    rate: float = None,
+) -> Dict[str, Any]:
+    """Return the Subscription arguments needed to filter notifications by
+    transaction sender, or an empty dict if no sender is given"""
+    if not senders:
+        return {"full_txs": full_txs}
+    return {
+        "tx_from": [resolve_address(a, chain=chain.name) for a in senders],
+        "full_txs": full_txs,
+        "tx_fetch_concurrency": concurrency,
+        "tx_fetch_rate": rate,
+        "tx_on_fetch": lambda tx, data: app.log.debug(
+            f"Fetched tx {tx['hash'].hex()} from {tx['from']}"
+        ),
+        "tx_on_fetch_error": lambda e, data: app.log.warning(e),
+    }
+
+
+def make_subscription_from_args(app: App, type: SubscriptionType) -> Subscription:
+    """Build a subscription of the given type, on the chain and RPC
+    of the app, with actions and filters given via CLI arguments."""
+    check_ws_or_raise(app.rpc.url)
+    senders = getattr(app.pargs, "senders", [])
+    return Subscription(
+        rpc_url=app.rpc.url,
+        type=type,
+        on_notification=make_notification_handler(
+            app,
+            get_actions_from_args(app),
+            get_aggregate_options_from_args(app),
+            app.chain,
+            getattr(app.pargs, "decode", False),
+        ),
+        logs_addresses=[
+            resolve_address(a, chain=app.chain.name)
+            for a in getattr(app.pargs, "contracts", [])
+        ],
+        logs_topics=getattr(app.pargs, "topics", []),
+        reorgs=getattr(app.pargs, "reorgs", False),
+        confirmations=getattr(app.pargs, "confirmations", 0),
+        client=(
+            make_base_client(chain=app.chain, node_uri=app.rpc.url) if senders else None
+        ),
+        **make_tx_fetch_args(
+            app,
+            app.chain,
+            senders,
+            getattr(app.pargs, "full_txs", False),
+            getattr(app.pargs, "fetch_concurrency", 10),
+            getattr(app.pargs, "fetch_rate", None),
+        ),
+    )
+
+
+def make_subscriptions_from_config(app: App, filepath: str) -> List[Subscription]:
+    """Build the subscriptions declared in the given YAML file.
+
+    The file must contain a 'subscriptions' list, where each item
+    accepts the following keys:
+
+    - type: one of blocks, pending, events (required)
+    - name: label used in logs (optional)
+    - chain: chain name, defaults to the default chain
+    - rpc: websocket RPC url, defaults to the first websocket RPC of the chain
+    - contracts, topics: filters for 'events' subscriptions
+    - shard_size, shard_connections: how to split long lists of contracts
+    - senders: consider only transactions initiated by these addresses
+    - full_txs: ask for full transaction objects in 'pending' subscriptions
+    - fetch_concurrency, fetch_rate: limits on the transactions fetched
+      to filter by sender
+    - decode: whether to decode the events of 'events' subscriptions
+    - reorgs, confirmations: reorg handling for 'blocks' subscriptions
+    - aggregate_window, aggregate_slide, aggregate_sum, aggregate_top:
+      emit aggregates once per window instead of each notification
+    - print, telegram, post, message, silent, digest_window, digest_count,
+      jsonl, jsonl_max_size, jsonl_max_age, jsonl_gzip: same as the CLI
+      arguments
+    """
+    try:
+        config = yaml.load(filepath)
+    except Exception as e:
+        raise Web3CliError(f"Could not read subscriptions file '{filepath}': {e}")
+    if not isinstance(config, dict) or not config.get("subscriptions"):
+        raise Web3CliError(f"No 'subscriptions' list found in '{filepath}'")
+    subscriptions: List[Subscription] = []
+    for i, sub_config in enumerate(config["subscriptions"], start=1):
+        subscriptions += shard_subscription(
+            make_subscription_from_config(app, sub_config, i),
+            sub_config.get("shard_size", args.subscribe_shard_size()[1]["default"]),
+            sub_config.get("shard_connections", 1),
+        )
+    return subscriptions
+
+
+def make_subscription_from_config(
+    app: App, config: Dict[str, Any], index: int
+) -> Subscription:
+    """Build a subscription from one of the items of the
+    'subscriptions' list in the YAML file"""
+    name = config.get("name", f"subscription #{index}")
+    if config.get("type") not in SUBSCRIPTION_TYPES:
+        raise Web3CliError(
+            f"Invalid type for {name}: {config.get('type')}.  Must be one of: "
+            + ", ".join(SUBSCRIPTION_TYPES)
+        )
+    type = SUBSCRIPTION_TYPES[config["type"]]
+    chain = Chain.get_by_name_or_raise(
+        config.get("chain") or app.get_option("default_chain")
+    )
+    rpc_url = config.get("rpc") or pick_ws_rpc_url(chain)
+    check_ws_or_raise(rpc_url)
+    senders = config.get("senders") or []
+    return Subscription(
+        rpc_url=rpc_url,
+        type=type,
+        on_notification=make_notification_handler(
+            app,
+            get_actions_from_config(config),
+            get_aggregate_options_from_config(config),
+            chain,
+            config.get("decode", False),
+        ),
+        name=name,
+        logs_addresses=[
+            resolve_address(a, chain=chain.name) for a in config.get("contracts") or []
+        ],
+        logs_topics=config.get("topics") or [],
+        reorgs=config.get("reorgs", False),
+        confirmations=config.get("confirmations", 0),
+        client=make_base_client(chain=chain, node_uri=rpc_url) if senders else None,
+        **make_tx_fetch_args(
+            app,
+            chain,
+            senders,
+            config.get("full_txs", False),
+            config.get("fetch_concurrency", 10),
+            config.get("fetch_rate"),
+        ),
+    )
+
+
+def pick_ws_rpc_url(chain: Chain) -> str:
+    """Return the first websocket RPC of the given chain"""
+    for rpc in chain.get_rpcs():
+        if is_ws_or_ipc(rpc.url):
+            return rpc.url
+    raise Web3CliError(
+        f"No websocket RPC found for chain {chain.name}: add one with `w3 rpc add wss://... --chain {chain.name}` or specify it with the 'rpc' key"
+    )
@@ -24,6 +24,7 @@ def send_tg_message(
     api_key = app.get_option("telegram_api_key")
     chat_id = chat_id or app.get_option("telegram_chat_id")
     timeout = int(app.get_option("telegram_send_timeout")) or 5
+    rate_limit = float(app.get_option("telegram_rate_limit") or 0) or None
 
     if not api_key or not chat_id:
         raise Web3CliError(
@@ -39,6 +40,7 @@ def send_tg_message(
             chat_id=chat_id,
             timeout=timeout,
             disable_notifications=silent,
+            rate_limit=rate_limit,
             **kwargs,
         )
     except Exception as e:
@@ -1,12 +1,114 @@
-from typing import Any
+import json
+import os
+from typing import Any, Dict, List, Optional
 
+from web3 import Web3
+from web3._utils.encoding import Web3JsonEncoder
 from web3.contract.contract import ContractFunction
 from web3.types import Nonce, Wei
 from web3client.base_client import BaseClient
 
+from web3cli.exceptions import Web3CliError
 from web3cli.framework.app import App
 from web3cli.helpers import args
+from web3cli.helpers.client_factory import get_gas_cache, get_gas_cache_args
+from web3core.helpers.batch import (
+    get_next_signed_nonce,
+    make_signed_tx_record,
+    write_signed_txs,
+)
+from web3core.helpers.broadcast import is_http_url, rank_rpcs
+from web3core.helpers.nonce import NonceManager
+from web3core.helpers.stuck import WatchedTx
 from web3core.helpers.tx import send_contract_tx as _send_contract_tx
+from web3core.models.tx import Tx
+from web3core.types import BroadcastResult
+
+
+def get_nonce_manager(app: App, client: BaseClient) -> NonceManager:
+    """Return a nonce manager for the signer of the given client, on
+    the chain of the app"""
+    return NonceManager(
+        client.w3,
+        app.chain.name,
+        client.user_address,
+        os.path.expanduser(app.get_option("nonce_dir")),
+    )
+
+
+def get_sign_to_nonces(
+    app: App,
+    client: BaseClient,
+    path: str,
+    count: int,
+    nonce_manager: NonceManager = None,
+) -> List[int]:
+    """Return `count` consecutive nonces for transactions that will be
+    signed to the given file.  Signed transactions are not sent, so the
+    pending nonce does not move: the nonces follow both the pending
+    nonce and the highest nonce of the signer already in the file.  If a
+    nonce manager is given, the nonces are reserved with it."""
+    min_nonce = get_next_signed_nonce(path, app.chain.chain_id, client.user_address)
+    if nonce_manager:
+        return nonce_manager.reserve_many(count, min_nonce)
+    pending = client.w3.eth.get_transaction_count(
+        Web3.to_checksum_address(client.user_address), "pending"
+    )
+    first = max(pending, min_nonce or 0)
+    return list(range(first, first + count))
+
+
+def get_broadcast_urls(app: App) -> List[str]:
+    """Return the RPCs to send signed transactions to, according to the
+    --broadcast argument or the broadcast_rpcs option.  An empty list
+    means that transactions are sent only to the RPC of the app."""
+    value = getattr(app.pargs, "broadcast", None) or app.get_option("broadcast_rpcs")
+    if not value or str(value) == "0":
+        return []
+    urls = [app.rpc.url] + [r.url for r in app.chain.get_rpcs() if r.url != app.rpc.url]
+    urls = [url for url in urls if is_http_url(url)]
+    if str(value) == "all":
+        return urls
+    try:
+        n = int(value)
+    except ValueError:
+        raise Web3CliError(f"Invalid broadcast value '{value}': use 'all' or a number")
+    return rank_rpcs(urls)[:n]
+
+
+def log_broadcast(app: App, results: List[BroadcastResult]) -> None:
+    """Log which RPCs accepted a broadcast transaction"""
+    accepted = [r for r in results if r["accepted"]]
+    app.log.info(f"Transaction accepted by {len(accepted)} of {len(results)} RPCs")
+    for r in results:
+        if not r["accepted"]:
+            app.log.debug(f"RPC {r['url']} rejected the transaction: {r['error']}")
+
+
+def save_to_history(app: App, tx: Tx, watched: WatchedTx) -> None:
+    """Store the receipt of a watched transaction in the history.  If a
+    replacement was mined instead of the original transaction, the
+    replacement is added to the history, and its receipt is stored
+    with the original transaction too, so that it is not watched
+    again."""
+    if not watched["receipt"]:
+        return
+    receipt = json.dumps(dict(watched["receipt"]), cls=Web3JsonEncoder)
+    tx.receipt = receipt
+    tx.save()
+    if watched["hash"] == tx.hash:
+        return
+    Tx.upsert(
+        {
+            "hash": watched["hash"],
+            "chain": tx.chain,
+            "to": tx.to,
+            "from_": tx.from_,
+            "desc": f"Replacement of {tx.hash}",
+            "receipt": receipt,
+        },
+        logger=app.log.info,
+    )
 
 
 def send_contract_tx(
@@ -30,8 +132,18 @@ def send_contract_tx(
     dry_run, tx_return, tx_call, tx_gas_limit = args.parse_tx_args(
         app, dry_run_dest, tx_return_dest, tx_call_dest, tx_gas_limit_dest
     )
+    # Transactions signed to file are not sent
+    sign_to = getattr(app.pargs, "sign_to", None)
+    if sign_to:
+        if tx_return in ["data", "receipt"]:
+            raise Web3CliError(f"Cannot return '{tx_return}' with the 'sign-to' option")
+        dry_run = True
+    nonce_manager: Optional[NonceManager] = kwargs.pop(
+        "nonce_manager",
+        get_nonce_manager(app, client) if app.get_option("nonce_manager") else None,
+    )
     # Build args
-    fixed_args = {
+    fixed_args: Dict[str, Any] = {
         "client": client,
         "function": function,
         "dry_run": dry_run,
@@ -45,13 +157,37 @@ def send_contract_tx(
         "from_address": client.user_address,
         "gas_limit": tx_gas_limit,
         "max_priority_fee_in_gwei": app.priority_fee,
+        "nonce_manager": nonce_manager,
+        "broadcast_urls": get_broadcast_urls(app) if not dry_run else None,
+        "gas_cache": get_gas_cache(app),
+        "gas_cache_args": get_gas_cache_args(app),
     } | kwargs
     # Inform user
     app.log.debug(
         f"Sending tx '{function.fn_name}' [dry_run={dry_run}, value={value_in_wei}, nonce={nonce}, extra_args={extra_args}]..."
     )
+    # Transactions signed to file need a nonce, even if they are not sent
+    reserved = bool(sign_to and nonce is None and nonce_manager is not None)
+    if sign_to and nonce is None:
+        fixed_args["nonce"] = get_sign_to_nonces(
+            app, client, sign_to, 1, nonce_manager
+        )[0]
     # Send transaction
-    tx_life = _send_contract_tx(**(fixed_args | extra_args))
+    try:
+        tx_life = _send_contract_tx(**(fixed_args | extra_args))
+    except Exception as e:
+        if reserved and nonce_manager:
+            nonce_manager.fail(fixed_args["nonce"], e)
+        raise
+    if sign_to:
+        sig: Any = tx_life["sig"]
+        record = make_signed_tx_record(
+            tx_life["params"], sig["rawTransaction"], sig["hash"], function.fn_name
+        )
+        write_signed_txs(sign_to, [record])
+        app.log.info(f"Signed tx with nonce {record['nonce']} appended to {sign_to}")
+    if tx_life["broadcast"]:
+        log_broadcast(app, tx_life["broadcast"])
     # Return tx details according to tx_return
     if tx_return == "all":
         return tx_life
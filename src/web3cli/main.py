@@ -11,6 +11,7 @@ from web3cli import hooks
 from web3cli.controllers.abi_controller import AbiController
 from web3cli.controllers.app_key_controller import AppKeyController
 from web3cli.controllers.base_controller import BaseController
+from web3cli.controllers.broadcast_controller import BroadcastController
 from web3cli.controllers.call_controller import CallController
 from web3cli.controllers.config_controller import ConfigController
 from web3cli.controllers.crud.address_controller import AddressController
@@ -22,7 +23,9 @@ from web3cli.controllers.crud.signer_controller import SignerController
 from web3cli.controllers.db_controller import DbController
 from web3cli.controllers.debug_controller import DebugController
 from web3cli.controllers.defi.compound_v2_controller import CompoundV2Controller
+from web3cli.controllers.index_controller import IndexController
 from web3cli.controllers.keyfile_controller import KeyfileController
+from web3cli.controllers.logs_controller import LogsController
 from web3cli.controllers.misc_controller import MiscController
 from web3cli.controllers.replay_controller import ReplayController
 from web3cli.controllers.send_controller import SendController
@@ -46,15 +49,37 @@ CONFIG["web3cli"] = {
     "default_chain": "eth",
     "default_signer": None,
     "default_priority_fee": 0.0001,
+    "fee_history_blocks": 20,
+    "nonce_manager": True,
+    "nonce_dir": os.path.join(os.path.expanduser("~"), ".web3cli", "nonces"),
+    "broadcast_rpcs": 0,
     "db_file": os.path.join(
         os.path.expanduser("~"), ".web3cli", "database", "web3cli.sqlite"
     ),
     "populate_db": True,
+    "rpc_cache": True,
+    "rpc_cache_file": os.path.join(
+        os.path.expanduser("~"), ".web3cli", "cache", "rpc.sqlite"
+    ),
+    "rpc_cache_max_size": 100,
+    "head_cache": False,
+    "head_cache_file": os.path.join(
+        os.path.expanduser("~"), ".web3cli", "cache", "head.sqlite"
+    ),
+    "head_cache_ttl": None,
+    "gas_cache": True,
+    "gas_cache_file": os.path.join(
+        os.path.expanduser("~"), ".web3cli", "cache", "gas.sqlite"
+    ),
+    "gas_cache_percentile": 95,
+    "gas_cache_margin": 1.25,
+    "gas_cache_min_samples": 5,
     "output_table_format": "fancy_grid",
     "output_table_wrap": 33,
     "telegram_api_key": "",
     "telegram_chat_id": "",
     "telegram_send_timeout": 15,
+    "telegram_rate_limit": 1,
     "post_callback_timeout": 15,
 }
 
@@ -115,6 +140,7 @@ class Web3Cli(App):
             AppKeyController,
             MiscController,
             SendController,
+            BroadcastController,
             TxController,
             AbiController,
             CallController,
@@ -126,6 +152,8 @@ class Web3Cli(App):
             SubscribeController,
             DebugController,
             CompoundV2Controller,
+            LogsController,
+            IndexController,
         ]
 
         # database object & models
@@ -0,0 +1,125 @@
+"""Aggregate subscription notifications over time windows, so that
+results are emitted once per window instead of once per event"""
+
+import asyncio
+import time
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List
+
+from web3core.helpers.events import LogDecoder
+from web3core.types import Logger
+
+
+class Bucket:
+    """Aggregates of the notifications received in a time slice"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.counts: Counter[str] = Counter()
+        self.sums: Counter[str] = Counter()
+        self.senders: Counter[str] = Counter()
+
+    def merge(self, other: "Bucket") -> None:
+        self.count += other.count
+        self.counts.update(other.counts)
+        self.sums.update(other.sums)
+        self.senders.update(other.senders)
+
+
+class WindowAggregator:
+    """Aggregate notifications over tumbling windows, or over sliding
+    windows if slide is shorter than the window.  For each window, the
+    aggregator emits:
+
+    - count: the number of notifications;
+    - counts: the number of notifications by key, where the key is
+      'address:event' for logs (the topic0 is used if the event cannot
+      be decoded), and the recipient for transactions;
+    - sums: for each of the sum_args, the sum of its decoded values, by
+      'address:event.arg', e.g. the total volume of Transfer events
+      by token;
+    - top_senders: the `top` most frequent transaction senders, which
+      requires transaction data (full transactions or sender filters).
+
+    Notifications are added to slices of `slide` seconds, which are
+    merged when the window is emitted.  Errors raised by emit are passed
+    to the logger, and aggregation goes on.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[Dict[str, Any]], Awaitable[None]],
+        window: float,
+        slide: float = None,
+        sum_args: List[str] = None,
+        top: int = 10,
+        decoder: LogDecoder = None,
+        logger: Logger = None,
+    ) -> None:
+        self.emit = emit
+        self.window = window
+        self.slide = min(slide or window, window)
+        self.sum_args = sum_args or []
+        self.top = top
+        self.decoder = decoder
+        self.logger = logger or (lambda msg: None)
+        self.buckets: Deque[Bucket] = deque(
+            [Bucket()], maxlen=max(1, round(self.window / self.slide))
+        )
+        self.timer: asyncio.Task[None] = None
+
+    async def add(self, data: Any, sub_type: str, tx: Any) -> None:
+        """Add a notification; has the signature of a subscription
+        callback, so that it can be used as one"""
+        if self.timer is None:
+            self.timer = asyncio.create_task(self.run())
+        bucket = self.buckets[-1]
+        bucket.count += 1
+        if sub_type == "logs":
+            self.add_log(bucket, data)
+        if isinstance(data, dict) and "from" in data:
+            tx = data  # full transaction
+        if tx:
+            bucket.senders[tx["from"]] += 1
+            if sub_type != "logs":
+                bucket.counts[tx.get("to") or "contract creation"] += 1
+
+    def add_log(self, bucket: Bucket, log: Dict[str, Any]) -> None:
+        topics = log.get("topics") or []
+        decoded = self.decoder.decode(log) if self.decoder else None
+        event = decoded["event"] if decoded else (topics[0] if topics else "anonymous")
+        key = f"{log['address']}:{event}"
+        bucket.counts[key] += 1
+        if decoded:
+            for arg in self.sum_args:
+                value = decoded["args"].get(arg)
+                if isinstance(value, int) and not isinstance(value, bool):
+                    bucket.sums[f"{key}.{arg}"] += value
+
+    async def run(self) -> None:
+        """Emit the aggregates every slide seconds"""
+        while True:
+            await asyncio.sleep(self.slide)
+            try:
+                await self.emit(self.get_aggregates())
+            except Exception as e:
+                self.logger(f"Could not emit aggregates: {e}")
+            self.buckets.append(Bucket())
+
+    def get_aggregates(self) -> Dict[str, Any]:
+        """Return the aggregates of the current window"""
+        total = Bucket()
+        for bucket in self.buckets:
+            total.merge(bucket)
+        return {
+            "type": "aggregate",
+            "window": self.window,
+            "end": int(time.time()),
+            "count": total.count,
+            "counts": dict(total.counts.most_common()),
+            "sums": dict(total.sums),
+            "top_senders": [
+                {"address": a, "count": n}
+                for a, n in total.senders.most_common(self.top)
+            ],
+        }
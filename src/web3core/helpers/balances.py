@@ -0,0 +1,88 @@
+"""Fetch the balances of many addresses at many blocks"""
+
+import csv
+from typing import Any, Callable, Iterator, List, Sequence, TextIO, Tuple
+
+from web3 import Web3
+from web3.contract.contract import ContractFunction
+
+from web3core.helpers.parallel import iter_parallel
+
+BalanceGetter = Callable[[str, int], int]
+"""Function returning the balance in wei of an address at a block"""
+
+
+def get_block_range(from_block: int, to_block: int, step: int = 1) -> List[int]:
+    """Return the blocks between from_block and to_block, both included,
+    every `step` blocks.  The last block is always included, so that the
+    series ends at to_block."""
+    if step < 1:
+        raise ValueError(f"Step must be a positive integer, got {step}")
+    if from_block > to_block:
+        raise ValueError(f"From block {from_block} is after to block {to_block}")
+    blocks = list(range(from_block, to_block + 1, step))
+    if blocks[-1] != to_block:
+        blocks.append(to_block)
+    return blocks
+
+
+def make_coin_balance_getter(w3: Web3) -> BalanceGetter:
+    """Return a function that fetches the native coin balance of an
+    address at a block"""
+
+    def get_balance(address: str, block: int) -> int:
+        return w3.eth.get_balance(
+            Web3.to_checksum_address(address), block_identifier=block
+        )
+
+    return get_balance
+
+
+def make_token_balance_getter(balance_of: ContractFunction) -> BalanceGetter:
+    """Return a function that fetches the token balance of an address at
+    a block, given the balanceOf function of an ERC20 contract"""
+
+    def get_balance(address: str, block: int) -> int:
+        return balance_of(address).call(block_identifier=block)
+
+    return get_balance
+
+
+def iter_balances(
+    get_balance: BalanceGetter,
+    addresses: Sequence[str],
+    blocks: Sequence[int],
+    concurrency: int = 8,
+    retries: int = 2,
+) -> Iterator[Tuple[int, str, int]]:
+    """Yield a (block, address, balance) tuple for each block and address,
+    ordered by block and then by address.
+
+    Balances are fetched concurrently with a pool of `concurrency` threads,
+    and streamed without keeping the whole series in memory.  Failed
+    requests are retried; raise if a request fails after all retries."""
+    addresses = [Web3.to_checksum_address(a) for a in addresses]
+    points = ((block, address) for block in blocks for address in addresses)
+    for (block, address), balance, error in iter_parallel(
+        lambda point: get_balance(point[1], point[0]), points, concurrency, retries
+    ):
+        if error:
+            raise error
+        yield block, address, balance
+
+
+def write_balances_csv(
+    file: TextIO,
+    balances: Iterator[Tuple[int, str, int]],
+    convert: Callable[[int], Any] = None,
+) -> int:
+    """Write the given balances to a CSV file with columns block, address
+    and balance, optionally converting each balance with the given function.
+    Return the number of rows written."""
+    writer = csv.writer(file)
+    writer.writerow(["block", "address", "balance"])
+    n_rows = 0
+    for block, address, balance in balances:
+        writer.writerow([block, address, convert(balance) if convert else balance])
+        n_rows += 1
+    return n_rows
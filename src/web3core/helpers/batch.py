@@ -0,0 +1,270 @@
+"""Broadcast many pre-signed transactions, and track their receipts"""
+
+import csv
+import json
+import os
+import sys
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TypedDict,
+    TypeVar,
+    Union,
+)
+
+from eth_typing import HexStr
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.types import TxParams
+
+from web3core.helpers.broadcast import is_already_known_error
+from web3core.helpers.parallel import iter_parallel
+from web3core.helpers.receipts import ReceiptTracker
+
+BATCH_COLUMNS = ["to", "amount", "ticker", "unit"]
+"""Columns of a batch CSV file; unit is optional"""
+
+
+class BatchRow(TypedDict):
+    """A transfer to make, as read from a batch CSV file"""
+
+    to: str
+    amount: str
+    ticker: str
+    unit: str
+
+
+class SignedBatchTx(TypedDict):
+    """A pre-signed transaction of a batch, along with its result"""
+
+    row: BatchRow
+    params: TxParams
+    nonce: int
+    hash: HexStr
+    raw: HexStr
+    status: str
+    gas_used: int
+    error: str
+
+
+class SignedTxRecord(TypedDict):
+    """A pre-signed transaction saved to a JSONL file, to be broadcast
+    later, along with its result"""
+
+    chain_id: int
+    sender: str
+    to: str
+    nonce: int
+    gas: int
+    max_fee_per_gas: int
+    max_priority_fee_per_gas: int
+    gas_price: int
+    hash: HexStr
+    raw: HexStr
+    label: str
+    status: str
+    gas_used: int
+    error: str
+
+
+SIGNED_TX_KEYS = [
+    k
+    for k in SignedTxRecord.__annotations__.keys()
+    if k not in ("status", "gas_used", "error")
+]
+"""Keys of a signed transaction that are saved to file"""
+
+BroadcastableTx = TypeVar("BroadcastableTx", SignedBatchTx, SignedTxRecord)
+
+
+def read_batch_csv(path: str) -> List[BatchRow]:
+    """Read the transfers in the given CSV file, which must have a header
+    with at least the to, amount and ticker columns"""
+    with open(path, newline="") as file:
+        reader = csv.DictReader(file)
+        missing = {"to", "amount", "ticker"} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"Missing columns in {path}: {', '.join(sorted(missing))}")
+        rows: List[BatchRow] = []
+        for row in reader:
+            if not any((v or "").strip() for v in row.values()):
+                continue  # skip empty lines
+            rows.append(
+                {
+                    "to": row["to"].strip(),
+                    "amount": row["amount"].strip(),
+                    "ticker": row["ticker"].strip(),
+                    "unit": (row.get("unit") or "").strip(),
+                }
+            )
+    return rows
+
+
+def broadcast_batch(
+    w3: Web3,
+    txs: Sequence[BroadcastableTx],
+    concurrency: int = 4,
+    retries: int = 2,
+    send: Callable[[HexStr], Any] = None,
+) -> Iterator[BroadcastableTx]:
+    """Send the given signed transactions in nonce order, keeping at most
+    `concurrency` requests in flight, and yield each transaction with its
+    status set to 'sent' or 'failed'.
+
+    Errors meaning that the very same transaction is already in the
+    mempool count as success.  By default transactions are sent with
+    eth_sendRawTransaction; pass `send` to use another function."""
+    send = send or w3.eth.send_raw_transaction
+    ordered = sorted(txs, key=lambda tx: tx["nonce"])
+    for tx, _, error in iter_parallel(
+        lambda tx: send(tx["raw"]), ordered, concurrency, retries
+    ):
+        if error is None or is_already_known_error(error):
+            tx["status"] = "sent"
+        else:
+            tx["status"] = "failed"
+            tx["error"] = str(error)
+        yield tx
+
+
+def track_receipts(
+    w3: Web3,
+    txs: Sequence[BroadcastableTx],
+    timeout: float = 120,
+    concurrency: int = 8,
+    **kwargs: Any,
+) -> Iterator[BroadcastableTx]:
+    """Wait for the receipts of the given sent transactions, and yield
+    each transaction as soon as its status is 'success', 'reverted',
+    'unconfirmed' or 'timeout'; see ReceiptTracker for the other
+    arguments"""
+    by_hash: Dict[str, BroadcastableTx] = {tx["hash"]: tx for tx in txs}
+    tracker = ReceiptTracker(
+        w3, by_hash, timeout=timeout, concurrency=concurrency, **kwargs
+    )
+    for result in tracker.track():
+        tx = by_hash[result["hash"]]
+        tx["status"] = result["status"]
+        if result["receipt"]:
+            tx["gas_used"] = result["receipt"]["gasUsed"]
+        if result["error"]:
+            tx["error"] = result["error"]
+        yield tx
+
+
+def write_batch_results_csv(path: str, txs: Sequence[SignedBatchTx]) -> None:
+    """Write the results of a batch to a CSV file, one line per row of
+    the batch"""
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(
+            BATCH_COLUMNS + ["nonce", "hash", "status", "gas_used", "error"]
+        )
+        for tx in txs:
+            writer.writerow(
+                [tx["row"][c] for c in BATCH_COLUMNS]  # type: ignore
+                + [tx["nonce"], tx["hash"], tx["status"], tx["gas_used"], tx["error"]]
+            )
+
+
+def summarize_batch(txs: Sequence[BroadcastableTx]) -> Dict[str, int]:
+    """Return the number of transactions by status"""
+    summary: Dict[str, int] = {}
+    for tx in txs:
+        summary[tx["status"]] = summary.get(tx["status"], 0) + 1
+    return summary
+
+
+def make_signed_tx_record(
+    params: TxParams,
+    raw: Union[HexStr, bytes],
+    hash: Union[HexStr, bytes],
+    label: str = None,
+) -> SignedTxRecord:
+    """Return the record to save to file for the given signed transaction"""
+
+    def get_int(key: str) -> Optional[int]:
+        value = params.get(key)
+        return int(value) if value is not None else None  # type: ignore
+
+    return {
+        "chain_id": int(params["chainId"]),
+        "sender": str(params["from"]),
+        "to": str(params["to"]) if params.get("to") else None,
+        "nonce": int(params["nonce"]),
+        "gas": int(params["gas"]),
+        "max_fee_per_gas": get_int("maxFeePerGas"),
+        "max_priority_fee_per_gas": get_int("maxPriorityFeePerGas"),
+        "gas_price": get_int("gasPrice"),
+        "hash": Web3.to_hex(HexBytes(hash)),
+        "raw": Web3.to_hex(HexBytes(raw)),
+        "label": label,
+        "status": "signed",
+        "gas_used": None,
+        "error": None,
+    }
+
+
+def write_signed_txs(path: str, records: Iterable[SignedTxRecord]) -> None:
+    """Append the given signed transactions to a JSONL file"""
+    with open(path, "a") as file:
+        for record in records:
+            file.write(json.dumps({k: record[k] for k in SIGNED_TX_KEYS}) + "\n")  # type: ignore
+
+
+def read_signed_txs(path: str) -> List[SignedTxRecord]:
+    """Read the signed transactions in the given JSONL file; use - to
+    read them from stdin"""
+    file = sys.stdin if path == "-" else open(path)
+    try:
+        records: List[SignedTxRecord] = []
+        for n, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            missing = {"nonce", "hash", "raw"} - set(record)
+            if missing:
+                raise ValueError(
+                    f"Line {n} of {path} misses {', '.join(sorted(missing))}"
+                )
+            records.append(
+                {k: record.get(k) for k in SIGNED_TX_KEYS}  # type: ignore
+                | {"status": "signed", "gas_used": None, "error": None}
+            )
+        return records
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def get_next_signed_nonce(path: str, chain_id: int, sender: str) -> Optional[int]:
+    """Return the nonce that follows the highest nonce of the given sender
+    and chain in the given file of signed transactions, or None if the
+    file does not exist or has no such transactions"""
+    if not os.path.exists(path):
+        return None
+    nonces = [
+        int(r["nonce"])
+        for r in read_signed_txs(path)
+        if r["chain_id"] in (None, chain_id)
+        and str(r["sender"] or "").lower() == sender.lower()
+    ]
+    return max(nonces) + 1 if nonces else None
+
+
+def wait_for_block(w3: Web3, block: int, poll_interval: float = 0.1) -> int:
+    """Wait until the given block is mined, and return the head of the
+    chain.  The head is polled at short intervals, so that the wait ends
+    as close as possible to the new block."""
+    while True:
+        head = w3.eth.block_number
+        if head >= block:
+            return head
+        time.sleep(poll_interval)
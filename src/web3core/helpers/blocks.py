@@ -1,6 +1,10 @@
-from typing import Union
+from typing import Tuple, Union
 
+from web3 import Web3
 from web3._utils.blocks import select_method_for_block_identifier
+from web3.types import BlockIdentifier
+
+from web3core.models.block_sample import BlockSample
 
 BLOCK_PREDEFINED_IDENTIFIERS = {"latest", "pending", "earliest", "safe", "finalized"}
 
@@ -29,3 +33,52 @@ def is_valid_block_identifier(block_identifier: Union[str, int]) -> bool:
         return True
     except ValueError:
         return False
+
+
+def find_block_at(w3: Web3, chain: str, timestamp: int) -> int:
+    """Return the number of the first block with a timestamp equal to or
+    later than the given one.  Raise ValueError if the timestamp is
+    after the latest block.
+
+    The search interpolates between the known blocks closest to the
+    timestamp, falling back to bisection when interpolation does not
+    halve the interval.  The timestamps of the fetched blocks are cached
+    in the database, so that later searches on the same chain start
+    from tighter bounds and need only a few requests."""
+    before, after = BlockSample.get_bounds(chain, timestamp)
+    lo = (before.block, before.timestamp) if before else None
+    hi = (after.block, after.timestamp) if after else None
+    if hi is None:
+        hi = fetch_block_sample(w3, chain, "latest")
+        if hi[1] < timestamp:
+            raise ValueError(f"Timestamp {timestamp} is after the latest block")
+    if lo is None:
+        lo = fetch_block_sample(w3, chain, 0)
+        if lo[1] >= timestamp:
+            return lo[0]
+    bisect = False
+    while hi[0] - lo[0] > 1:
+        if bisect:
+            guess = (lo[0] + hi[0]) // 2
+        else:
+            ratio = (timestamp - lo[1]) / max(hi[1] - lo[1], 1)
+            guess = lo[0] + round(ratio * (hi[0] - lo[0]))
+        guess = min(max(guess, lo[0] + 1), hi[0] - 1)
+        width = hi[0] - lo[0]
+        sample = fetch_block_sample(w3, chain, guess)
+        if sample[1] < timestamp:
+            lo = sample
+        else:
+            hi = sample
+        bisect = hi[0] - lo[0] > width // 2
+    return hi[0]
+
+
+def fetch_block_sample(
+    w3: Web3, chain: str, block_identifier: BlockIdentifier
+) -> Tuple[int, int]:
+    """Fetch the given block, cache its timestamp, and return the
+    block number and timestamp"""
+    block = w3.eth.get_block(block_identifier)
+    BlockSample.save_sample(chain, block["number"], block["timestamp"])
+    return block["number"], block["timestamp"]
@@ -0,0 +1,93 @@
+"""Broadcast a signed transaction to many RPCs at once, so that it
+reaches more mempools, sooner"""
+
+import time
+from typing import Any, Dict, List, Sequence, Union
+
+from eth_typing import HexStr
+from hexbytes import HexBytes
+from web3 import Web3
+
+from web3core.exceptions import Web3CoreError
+from web3core.helpers.parallel import iter_parallel
+from web3core.types import BroadcastResult
+
+BROADCAST_W3S: Dict[str, Web3] = {}
+"""Clients used to broadcast, indexed by RPC url"""
+
+
+def get_broadcast_w3(url: str, timeout: float = 10) -> Web3:
+    """Return a bare client for the given HTTP RPC, creating it only once
+    per process"""
+    if url not in BROADCAST_W3S:
+        BROADCAST_W3S[url] = Web3(
+            Web3.HTTPProvider(url, request_kwargs={"timeout": timeout})
+        )
+    return BROADCAST_W3S[url]
+
+
+def is_http_url(url: str) -> bool:
+    return url.startswith("http://") or url.startswith("https://")
+
+
+def is_already_known_error(e: Any) -> bool:
+    """Whether the given exception means that the transaction was already
+    received by the node"""
+    message = str(e).lower()
+    return "already known" in message or "known transaction" in message
+
+
+def rank_rpcs(urls: Sequence[str], timeout: float = 5) -> List[str]:
+    """Return the given HTTP RPCs sorted by the latency of an
+    eth_blockNumber request, fastest first; RPCs that fail to respond
+    are left out"""
+
+    def ping(url: str) -> float:
+        start = time.monotonic()
+        get_broadcast_w3(url, timeout).eth.block_number
+        return time.monotonic() - start
+
+    latencies = {
+        url: latency
+        for url, latency, error in iter_parallel(ping, urls, max(len(urls), 1))
+        if error is None
+    }
+    return sorted(latencies, key=lambda url: latencies[url])
+
+
+def broadcast_raw_tx(
+    raw_tx: Union[HexStr, bytes], urls: Sequence[str], timeout: float = 10
+) -> List[BroadcastResult]:
+    """Send the given signed transaction to all the given HTTP RPCs at
+    the same time, and return the outcome for each of them, in the same
+    order as the urls.  RPCs that already know the transaction count as
+    accepting it."""
+    raw = HexBytes(raw_tx)
+    tx_hash = Web3.to_hex(Web3.keccak(raw))
+
+    def send(url: str) -> float:
+        start = time.monotonic()
+        try:
+            get_broadcast_w3(url, timeout).eth.send_raw_transaction(raw)
+        except Exception as e:
+            if not is_already_known_error(e):
+                raise
+        return time.monotonic() - start
+
+    return [
+        {
+            "url": url,
+            "accepted": error is None,
+            "hash": tx_hash,
+            "error": str(error) if error is not None else None,
+            "elapsed": elapsed,
+        }
+        for url, elapsed, error in iter_parallel(send, urls, max(len(urls), 1))
+    ]
+
+
+def raise_if_not_accepted(results: Sequence[BroadcastResult]) -> None:
+    """Raise if none of the RPCs accepted the transaction; the error of
+    the first RPC is used as message"""
+    if results and not any(r["accepted"] for r in results):
+        raise Web3CoreError(results[0]["error"])
@@ -4,6 +4,12 @@ from web3.types import ABI
 from web3client.base_client import BaseClient
 
 from web3core.exceptions import Web3CoreError
+from web3core.helpers.head_cache import HeadCache, construct_head_cache_middleware
+from web3core.helpers.rpc_cache import (
+    RpcCache,
+    construct_rpc_cache_middleware,
+    is_dev_rpc,
+)
 from web3core.models.chain import Chain
 from web3core.models.contract import Contract, ContractType
 from web3core.models.signer import Signer
@@ -18,6 +24,9 @@ def make_base_client(
     signer: Union[Signer, str] = None,
     password: bytes = None,
     logger: Logger = lambda msg: None,
+    rpc_cache: RpcCache = None,
+    head_cache: HeadCache = None,
+    head_cache_ttl: float = None,
     **client_args: Any,
 ) -> BaseClient:
     """Return a brand new client configured for the given blockchain.
@@ -27,6 +36,14 @@ def make_base_client(
     already initialized signer object.  The password is used to decrypt
     the signer's key.
 
+    Provide an RPC cache to serve immutable data, such as old blocks and
+    mined transactions, from disk instead of the network; it is not used
+    with local development chains, which can be reset.  Provide a head
+    cache to share head-dependent data, such as the latest block or the
+    gas price, with other processes for head_cache_ttl seconds (default:
+    the block time).  Do not use the head cache with clients that send
+    transactions.
+
     Pass chain=None to get a generic client, not bound to any chain."""
     if chain is None:
         client = base(node_uri=None, **client_args)
@@ -40,6 +57,20 @@ def make_base_client(
         client.tx_type = chain.tx_type
         middlewares = chain.middlewares.split(",") if chain.middlewares else []
         client.set_middlewares([Chain.parse_middleware(m) for m in middlewares])
+        if rpc_cache and not is_dev_rpc(chain.chain_id, node_uri):
+            client.w3.middleware_onion.inject(
+                construct_rpc_cache_middleware(rpc_cache, chain.chain_id),
+                "rpc_cache",
+                layer=0,
+            )
+        if head_cache:
+            client.w3.middleware_onion.inject(
+                construct_head_cache_middleware(
+                    head_cache, chain.chain_id, head_cache_ttl
+                ),
+                "head_cache",
+                layer=0,
+            )
     # Set signer, if provided
     if signer:
         if not password:
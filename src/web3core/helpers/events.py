@@ -0,0 +1,167 @@
+"""Decode raw event logs using the ABIs stored in the database"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Tuple, TypedDict, Union, cast
+
+import eth_abi
+from eth_utils import encode_hex, event_abi_to_log_topic
+from hexbytes import HexBytes
+from web3 import Web3
+from web3._utils.abi import abi_to_signature, is_address_type
+from web3.types import ABI, ABIEvent, LogReceipt
+
+from web3core.helpers.abi import filter_abi_by_type_and_name, get_type_strings
+from web3core.models.contract import Contract, ContractType
+
+
+class DecodedLog(TypedDict):
+    """An event log decoded with its ABI"""
+
+    event: str
+    signature: str
+    args: Dict[str, Any]
+
+
+class EventDecoder:
+    """Decoder for the logs of a single event, compiled once from
+    the event ABI, so that it can be reused on many logs"""
+
+    def __init__(self, abi: ABIEvent) -> None:
+        self.name = abi["name"]
+        self.signature = abi_to_signature(abi)
+        self.topic0 = encode_hex(event_abi_to_log_topic(cast(Dict[str, Any], abi)))
+        inputs = abi["inputs"]
+        types = get_type_strings(inputs)
+        self.indexed: List[Tuple[str, str]] = []
+        self.non_indexed: List[Tuple[str, str]] = []
+        for i, (input, type) in enumerate(zip(inputs, types)):
+            param = (input["name"] or f"arg{i}", type)
+            (self.indexed if input.get("indexed") else self.non_indexed).append(param)
+        self.non_indexed_types = [t for _, t in self.non_indexed]
+
+    def matches(self, topics: List[str]) -> bool:
+        """Whether a log with the given topics can be decoded with this
+        decoder.  Events with the same signature can differ in which
+        arguments are indexed, e.g. ERC20 and ERC721 Transfer events."""
+        return len(topics) == len(self.indexed) + 1
+
+    def decode(self, log: Union[LogReceipt, Mapping[str, Any]]) -> DecodedLog:
+        """Decode the given raw log, as returned by eth_subscribe or
+        eth_getLogs"""
+        args: Dict[str, Any] = {}
+        for (name, type), topic in zip(self.indexed, log["topics"][1:]):
+            if is_dynamic_type(type):
+                # Indexed dynamic values are stored as their keccak hash
+                args[name] = to_hex(topic)
+            else:
+                args[name] = to_json_value(
+                    type, eth_abi.decode([type], HexBytes(topic))[0]
+                )
+        values = eth_abi.decode(self.non_indexed_types, HexBytes(log["data"]))
+        for (name, type), value in zip(self.non_indexed, values):
+            args[name] = to_json_value(type, value)
+        return {"event": self.name, "signature": self.signature, "args": args}
+
+
+class LogDecoder:
+    """Decode the logs emitted on the given chain.
+
+    The event ABI is looked up first in the ABI of the emitting contract,
+    if it is stored in the database, and then in an index mapping topic0
+    to event ABIs, built from all the stored contracts and contract types.
+
+    Decoders are compiled once per (address, topic0) pair, and kept in
+    an LRU cache of the given size."""
+
+    def __init__(self, chain: str, cache_size: int = 1024) -> None:
+        self.chain = chain
+        self._topic_index: Dict[str, List[EventDecoder]] = None
+        self.get_decoder = lru_cache(maxsize=cache_size)(self._get_decoder)
+
+    def decode(self, log: Union[LogReceipt, Mapping[str, Any]]) -> DecodedLog:
+        """Decode the given raw log; return None if no ABI is found
+        for it, or if decoding fails"""
+        topics = [to_hex(t) for t in log.get("topics", [])]
+        if not topics:
+            return None  # anonymous event
+        decoder = self.get_decoder(log["address"].lower(), topics[0], len(topics))
+        if decoder is None:
+            return None
+        try:
+            return decoder.decode(log)
+        except Exception:
+            return None
+
+    def _get_decoder(self, address: str, topic0: str, n_topics: int) -> EventDecoder:
+        """Return a decoder for logs with the given address, topic0 and
+        number of topics, or None if no matching event ABI is found"""
+        topics = [topic0] + [""] * (n_topics - 1)
+        contract = Contract.get_by_address_and_chain(address, self.chain)
+        if contract:
+            try:
+                abi = contract.resolve_abi()
+            except Exception:
+                abi = []
+            for decoder in make_event_decoders(abi):
+                if decoder.topic0 == topic0 and decoder.matches(topics):
+                    return decoder
+        for decoder in self.get_topic_index().get(topic0, []):
+            if decoder.matches(topics):
+                return decoder
+        return None
+
+    def get_topic_index(self) -> Dict[str, List[EventDecoder]]:
+        """Return a dictionary mapping topic0 to the decoders of all
+        events found in the ABIs of the stored contracts and contract
+        types.  The index is built on first use."""
+        if self._topic_index is None:
+            abis: List[ABI] = [c.abi for c in ContractType.select()]
+            abis += [
+                c.abi
+                for c in Contract.select().where(
+                    (Contract.chain == self.chain) & (Contract.abi.is_null(False))
+                )
+            ]
+            self._topic_index = {}
+            seen = set()
+            for abi in abis:
+                for decoder in make_event_decoders(abi):
+                    key = (decoder.signature, len(decoder.indexed))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    self._topic_index.setdefault(decoder.topic0, []).append(decoder)
+        return self._topic_index
+
+
+def make_event_decoders(abi: ABI) -> List[EventDecoder]:
+    """Return a decoder for each of the non-anonymous events in the
+    given ABI"""
+    return [
+        EventDecoder(cast(ABIEvent, event_abi))
+        for event_abi in filter_abi_by_type_and_name(abi, "event")
+        if event_abi["type"] == "event" and not event_abi.get("anonymous")
+    ]
+
+
+def is_dynamic_type(type: str) -> bool:
+    """Whether values of the given ABI type are hashed when indexed"""
+    return type in ("string", "bytes") or type.endswith("]") or type.startswith("(")
+
+
+def to_hex(value: Any) -> str:
+    """Convert bytes or hex strings to a lowercase 0x-prefixed hex string"""
+    if isinstance(value, (bytes, bytearray)):
+        return encode_hex(value)
+    return value.lower() if value.startswith("0x") else "0x" + value.lower()
+
+
+def to_json_value(type: str, value: Any) -> Any:
+    """Convert a value decoded by eth_abi into a JSON-serializable one"""
+    if isinstance(value, (bytes, bytearray)):
+        return encode_hex(value)
+    if isinstance(value, (list, tuple)):
+        return [to_json_value("", v) for v in value]
+    if is_address_type(type) and isinstance(value, str):
+        return Web3.to_checksum_address(value)
+    return value
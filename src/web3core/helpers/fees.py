@@ -0,0 +1,119 @@
+"""Gas fee statistics from the eth_feeHistory method"""
+
+import re
+import time
+from statistics import median
+from typing import Any, Dict, List, Sequence, Tuple, TypedDict
+
+from web3 import Web3
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+FEE_HISTORY_CACHE: Dict[Tuple[Any, ...], Tuple[float, "FeeStats"]] = {}
+"""Fee statistics indexed by (chain, blocks, percentiles), along with
+the time they were fetched"""
+
+
+class FeeStats(TypedDict):
+    """Summary of the fees paid over a window of recent blocks"""
+
+    oldest_block: int
+    newest_block: int
+    base_fees: List[float]
+    next_base_fee: float
+    base_fee_trend: float
+    gas_used_ratio: float
+    priority_fees: Dict[str, float]
+
+
+def get_fee_stats(
+    w3: Web3,
+    chain: str,
+    blocks: int = 20,
+    percentiles: Sequence[int] = DEFAULT_PERCENTILES,
+    ttl: float = 10,
+) -> FeeStats:
+    """Return statistics on the fees paid over the last `blocks` blocks,
+    using a single eth_feeHistory call.  All fees are in gwei.
+
+    - base_fees: base fee of each block in the window
+    - next_base_fee: base fee of the next block
+    - base_fee_trend: percentage change of the base fee over the window,
+      including the next block
+    - priority_fees: for each requested percentile, the median across
+      blocks of the priority fee paid at that percentile.  Empty blocks
+      are ignored, because nodes report a zero reward for them.
+
+    Results are cached in memory for `ttl` seconds, so that repeated calls
+    within a short time do not hit the RPC."""
+    percentiles = tuple(sorted(set(percentiles)))
+    key = (chain, blocks, percentiles)
+    cached = FEE_HISTORY_CACHE.get(key)
+    if ttl and cached and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    history = w3.eth.fee_history(blocks, "latest", list(percentiles))
+    stats = make_fee_stats(history, percentiles)
+    FEE_HISTORY_CACHE[key] = (time.monotonic(), stats)
+    return stats
+
+
+def make_fee_stats(history: Any, percentiles: Sequence[int]) -> FeeStats:
+    """Summarize the response of eth_feeHistory; see get_fee_stats"""
+    base_fees = [to_gwei(f) for f in history["baseFeePerGas"]]
+    gas_used_ratios = list(history["gasUsedRatio"])
+    rewards = [
+        reward
+        for reward, ratio in zip(history.get("reward") or [], gas_used_ratios)
+        if ratio > 0
+    ]
+    oldest_block = int(history["oldestBlock"])
+    return {
+        "oldest_block": oldest_block,
+        "newest_block": oldest_block + len(gas_used_ratios) - 1,
+        "base_fees": base_fees[:-1],
+        "next_base_fee": base_fees[-1],
+        "base_fee_trend": (
+            round((base_fees[-1] - base_fees[0]) / base_fees[0] * 100, 2)
+            if base_fees[0]
+            else 0.0
+        ),
+        "gas_used_ratio": (
+            round(sum(gas_used_ratios) / len(gas_used_ratios), 4)
+            if gas_used_ratios
+            else 0.0
+        ),
+        "priority_fees": {
+            f"p{p}": median(to_gwei(r[i]) for r in rewards) if rewards else 0.0
+            for i, p in enumerate(percentiles)
+        },
+    }
+
+
+def get_priority_fee(
+    w3: Web3, chain: str, percentile: int, blocks: int = 20, ttl: float = 10
+) -> float:
+    """Return the priority fee in gwei paid at the given percentile over
+    the last `blocks` blocks"""
+    percentiles = set(DEFAULT_PERCENTILES) | {percentile}
+    stats = get_fee_stats(w3, chain, blocks, tuple(percentiles), ttl)
+    return stats["priority_fees"][f"p{percentile}"]
+
+
+def parse_percentile(value: Any) -> int:
+    """Return the percentile in a string like 'p50', or None if the
+    given value is not in that form.  Raise ValueError if the percentile
+    is not between 0 and 100."""
+    match = re.fullmatch(r"p(\d+)", str(value).strip().lower())
+    if not match:
+        return None
+    percentile = int(match.group(1))
+    if percentile > 100:
+        raise ValueError(f"Percentile must be between 0 and 100, got {value}")
+    return percentile
+
+
+def to_gwei(value: Any) -> float:
+    """Convert a wei amount, either int or hex string, to gwei"""
+    if isinstance(value, str):
+        value = int(value, 16)
+    return float(Web3.from_wei(value, "gwei"))
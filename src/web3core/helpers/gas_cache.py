@@ -0,0 +1,195 @@
+"""Remember how much gas the functions of a contract actually used, so
+that the gas limit of new transactions can be set without an
+eth_estimateGas request"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from eth_abi import decode
+from eth_utils import function_signature_to_4byte_selector
+from hexbytes import HexBytes
+from web3 import Web3
+
+NEW_SLOT_SIGNATURES = [
+    "transfer(address,uint256)",
+    "transferFrom(address,address,uint256)",
+    "approve(address,uint256)",
+    "deposit()",
+]
+"""Functions that may write a storage slot that was zero, such as the
+balance of a new holder or an allowance that was not set, and then cost
+much more gas than usual.  Their gas limit is based on the most
+expensive past transaction, plus the cost of writing a new slot."""
+
+NEW_SLOT_GAS = 20000
+"""Gas to write a storage slot that was zero (EIP-2200)"""
+
+SWAP_SIGNATURES = [
+    "swapExactTokensForTokens(uint256,uint256,address[],address,uint256)",
+    "swapTokensForExactTokens(uint256,uint256,address[],address,uint256)",
+    "swapExactETHForTokens(uint256,address[],address,uint256)",
+    "swapETHForExactTokens(uint256,address[],address,uint256)",
+    "swapExactTokensForETH(uint256,uint256,address[],address,uint256)",
+    "swapTokensForExactETH(uint256,uint256,address[],address,uint256)",
+]
+"""Uniswap V2 router functions, whose gas grows with the number of
+tokens in the swap path: their history is kept per path length"""
+
+
+def get_4byte_selector(signature: str) -> str:
+    return Web3.to_hex(function_signature_to_4byte_selector(signature))
+
+
+NEW_SLOT_SELECTORS = {get_4byte_selector(s) for s in NEW_SLOT_SIGNATURES}
+
+SWAP_TYPES = {
+    get_4byte_selector(s): s[s.index("(") + 1 : -1].split(",") for s in SWAP_SIGNATURES
+}
+"""Argument types of the swap functions, indexed by selector"""
+
+GAS_CACHES: Dict[str, "GasCache"] = {}
+"""Open caches indexed by file path"""
+
+
+def get_selector(data: Union[str, bytes, None]) -> Optional[str]:
+    """Return the function selector of the given transaction data, as a
+    lowercase hex string, or None if the data is too short to have one"""
+    if not data:
+        return None
+    data = HexBytes(data)
+    if len(data) < 4:
+        return None
+    return Web3.to_hex(data[:4])
+
+
+def get_gas_key(data: Union[str, bytes, None]) -> Optional[str]:
+    """Return the key of the gas history for a transaction with the given
+    data: the function selector, followed by the length of the path for
+    swaps, e.g. '0x38ed1739:3'.  Return None if the data does not call a
+    function, or if its arguments cannot be decoded."""
+    selector = get_selector(data)
+    if selector not in SWAP_TYPES:
+        return selector
+    types = SWAP_TYPES[selector]
+    try:
+        args = decode(types, HexBytes(data)[4:])
+    except Exception:
+        return None
+    return f"{selector}:{len(args[types.index('address[]')])}"
+
+
+def get_percentile(values: Sequence[int], percentile: float) -> int:
+    """Return the given percentile of the values, using the nearest-rank
+    method, so that the result is always one of the values"""
+    values = sorted(values)
+    rank = math.ceil(percentile / 100 * len(values))
+    return values[min(max(rank, 1), len(values)) - 1]
+
+
+class GasCache:
+    """History of the gas used by past transactions, indexed by chain,
+    contract address and function selector, backed by a SQLite file, so
+    that it can be shared among processes.
+
+    Use add() to record the gas used by a mined transaction, and
+    get_gas_limit() to get a gas limit for the next one."""
+
+    def __init__(self, path: str, max_samples: int = 50, timeout: float = 5) -> None:
+        self.path = path
+        self.max_samples = max_samples
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS gas_used ("
+            "chain_id INTEGER NOT NULL, contract TEXT NOT NULL, selector TEXT NOT NULL, "
+            "gas_used INTEGER NOT NULL, recorded_at REAL NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS gas_used_key ON gas_used "
+            "(chain_id, contract, selector, recorded_at)"
+        )
+
+    def add(self, chain_id: int, contract: str, key: str, gas_used: int) -> None:
+        """Record the gas used by a transaction to the function with the
+        given key, as returned by get_gas_key; only the most recent
+        max_samples records are kept for each function"""
+        row = (chain_id, contract.lower(), key.lower())
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                self.db.execute(
+                    "INSERT INTO gas_used (chain_id, contract, selector, gas_used, recorded_at) VALUES (?, ?, ?, ?, ?)",
+                    row + (int(gas_used), time.time()),
+                )
+                self.db.execute(
+                    "DELETE FROM gas_used WHERE chain_id = ? AND contract = ? AND selector = ? AND rowid NOT IN ("
+                    "SELECT rowid FROM gas_used WHERE chain_id = ? AND contract = ? AND selector = ? "
+                    "ORDER BY recorded_at DESC LIMIT ?)",
+                    row + row + (self.max_samples,),
+                )
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+
+    def add_tx(self, chain_id: int, tx: Any, gas_used: int) -> bool:
+        """Record the gas used by a successful transaction, given its
+        parameters.  Return False if the transaction did not call a
+        contract function, and there is nothing to record."""
+        key = get_gas_key(tx.get("data") or tx.get("input"))
+        if not key or not tx.get("to"):
+            return False
+        self.add(chain_id, tx["to"], key, gas_used)
+        return True
+
+    def get_samples(self, chain_id: int, contract: str, key: str) -> List[int]:
+        """Return the gas used by the recorded transactions to the function
+        with the given key, most recent first"""
+        rows = self.db.execute(
+            "SELECT gas_used FROM gas_used WHERE chain_id = ? AND contract = ? AND selector = ? "
+            "ORDER BY recorded_at DESC LIMIT ?",
+            (chain_id, contract.lower(), key.lower(), self.max_samples),
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_gas_limit(
+        self,
+        chain_id: int,
+        contract: str,
+        key: str,
+        percentile: float = 95,
+        margin: float = 1.25,
+        min_samples: int = 5,
+    ) -> Optional[int]:
+        """Return a gas limit for a new transaction to the given function,
+        as the given percentile of the gas used by past transactions,
+        times the safety margin; the key is the one from get_gas_key.
+        Return None if fewer than min_samples transactions were recorded.
+
+        For functions that may write a new storage slot, past transactions
+        may have been cheap only because the slot was already set: the gas
+        limit is the most expensive of them plus the cost of a new slot,
+        times the safety margin."""
+        samples = self.get_samples(chain_id, contract, key)
+        if not samples or len(samples) < max(min_samples, 1):
+            return None
+        if key.split(":")[0].lower() in NEW_SLOT_SELECTORS:
+            return int((max(samples) + NEW_SLOT_GAS) * margin)
+        return int(get_percentile(samples, percentile) * margin)
+
+
+def open_gas_cache(path: str) -> GasCache:
+    """Return the cache stored in the given file, opening it only once
+    per process"""
+    path = os.path.abspath(os.path.expanduser(path))
+    if path not in GAS_CACHES:
+        GAS_CACHES[path] = GasCache(path)
+    return GAS_CACHES[path]
@@ -0,0 +1,258 @@
+"""Share head-dependent RPC responses, such as the latest block number
+or the gas price, among processes for about one block time"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from web3 import Web3
+from web3.types import Middleware, RPCEndpoint, RPCResponse
+
+BLOCK_TIMES: Dict[int, float] = {
+    1: 12,  # eth
+    56: 3,  # bnb
+    43114: 2,  # avax
+    25: 6,  # cro
+    100: 5,  # gno
+    250: 1,  # fantom
+    146: 1,  # sonic
+    137: 2,  # matic
+    42161: 0.25,  # arb
+    324: 1,  # era
+    280: 1,  # erat
+    10: 2,  # op
+    534352: 3,  # scroll
+    8453: 2,  # base
+    169: 2,  # manta
+}
+"""Approximate block time in seconds, indexed by chain ID"""
+
+DEFAULT_BLOCK_TIME = 2
+"""Block time for chains not in BLOCK_TIMES"""
+
+HEAD_METHODS: Dict[str, Optional[int]] = {
+    "eth_blockNumber": None,
+    "eth_gasPrice": None,
+    "eth_maxPriorityFeePerGas": None,
+    "eth_getBlockByNumber": 0,
+    "eth_getTransactionCount": 1,
+    "eth_feeHistory": 1,
+}
+"""Methods whose response depends only on the head of the chain, with
+the position of their block parameter, if any.  Methods with a block
+parameter are cached only when the block is 'latest' or 'pending'."""
+
+HEAD_BLOCKS = {"latest", "pending"}
+
+HEAD_CACHES: Dict[str, "HeadCache"] = {}
+"""Open caches indexed by file path"""
+
+
+def get_block_time(chain_id: int) -> float:
+    return BLOCK_TIMES.get(chain_id, DEFAULT_BLOCK_TIME)
+
+
+class HeadCache:
+    """Store of RPC results that expire after a short time, backed by a
+    SQLite file, so that it can be shared among processes.
+
+    Use fetch() to get a result: if it is not cached, only one process
+    makes the request, while the others wait for it and then read the
+    stored result.  The process making the request holds a lease on the
+    key, so that the database is not locked during the request; if the
+    process dies, the lease expires after `lease` seconds."""
+
+    def __init__(
+        self,
+        path: str,
+        timeout: float = 5,
+        lease: float = 10,
+        poll_interval: float = 0.01,
+    ) -> None:
+        self.path = path
+        self.lease = lease
+        self.poll_interval = poll_interval
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, result TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            "key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    @staticmethod
+    def get_key(chain_id: int, method: str, params: Any) -> str:
+        return json.dumps([chain_id, method, params], sort_keys=True)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result with the given key, or None if it is
+        not cached or expired"""
+        row = self.db.execute(
+            "SELECT result FROM responses WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def fetch(self, key: str, ttl: float, request: Callable[[], Any]) -> Any:
+        """Return the cached result with the given key; if it is not
+        cached, call the given function to get it, and cache it for
+        `ttl` seconds.  Results that are None are not cached.
+
+        The request is made at most once: if the result cannot be
+        stored, it is returned anyway."""
+        with self.lock:
+            return self._fetch(key, ttl, request)
+
+    def _fetch(self, key: str, ttl: float, request: Callable[[], Any]) -> Any:
+        result = self.get(key)
+        if result is not None:
+            return result
+        owner = uuid.uuid4().hex
+        while True:
+            result, leased = self.acquire_lease(key, owner)
+            if result is not None:
+                return result
+            if leased:
+                break
+            # Another process is making the request
+            time.sleep(self.poll_interval)
+        try:
+            result = request()
+        except BaseException:
+            self.release_lease(key, owner)
+            raise
+        try:
+            self.store(key, owner, result, ttl)
+        except (TypeError, sqlite3.Error):
+            self.release_lease(key, owner)
+        return result
+
+    def acquire_lease(self, key: str, owner: str) -> Tuple[Optional[Any], bool]:
+        """Take the lease on the given key, unless another process holds
+        it.  Return the cached result, if it was stored in the meantime,
+        and whether the lease was taken."""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            result = self.get(key)
+            leased = False
+            if result is None:
+                now = time.time()
+                row = self.db.execute(
+                    "SELECT 1 FROM leases WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+                if not row:
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                        (key, owner, now + self.lease),
+                    )
+                    leased = True
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return result, leased
+
+    def release_lease(self, key: str, owner: str) -> None:
+        """Release the lease on the given key, if we still hold it;
+        errors are ignored, since the lease expires anyway"""
+        try:
+            self.db.execute(
+                "DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner)
+            )
+        except sqlite3.Error:
+            pass
+
+    def store(self, key: str, owner: str, result: Any, ttl: float) -> None:
+        """Cache the given result, unless it is None, and release the
+        lease on its key"""
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            if result is not None:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO responses (key, result, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(result), now + ttl),
+                )
+                self.db.execute(
+                    "DELETE FROM responses WHERE expires_at < ?", (now - 60,)
+                )
+            self.db.execute(
+                "DELETE FROM leases WHERE (key = ? AND owner = ?) OR expires_at < ?",
+                (key, owner, now - 60),
+            )
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+
+
+def open_head_cache(path: str) -> HeadCache:
+    """Return the cache stored in the given file, opening it only once
+    per process"""
+    path = os.path.abspath(os.path.expanduser(path))
+    if path not in HEAD_CACHES:
+        HEAD_CACHES[path] = HeadCache(path)
+    return HEAD_CACHES[path]
+
+
+def is_head_request(method: str, params: Any) -> bool:
+    """Whether the response to the given request depends only on the
+    head of the chain"""
+    if method not in HEAD_METHODS:
+        return False
+    index = HEAD_METHODS[method]
+    if index is None:
+        return True
+    block = params[index] if len(params) > index else "latest"
+    return block in HEAD_BLOCKS
+
+
+def construct_head_cache_middleware(
+    cache: HeadCache, chain_id: int, ttl: float = None
+) -> Middleware:
+    """Return a middleware that shares head-dependent responses via the
+    given cache for `ttl` seconds, by default the block time of the chain.
+
+    Do not use it with clients that send transactions: the cached nonce
+    would be stale after the first transaction."""
+    if ttl is None:
+        ttl = get_block_time(chain_id)
+
+    def middleware(
+        make_request: Callable[[RPCEndpoint, Any], RPCResponse], w3: Web3
+    ) -> Callable[[RPCEndpoint, Any], RPCResponse]:
+        def head_cache_middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            if not is_head_request(method, params):
+                return make_request(method, params)
+            responses: List[RPCResponse] = []
+
+            def request() -> Any:
+                response = make_request(method, params)
+                responses.append(response)
+                return response.get("result")
+
+            try:
+                key = cache.get_key(chain_id, method, params)
+                result = cache.fetch(key, ttl, request)
+            except (TypeError, sqlite3.Error):
+                # Do not repeat the request if it was already made
+                return responses[0] if responses else make_request(method, params)
+            if responses and "error" in responses[0]:
+                return responses[0]
+            return {"jsonrpc": "2.0", "id": 0, "result": result}
+
+        return head_cache_middleware
+
+    return middleware
@@ -0,0 +1,90 @@
+"""Track the headers received from a 'newHeads' subscription, to detect
+chain reorganizations and to deliver blocks only once confirmed"""
+
+from typing import Any, Dict, List, Tuple
+
+HeadEvent = Tuple[str, Dict[str, Any]]
+"""An event emitted by the tracker: either ('newHeads', header) or
+('reorg', details)"""
+
+
+class HeadTracker:
+    """Keep a ring buffer with the most recent headers, indexed by block
+    number, and compare each new header with it:
+
+    - a header whose number is already in the buffer with a different
+      hash, or whose parent hash does not match the buffered parent,
+      means that the buffered blocks from that height on were orphaned:
+      they are dropped and a 'reorg' event is emitted;
+    - headers are released as 'newHeads' events only when they have the
+      given number of confirmations, i.e. when the head is that many
+      blocks ahead.  Blocks that were released and then orphaned are
+      released again when their replacement is confirmed.
+
+    Everything is done using the data in the notifications, without
+    fetching blocks from the node.  The depth of a reorg is the one that
+    can be proven from the buffer: when the parent of a new header is
+    not buffered, e.g. because the new chain skipped the headers of the
+    replaced blocks, older blocks may have been orphaned too.
+    """
+
+    def __init__(self, confirmations: int = 0, size: int = 128) -> None:
+        self.confirmations = confirmations
+        self.size = max(size, confirmations + 1)
+        self.headers: Dict[int, Dict[str, Any]] = {}
+        self.released_up_to: int = None
+
+    @property
+    def head(self) -> int:
+        """Number of the most recent block in the buffer"""
+        return max(self.headers) if self.headers else None
+
+    def add(self, header: Dict[str, Any]) -> List[HeadEvent]:
+        """Add the given header, as received from a 'newHeads'
+        subscription, and return the resulting events, in order"""
+        number = int(header["number"], 16)
+        known = self.headers.get(number)
+        if known and known["hash"] == header["hash"]:
+            return []  # duplicate
+        events: List[HeadEvent] = []
+        # Find the blocks orphaned by this header, if any
+        orphaned = [n for n in self.headers if n >= number]
+        parent = self.headers.get(number - 1)
+        if parent and parent["hash"] != header["parentHash"]:
+            orphaned.append(number - 1)
+        if orphaned:
+            events.append(("reorg", self.make_reorg_event(header, sorted(orphaned))))
+            for n in orphaned:
+                del self.headers[n]
+            if self.released_up_to is not None:
+                self.released_up_to = min(self.released_up_to, min(orphaned) - 1)
+        # Add the header and trim the buffer
+        self.headers[number] = header
+        for n in sorted(self.headers)[: -self.size]:
+            del self.headers[n]
+        # Release the headers that reached the confirmations
+        confirmed_up_to = self.head - self.confirmations
+        for n in sorted(self.headers):
+            if n > confirmed_up_to:
+                break
+            if self.released_up_to is None or n > self.released_up_to:
+                events.append(("newHeads", self.headers[n]))
+                self.released_up_to = n
+        return events
+
+    def make_reorg_event(
+        self, header: Dict[str, Any], orphaned: List[int]
+    ) -> Dict[str, Any]:
+        """Describe the reorg caused by the given header"""
+        old_head = self.headers[max(self.headers)]
+        return {
+            "type": "reorg",
+            "number": hex(orphaned[0]),
+            "depth": len(orphaned),
+            "oldHead": {"number": old_head["number"], "hash": old_head["hash"]},
+            "newHead": {"number": header["number"], "hash": header["hash"]},
+            "orphaned": [
+                {"number": self.headers[n]["number"], "hash": self.headers[n]["hash"]}
+                for n in orphaned
+            ],
+        }
@@ -0,0 +1,148 @@
+"""Sync the logs of a set of contracts to a local table, so that they
+can be queried without hitting the RPC"""
+
+from typing import Any, Callable, Dict, List
+
+from web3 import Web3
+from web3.types import LogReceipt
+
+from web3core.db import DB
+from web3core.helpers.events import LogDecoder, to_hex
+from web3core.helpers.logs import LogFetcher
+from web3core.models.log import IndexedContract, Log
+
+
+def add_contracts(chain: str, addresses: List[str], from_block: int) -> int:
+    """Start indexing the given contracts from the given block; return
+    the number of contracts added.  Contracts already in the index are
+    left as they are."""
+    added = 0
+    for address in addresses:
+        _, created = IndexedContract.get_or_create(
+            chain=chain,
+            address=address.lower(),
+            defaults={"from_block": from_block, "last_block": from_block - 1},
+        )
+        added += int(created)
+    return added
+
+
+def sync_index(
+    w3: Web3,
+    chain: str,
+    addresses: List[str] = None,
+    reorg_depth: int = 12,
+    to_block: int = None,
+    chunk_size: int = 2000,
+    concurrency: int = 4,
+    decoder: LogDecoder = None,
+    on_chunk: Callable[[int, int, int], None] = None,
+) -> int:
+    """Fetch the logs of the indexed contracts, from the last synced
+    block up to the given block (latest by default), and store them.
+    Return the number of stored logs.
+
+    The last reorg_depth synced blocks are always fetched again, and
+    their logs replaced, so that logs from orphaned blocks are rolled
+    back.
+
+    Contracts are synced in groups with the same starting block; each
+    chunk of blocks is stored in a single transaction, together with
+    the new sync position, so that an interrupted sync can be resumed.
+    """
+    if to_block is None:
+        to_block = w3.eth.block_number
+    # Group contracts by the block from which they must be synced
+    groups: Dict[int, List[IndexedContract]] = {}
+    for contract in IndexedContract.get_by_chain(chain, addresses):
+        start = max(contract.from_block, contract.last_block - reorg_depth + 1)
+        if start <= to_block:
+            groups.setdefault(start, []).append(contract)
+    n_logs = 0
+    for start, contracts in sorted(groups.items()):
+        group_addresses = [c.address for c in contracts]
+        fetcher = LogFetcher(
+            w3, group_addresses, chunk_size=chunk_size, concurrency=concurrency
+        )
+        for chunk_from, chunk_to, logs in fetcher.iter_chunks(start, to_block):
+            store_logs(chain, group_addresses, chunk_from, chunk_to, logs, decoder)
+            n_logs += len(logs)
+            if on_chunk:
+                on_chunk(chunk_from, chunk_to, len(logs))
+    return n_logs
+
+
+def store_logs(
+    chain: str,
+    addresses: List[str],
+    from_block: int,
+    to_block: int,
+    logs: List[LogReceipt],
+    decoder: LogDecoder = None,
+) -> None:
+    """Replace the stored logs of the given contracts in the given block
+    range, and mark the range as synced"""
+    rows = [log_to_row(chain, log, decoder) for log in logs]
+    with DB.atomic():
+        Log.delete().where(
+            (Log.chain == chain)
+            & (Log.address << addresses)
+            & (Log.block.between(from_block, to_block))
+        ).execute()
+        for i in range(0, len(rows), 500):
+            Log.insert_many(rows[i : i + 500]).on_conflict_replace().execute()
+        IndexedContract.update(last_block=to_block).where(
+            (IndexedContract.chain == chain) & (IndexedContract.address << addresses)
+        ).execute()
+
+
+def log_to_row(
+    chain: str, log: LogReceipt, decoder: LogDecoder = None
+) -> Dict[str, Any]:
+    """Convert a log, as returned by eth_getLogs, to a row of the logs
+    table"""
+    topics = [to_hex(t) for t in log["topics"]] + [None] * 4
+    decoded = decoder.decode(log) if decoder else None
+    return {
+        "chain": chain,
+        "block": log["blockNumber"],
+        "block_hash": to_hex(log["blockHash"]),
+        "tx_hash": to_hex(log["transactionHash"]),
+        "log_index": log["logIndex"],
+        "address": log["address"].lower(),
+        "topic0": topics[0],
+        "topic1": topics[1],
+        "topic2": topics[2],
+        "topic3": topics[3],
+        "data": to_hex(log["data"]),
+        "event": decoded["event"] if decoded else None,
+        "decoded": decoded,
+    }
+
+
+def query_index(
+    chain: str,
+    addresses: List[str] = None,
+    event: str = None,
+    topic0: str = None,
+    from_block: int = None,
+    to_block: int = None,
+    limit: int = None,
+) -> List[Log]:
+    """Return the stored logs matching the given filters, ordered by
+    block and log index"""
+    query = Log.select().where(Log.chain == chain)
+    if addresses:
+        query = query.where(Log.address << [a.lower() for a in addresses])
+    if event:
+        query = query.where(Log.event == event)
+    if topic0:
+        query = query.where(Log.topic0 == topic0.lower())
+    if from_block is not None:
+        query = query.where(Log.block >= from_block)
+    if to_block is not None:
+        query = query.where(Log.block <= to_block)
+    query = query.order_by(Log.block, Log.log_index)
+    if limit:
+        query = query.limit(limit)
+    return list(query)
@@ -0,0 +1,122 @@
+"""Append JSON records to a file, one per line, fast enough to capture
+high-volume streams such as the mempool"""
+
+import asyncio
+import atexit
+import gzip
+import json
+import os
+import shutil
+import time
+from typing import Any, TextIO
+
+from web3._utils.encoding import Web3JsonEncoder
+
+
+class JsonlWriter:
+    """Append records to a JSONL file.
+
+    Writes are buffered in memory, and flushed and synced to disk at
+    most every fsync_interval seconds, as well as on close and at exit.
+
+    When the file exceeds max_bytes, or is older than max_age seconds,
+    it is rotated: renamed with a timestamp suffix, and optionally
+    gzip-compressed, before a new file is started at the same path.
+
+    In the event loop, use write_async(), which flushes, syncs and
+    rotates the file in a worker thread.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fsync_interval: float = 1,
+        max_bytes: int = None,
+        max_age: float = None,
+        compress: bool = False,
+        buffer_size: int = 1024 * 1024,
+    ) -> None:
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+        self.buffer_size = buffer_size
+        self.file: TextIO = None
+        self.lock = asyncio.Lock()
+        self.open()
+        atexit.register(self.close)
+
+    def open(self) -> None:
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self.file = open(self.path, "a", encoding="utf-8", buffering=self.buffer_size)
+        self.size = self.file.tell()
+        self.opened_at = time.time()
+        self.synced_at = time.monotonic()
+
+    def write(self, record: Any) -> None:
+        """Append the given record; bytes, HexBytes and AttributeDict
+        values are supported"""
+        self.append(record)
+        if self.should_rotate():
+            self.rotate()
+        elif self.should_sync():
+            self.sync()
+
+    async def write_async(self, record: Any) -> None:
+        """Same as write(), without blocking the event loop on disk I/O"""
+        async with self.lock:
+            self.append(record)
+            if self.should_rotate():
+                await asyncio.to_thread(self.rotate)
+            elif self.should_sync():
+                await asyncio.to_thread(self.sync)
+
+    def append(self, record: Any) -> None:
+        """Add the given record to the buffer"""
+        line = json.dumps(record, cls=Web3JsonEncoder) + "\n"
+        self.file.write(line)
+        self.size += len(line.encode())
+
+    def sync(self) -> None:
+        """Flush the buffer and sync the file to disk"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.synced_at = time.monotonic()
+
+    def should_sync(self) -> bool:
+        return time.monotonic() - self.synced_at >= self.fsync_interval
+
+    def should_rotate(self) -> bool:
+        return bool(
+            (self.max_bytes and self.size >= self.max_bytes)
+            or (self.max_age and time.time() - self.opened_at >= self.max_age)
+        )
+
+    def rotate(self) -> str:
+        """Close the current file, move it aside and open a new one;
+        return the path of the rotated file"""
+        self.sync()
+        self.file.close()
+        root, ext = os.path.splitext(self.path)
+        suffix = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.opened_at))
+        rotated = f"{root}.{suffix}{ext}"
+        n = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            rotated = f"{root}.{suffix}-{n}{ext}"
+            n += 1
+        os.rename(self.path, rotated)
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+            rotated += ".gz"
+        self.open()
+        return rotated
+
+    def close(self) -> None:
+        if self.file and not self.file.closed:
+            self.sync()
+            self.file.close()
@@ -0,0 +1,134 @@
+"""Fetch past event logs over large block ranges, with eth_getLogs"""
+
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, Tuple
+
+import requests
+from web3 import Web3
+from web3.types import FilterParams, LogReceipt
+
+from web3core.exceptions import Web3CoreError
+
+TOO_MANY_RESULTS_MARKERS = (
+    "too many",
+    "more than",
+    "block range",
+    "too wide",
+    "response size",
+    "is limited to",
+    "timeout",
+    "timed out",
+)
+"""Substrings of the error messages that RPCs return when an
+eth_getLogs query is too broad.  There is no standard for them."""
+
+
+class LogFetcher:
+    """Fetch the logs matching the given filter, splitting the block
+    range in chunks that are fetched concurrently in worker threads,
+    and returned in order.
+
+    When the RPC refuses a chunk because it has too many results, or
+    times out, the chunk is halved, and the reduced size is used for
+    the next chunks as well."""
+
+    def __init__(
+        self,
+        w3: Web3,
+        addresses: List[str] = None,
+        topics: List[Any] = None,
+        chunk_size: int = 2000,
+        concurrency: int = 4,
+    ) -> None:
+        self.w3 = w3
+        self.addresses = addresses or []
+        self.topics = topics or []
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+
+    def get_filter(self, from_block: int, to_block: int) -> FilterParams:
+        params: FilterParams = {"fromBlock": from_block, "toBlock": to_block}
+        if self.addresses:
+            params["address"] = [Web3.to_checksum_address(a) for a in self.addresses]
+        if self.topics:
+            params["topics"] = self.topics
+        return params
+
+    def fetch_range(self, from_block: int, to_block: int) -> List[LogReceipt]:
+        """Fetch the logs in the given range, halving it as many times
+        as needed"""
+        try:
+            return list(self.w3.eth.get_logs(self.get_filter(from_block, to_block)))
+        except Exception as e:
+            if from_block >= to_block or not is_too_many_results_error(e):
+                raise
+        middle = (from_block + to_block) // 2
+        self.chunk_size = min(self.chunk_size, max(1, middle - from_block + 1))
+        return self.fetch_range(from_block, middle) + self.fetch_range(
+            middle + 1, to_block
+        )
+
+    def iter_chunks(
+        self, from_block: int, to_block: int
+    ) -> Iterator[Tuple[int, int, List[LogReceipt]]]:
+        """Yield (chunk_from, chunk_to, logs) for consecutive chunks
+        covering the given range, in order; the logs of each chunk are
+        sorted by block number and log index"""
+        futures: Deque[Tuple[int, int, Future[List[LogReceipt]]]] = deque()
+        next_block = from_block
+        with ThreadPoolExecutor(self.concurrency) as pool:
+            try:
+                while next_block <= to_block or futures:
+                    while next_block <= to_block and len(futures) < self.concurrency:
+                        end = min(next_block + self.chunk_size - 1, to_block)
+                        future = pool.submit(self.fetch_range, next_block, end)
+                        futures.append((next_block, end, future))
+                        next_block = end + 1
+                    start, end, future = futures.popleft()
+                    logs = future.result()
+                    yield start, end, sorted(
+                        logs, key=lambda log: (log["blockNumber"], log["logIndex"])
+                    )
+            finally:
+                for _, _, future in futures:
+                    future.cancel()
+
+
+def is_too_many_results_error(e: Exception) -> bool:
+    """Whether the given eth_getLogs error means that the query should
+    be split in smaller ranges"""
+    if isinstance(e, requests.exceptions.Timeout):
+        return True
+    message = str(e).lower()
+    return any(marker in message for marker in TOO_MANY_RESULTS_MARKERS)
+
+
+def read_checkpoint(path: str, query: Dict[str, Any]) -> int:
+    """Return the block from which to resume the given query, as saved
+    in the given checkpoint file, or None if the file does not exist.
+    Raise if the checkpoint was saved for a different query."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise Web3CoreError(f"Could not read checkpoint file '{path}': {e}")
+    if checkpoint.get("query") != query:
+        raise Web3CoreError(
+            f"Checkpoint file '{path}' was saved for a different query, delete it or use another file"
+        )
+    return int(checkpoint["next_block"])
+
+
+def write_checkpoint(path: str, query: Dict[str, Any], next_block: int) -> None:
+    """Atomically save the block from which to resume the given query"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"query": query, "next_block": next_block}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,48 @@
+"""Bounded containers that evict the least recently used items"""
+
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LruDict(OrderedDict):  # type: ignore
+    """Dictionary holding at most maxsize items; when full, setting a
+    new key evicts the least recently used one.  Both reads via get()
+    and writes count as a use."""
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        super().__init__()
+        self.maxsize = maxsize
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        if key in self:
+            self.move_to_end(key)
+        super().__setitem__(key, value)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+class LruSet:
+    """Set holding at most maxsize items, useful to remember which
+    items have already been seen in a stream"""
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self._items = LruDict(maxsize)
+
+    def add(self, item: Hashable) -> bool:
+        """Add the item to the set; return False if it was already
+        there, True otherwise"""
+        seen = item in self._items
+        self._items[item] = None
+        return not seen
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
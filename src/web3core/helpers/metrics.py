@@ -0,0 +1,214 @@
+"""Lightweight instrumentation for long-running processes, such as
+subscriptions, with export in the Prometheus text format.
+
+Metrics are recorded in the module-level REGISTRY, so that any part of
+the code can record them without passing objects around; exposing them,
+via HTTP or logs, is up to the caller.
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+"""Upper bounds, in seconds, of the histogram buckets"""
+
+METRICS: Dict[str, Tuple[str, str]] = {
+    "w3_notifications_total": (
+        "counter",
+        "Notifications received, by subscription",
+    ),
+    "w3_callback_duration_seconds": (
+        "histogram",
+        "Time spent running the notification actions, by action",
+    ),
+    "w3_queue_depth": (
+        "gauge",
+        "Notifications being processed, by connection",
+    ),
+    "w3_reconnects_total": (
+        "counter",
+        "Websocket reconnections, by connection",
+    ),
+    "w3_head_lag_seconds": (
+        "gauge",
+        "Seconds between the timestamp of the last block and its reception, by subscription",
+    ),
+}
+"""Type and description of the known metrics"""
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class Metrics:
+    """Thread-safe registry of counters, gauges and histograms,
+    identified by name and labels"""
+
+    def __init__(self) -> None:
+        self.values: Dict[str, Dict[Labels, Any]] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Increment a counter"""
+        with self.lock:
+            series = self.values.setdefault(name, {})
+            key = to_labels(labels)
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """Set the value of a gauge"""
+        with self.lock:
+            self.values.setdefault(name, {})[to_labels(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Add an observation to a histogram"""
+        with self.lock:
+            series = self.values.setdefault(name, {})
+            series.setdefault(to_labels(labels), Histogram()).observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Observe the time spent in the context in a histogram"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def get(self, name: str, **labels: str) -> Any:
+        """Return the value of a counter or gauge, or the histogram,
+        with the given name and labels; None if never recorded"""
+        with self.lock:
+            return self.values.get(name, {}).get(to_labels(labels))
+
+    def get_series(self, name: str) -> Dict[Labels, Any]:
+        """Return a copy of all the values of the given metric, by labels"""
+        with self.lock:
+            return dict(self.values.get(name, {}))
+
+    def render(self) -> str:
+        """Return the metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        with self.lock:
+            for name, series in sorted(self.values.items()):
+                type, help = METRICS.get(name, ("untyped", ""))
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {type}")
+                for labels, value in sorted(series.items()):
+                    if isinstance(value, Histogram):
+                        lines += render_histogram(name, labels, value)
+                    else:
+                        lines.append(f"{name}{render_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self.lock:
+            self.values = {}
+
+
+REGISTRY = Metrics()
+"""Default registry"""
+
+
+def to_labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def render_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = [
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    ]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def render_histogram(name: str, labels: Labels, histogram: Histogram) -> List[str]:
+    lines = []
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        bucket_labels = labels + (("le", str(bound)),)
+        lines.append(f"{name}_bucket{render_labels(bucket_labels)} {count}")
+    inf_labels = labels + (("le", "+Inf"),)
+    lines.append(f"{name}_bucket{render_labels(inf_labels)} {histogram.count}")
+    lines.append(f"{name}_sum{render_labels(labels)} {histogram.sum}")
+    lines.append(f"{name}_count{render_labels(labels)} {histogram.count}")
+    return lines
+
+
+def serve_metrics(
+    port: int, host: str = "127.0.0.1", metrics: Metrics = REGISTRY
+) -> ThreadingHTTPServer:
+    """Expose the metrics over HTTP, in the Prometheus text format, from
+    a daemon thread.  Return the server, so that it can be shut down."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass  # do not clutter the output of the command
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def log_metrics(
+    log: Callable[[str], None], interval: float, metrics: Metrics = REGISTRY
+) -> None:
+    """Every interval seconds, log a summary of the metrics, with the
+    notifications per second computed over the last interval"""
+    last_counts: Dict[Labels, float] = {}
+    while True:
+        await asyncio.sleep(interval)
+        log(summarize(metrics, last_counts, interval))
+
+
+def summarize(
+    metrics: Metrics, last_counts: Dict[Labels, float], interval: float
+) -> str:
+    """Return a one-line summary of the metrics.  The notification counts
+    in last_counts are used to compute rates, and then updated."""
+    parts: List[str] = []
+    for labels, count in metrics.get_series("w3_notifications_total").items():
+        rate = (count - last_counts.get(labels, 0)) / interval
+        last_counts[labels] = count
+        parts.append(f"{dict(labels)['subscription']}: {rate:.2f}/s")
+    for labels, lag in metrics.get_series("w3_head_lag_seconds").items():
+        parts.append(f"{dict(labels)['subscription']} lag: {lag:.1f}s")
+    depth = sum(metrics.get_series("w3_queue_depth").values())
+    reconnects = sum(metrics.get_series("w3_reconnects_total").values())
+    parts.append(f"queue: {depth}")
+    parts.append(f"reconnects: {reconnects:g}")
+    for labels, h in metrics.get_series("w3_callback_duration_seconds").items():
+        if h.count:
+            parts.append(
+                f"{dict(labels)['action']}: {1000 * h.sum / h.count:.0f}ms avg"
+            )
+    return " | ".join(parts)
@@ -2,7 +2,8 @@ import codecs
 import decimal
 import re
 import sys
-from typing import Any, Dict, Union
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Union
 
 from web3core.types import Logger
 
@@ -55,6 +56,20 @@ def to_int(string_value: str, allow_exp_notation: bool = True) -> int:
     return int(string_value)
 
 
+def to_timestamp(s: str) -> int:
+    """Convert a Unix timestamp or an ISO8601 date to a Unix timestamp.
+    Dates without a timezone are interpreted as UTC."""
+    if s.isdigit():
+        return int(s)
+    try:
+        date = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid date '{s}', use ISO8601 or a Unix timestamp")
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return int(date.timestamp())
+
+
 def to_bool(s: str) -> bool:
     """Cast a string to False or True.
 
@@ -116,3 +131,8 @@ def replace_all(text: str, dic: Dict[str, Any]) -> str:
     for i, j in dic.items():
         text = text.replace(i, str(j))
     return text
+
+
+def chunk(items: List[Any], size: int) -> List[List[Any]]:
+    """Split the given list in lists of at most the given size"""
+    return [items[i : i + size] for i in range(0, len(items), size)]
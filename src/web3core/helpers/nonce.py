@@ -0,0 +1,215 @@
+"""Reserve nonces locally, so that many transactions can be sent from the
+same signer in rapid succession, even by parallel processes"""
+
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, TypedDict
+
+from web3 import Web3
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+NONCE_TOO_LOW_MARKERS = (
+    "nonce too low",
+    "already known",
+    "known transaction",
+    "replacement transaction underpriced",
+    "nonce has already been used",
+)
+"""Substrings of node errors meaning that the nonce is already taken"""
+
+
+class NonceState(TypedDict):
+    """State of a signer's nonces, persisted on disk"""
+
+    next: int
+    released: List[int]
+    updated_at: float
+
+
+class NonceManager:
+    """Reserve nonces for the given address on the given chain.
+
+    The state is saved in a JSON file in the given directory, and guarded
+    by a file lock, so that parallel processes never get the same nonce.
+    While the state is fresh, reservations trust it and make no requests.
+    The pending nonce on chain is fetched only when there is no state,
+    or when it was not updated for `stale_after` seconds, to recover from
+    gaps left by crashed processes and from transactions sent elsewhere.
+
+    When a transaction cannot be sent, call `fail` with the exception: the
+    state is reconciled with the pending nonce and, if the nonce was taken
+    by another transaction, reset to it; otherwise the nonce is released,
+    and will be used by the next reservation, so that no gap is left."""
+
+    def __init__(
+        self,
+        w3: Web3,
+        chain: str,
+        address: str,
+        dir: str,
+        stale_after: float = 60,
+    ) -> None:
+        self.w3 = w3
+        self.address = Web3.to_checksum_address(address)
+        self.stale_after = stale_after
+        os.makedirs(dir, exist_ok=True)
+        self.path = os.path.join(dir, f"{chain}-{self.address.lower()}.json")
+        self.lock_path = self.path + ".lock"
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold an exclusive lock on the state file"""
+        with open(self.lock_path, "w") as file:
+            if fcntl:
+                fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+
+    def read(self) -> Optional[NonceState]:
+        """Read the state from disk; return None if there is no state,
+        or if it is stale"""
+        try:
+            with open(self.path) as file:
+                state: NonceState = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if time.time() - state["updated_at"] > self.stale_after:
+            return None
+        return state
+
+    def write(self, state: NonceState) -> None:
+        state["updated_at"] = time.time()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(state, file)
+        os.replace(tmp_path, self.path)
+
+    def get_pending_nonce(self) -> int:
+        return self.w3.eth.get_transaction_count(self.address, "pending")
+
+    def reconcile(self, state: Optional[NonceState]) -> NonceState:
+        """Return the given state updated with the pending nonce; nonces
+        below the pending nonce are already used, and cannot be released"""
+        pending = self.get_pending_nonce()
+        if state is None:
+            return {"next": pending, "released": [], "updated_at": 0}
+        return {
+            "next": max(state["next"], pending),
+            "released": sorted(n for n in state["released"] if n >= pending),
+            "updated_at": state["updated_at"],
+        }
+
+    def read_or_reconcile(self) -> NonceState:
+        """Return the state on disk, or a new one starting from the pending
+        nonce if there is none, or if it is stale"""
+        state = self.read()
+        return state if state is not None else self.reconcile(None)
+
+    def reserve(self) -> int:
+        """Return a nonce that no other process will get"""
+        with self.lock():
+            state = self.read_or_reconcile()
+            if state["released"]:
+                nonce = state["released"].pop(0)
+            else:
+                nonce = state["next"]
+                state["next"] += 1
+            self.write(state)
+        return nonce
+
+    def reserve_many(self, count: int, min_nonce: int = None) -> List[int]:
+        """Return `count` nonces that no other process will get, filling
+        released nonces first, then in sequence.  If `min_nonce` is given,
+        nonces below it are never returned, e.g. because they were used
+        by transactions signed but not sent yet."""
+        with self.lock():
+            state = self.read_or_reconcile()
+            if min_nonce is not None:
+                state["next"] = max(state["next"], min_nonce)
+                state["released"] = [n for n in state["released"] if n >= min_nonce]
+            nonces = state["released"][:count]
+            state["released"] = state["released"][count:]
+            while len(nonces) < count:
+                nonces.append(state["next"])
+                state["next"] += 1
+            self.write(state)
+        return nonces
+
+    def release(self, nonce: int) -> None:
+        """Give back a nonce that was reserved but not used"""
+        with self.lock():
+            state = self.read()
+            if state is not None:
+                self.write(release_nonce(state, nonce))
+
+    def reset(self) -> None:
+        """Forget the local state, and restart from the pending nonce"""
+        with self.lock():
+            self.write(self.reconcile(None))
+
+    def fail(self, nonce: int, error: Exception) -> None:
+        """Handle a failure to send a transaction with the given nonce"""
+        with self.lock():
+            state = None if is_nonce_taken_error(error) else self.read()
+            if state is not None:
+                state = release_nonce(state, nonce)
+            try:
+                state = self.reconcile(state)
+            except Exception:
+                # The node cannot be reached: reconcile at the next reservation
+                if state is None:
+                    self.delete()
+                    return
+            self.write(state)
+
+    def delete(self) -> None:
+        """Delete the state from disk"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def use(self) -> Iterator[int]:
+        """Reserve a nonce for the duration of the block; if the block
+        raises, handle the failure and re-raise"""
+        nonce = self.reserve()
+        try:
+            yield nonce
+        except Exception as e:
+            self.fail(nonce, e)
+            raise
+
+
+def release_nonce(state: NonceState, nonce: int) -> NonceState:
+    """Add the given nonce to the released ones, unless it was never
+    reserved"""
+    if nonce >= state["next"]:
+        return state
+    if nonce not in state["released"]:
+        state["released"].append(nonce)
+    # Released nonces at the end of the sequence shrink it
+    state["released"].sort()
+    while state["released"] and state["released"][-1] == state["next"] - 1:
+        state["released"].pop()
+        state["next"] -= 1
+    return state
+
+
+def is_nonce_taken_error(e: Any) -> bool:
+    """Whether the given exception means that the nonce was already used
+    by another transaction"""
+    message = str(e).lower()
+    return any(marker in message for marker in NONCE_TOO_LOW_MARKERS) or bool(
+        re.search(r"nonce .* (is )?(too low|lower than)", message)
+    )
@@ -0,0 +1,80 @@
+"""Run blocking requests concurrently, with bounded parallelism and retries"""
+
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Iterable, Iterator, Tuple, Type, TypeVar, Union
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def call_with_retry(
+    fn: Callable[..., R],
+    *args: Any,
+    retries: int = 0,
+    backoff: float = 0.5,
+    no_retry: Union[Type[Exception], Tuple[Type[Exception], ...]] = (),
+) -> R:
+    """Call the given function, and retry it up to `retries` times if
+    it raises, waiting `backoff` seconds before the first retry and
+    doubling the wait at each retry.  Exceptions of the `no_retry` types
+    are raised immediately."""
+    for attempt in range(retries + 1):
+        try:
+            return fn(*args)
+        except no_retry:
+            raise
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2**attempt)
+    raise RuntimeError("Should not be here")
+
+
+def iter_parallel(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    concurrency: int = 8,
+    retries: int = 0,
+    backoff: float = 0.5,
+    no_retry: Union[Type[Exception], Tuple[Type[Exception], ...]] = (),
+) -> Iterator[Tuple[T, R, Exception]]:
+    """Call the given function on each item using a pool of `concurrency`
+    threads, and yield an (item, result, exception) tuple for each item,
+    in the same order as the items.  If the call failed even after the
+    retries, result is None and exception is the last exception raised;
+    otherwise, exception is None.
+
+    Items are consumed lazily and at most a few calls are made ahead of
+    the last yielded one, so that long inputs can be streamed without
+    keeping them in memory."""
+    max_pending = concurrency * 4
+    pending: Deque[Tuple[T, "Future[R]"]] = deque()
+
+    def pop() -> Tuple[T, R, Exception]:
+        item, future = pending.popleft()
+        try:
+            return item, future.result(), None
+        except Exception as e:
+            return item, None, e
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        for item in items:
+            pending.append(
+                (
+                    item,
+                    pool.submit(
+                        call_with_retry,
+                        fn,
+                        item,
+                        retries=retries,
+                        backoff=backoff,
+                        no_retry=no_retry,
+                    ),
+                )
+            )
+            if len(pending) >= max_pending:
+                yield pop()
+        while pending:
+            yield pop()
@@ -0,0 +1,56 @@
+"""Rate limiting helpers"""
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket rate limiter: allows bursts of up to `capacity`
+    operations, and refills at `rate` tokens per second.  By default
+    the capacity equals the rate, i.e. one second worth of operations.
+    The bucket can be shared among threads."""
+
+    def __init__(self, rate: float, capacity: float = None) -> None:
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def refill(self) -> None:
+        """Add the tokens accrued since the last refill"""
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Consume the given number of tokens if available, without
+        waiting; return whether the tokens were consumed"""
+        with self.lock:
+            self.refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def get_wait_time(self, tokens: float = 1) -> float:
+        """Seconds to wait before the given number of tokens are available"""
+        with self.lock:
+            self.refill()
+            return max(0, (tokens - self.tokens) / self.rate)
+
+    async def acquire(self, tokens: float = 1) -> None:
+        """Wait until the given number of tokens are available, then
+        consume them"""
+        while not self.try_acquire(tokens):
+            await asyncio.sleep(self.get_wait_time(tokens))
+
+    def acquire_sync(self, tokens: float = 1) -> None:
+        """Blocking version of acquire()"""
+        while not self.try_acquire(tokens):
+            time.sleep(self.get_wait_time(tokens))
@@ -0,0 +1,197 @@
+"""Wait for the receipts of many transactions at once, checking them
+all at each new block"""
+
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TypedDict, Union
+
+from eth_typing import HexStr
+from web3 import Web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
+from web3.types import TxReceipt
+
+from web3core.helpers.head_cache import get_block_time
+from web3core.helpers.parallel import iter_parallel
+
+
+class TrackedReceipt(TypedDict):
+    """Outcome of a tracked transaction: status is 'success', 'reverted',
+    'unconfirmed' or 'timeout', and confirmations is the number of blocks
+    from the block of the transaction to the head of the chain, included"""
+
+    hash: str
+    status: str
+    receipt: Optional[TxReceipt]
+    confirmations: int
+    error: Optional[str]
+
+
+class ReceiptTracker:
+    """Track the receipts of many transactions.
+
+    The head of the chain is polled starting every `poll_interval`
+    seconds, by default a quarter of the block time; while no new block
+    shows up, the interval doubles, up to `max_interval` seconds.  At each
+    new block, the receipts of all pending transactions are fetched
+    concurrently, and transactions with at least `confirmations` blocks
+    are done.  Transactions pending for more than `timeout` seconds are
+    done with status 'timeout', or 'unconfirmed' if they were mined but
+    are short of confirmations, in which case the last receipt is kept.
+
+    Receipts are fetched again at each block until the confirmations are
+    reached, so that transactions dropped by a reorg go back to pending."""
+
+    def __init__(
+        self,
+        w3: Web3,
+        hashes: Iterable[Union[str, bytes]] = (),
+        confirmations: int = 1,
+        timeout: float = 120,
+        poll_interval: float = None,
+        max_interval: float = None,
+        concurrency: int = 8,
+        retries: int = 2,
+    ) -> None:
+        self.w3 = w3
+        self.confirmations = max(confirmations, 1)
+        self.timeout = timeout
+        if poll_interval is None:
+            poll_interval = get_block_time(w3.eth.chain_id) / 4
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval or max(poll_interval * 8, 1)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.head: int = None
+        self.deadlines: Dict[str, float] = {}
+        self.timeouts: Dict[str, Optional[float]] = {}
+        self.receipts: Dict[str, TxReceipt] = {}
+        self.unchecked: List[str] = []
+        self.errors: Dict[str, str] = {}
+        for hash in hashes:
+            self.add(hash)
+
+    def add(self, hash: Union[str, bytes], timeout: float = None) -> None:
+        """Start tracking the given transaction"""
+        key = hash if isinstance(hash, str) else Web3.to_hex(hash)
+        timeout = self.timeout if timeout is None else timeout
+        self.timeouts[key] = timeout
+        self.deadlines[key] = (
+            time.monotonic() + timeout if timeout is not None else float("inf")
+        )
+        self.unchecked.append(key)
+
+    def __len__(self) -> int:
+        return len(self.deadlines)
+
+    def get_receipt(self, hash: str) -> Optional[TxReceipt]:
+        try:
+            return self.w3.eth.get_transaction_receipt(HexStr(hash))
+        except TransactionNotFound:
+            return None
+
+    def poll(self) -> List[TrackedReceipt]:
+        """Check the pending transactions once, and return those that are
+        done; the receipts are fetched only if there is a new block, or
+        for transactions added after the last check"""
+        head = self.w3.eth.block_number
+        hashes = list(self.deadlines) if head != self.head else self.unchecked
+        self.head = head
+        self.unchecked = []
+        done: List[TrackedReceipt] = []
+        for hash, receipt, error in iter_parallel(
+            self.get_receipt, hashes, self.concurrency, self.retries
+        ):
+            if error is not None:
+                self.errors[hash] = str(error)
+            elif receipt is None:
+                # Dropped by a reorg
+                self.receipts.pop(hash, None)
+            if receipt is None:
+                continue
+            confirmations = max(head - receipt["blockNumber"] + 1, 1)
+            if confirmations < self.confirmations:
+                self.receipts[hash] = receipt
+                continue
+            self.forget(hash)
+            done.append(
+                {
+                    "hash": hash,
+                    "status": "success" if receipt["status"] == 1 else "reverted",
+                    "receipt": receipt,
+                    "confirmations": confirmations,
+                    "error": None,
+                }
+            )
+        now = time.monotonic()
+        for hash, deadline in list(self.deadlines.items()):
+            if now >= deadline:
+                done.append(self.expire(hash, head))
+        return done
+
+    def expire(self, hash: str, head: int) -> TrackedReceipt:
+        """Stop tracking the given transaction, and return its outcome
+        after its timeout"""
+        timeout = self.timeouts[hash]
+        last_receipt = self.receipts.get(hash)
+        error = self.errors.get(hash)
+        self.forget(hash)
+        if last_receipt is not None:
+            confirmations = max(head - last_receipt["blockNumber"] + 1, 1)
+            return {
+                "hash": hash,
+                "status": "unconfirmed",
+                "receipt": last_receipt,
+                "confirmations": confirmations,
+                "error": f"Transaction {hash} has {confirmations} of {self.confirmations} confirmations after {timeout} seconds",
+            }
+        return {
+            "hash": hash,
+            "status": "timeout",
+            "receipt": None,
+            "confirmations": 0,
+            "error": error
+            or f"Transaction {hash} is not in the chain after {timeout} seconds",
+        }
+
+    def forget(self, hash: str) -> None:
+        """Stop tracking the given transaction"""
+        del self.deadlines[hash]
+        self.timeouts.pop(hash, None)
+        self.receipts.pop(hash, None)
+        self.errors.pop(hash, None)
+
+    def track(self) -> Iterator[TrackedReceipt]:
+        """Poll until all transactions are done, and yield each of them
+        as soon as it is done"""
+        interval = self.poll_interval
+        while self.deadlines:
+            last_head = self.head
+            yield from self.poll()
+            if not self.deadlines:
+                break
+            if self.head != last_head:
+                interval = self.poll_interval
+            else:
+                interval = min(interval * 2, self.max_interval)
+            next_deadline = min(self.deadlines.values()) - time.monotonic()
+            time.sleep(max(min(interval, next_deadline), 0))
+
+
+def wait_for_receipts(
+    w3: Web3, hashes: Iterable[Union[str, bytes]], **kwargs: Any
+) -> Dict[str, TrackedReceipt]:
+    """Wait for the receipts of the given transactions, and return them
+    indexed by hash; see ReceiptTracker for the arguments"""
+    return {r["hash"]: r for r in ReceiptTracker(w3, hashes, **kwargs).track()}
+
+
+def wait_for_receipt(
+    w3: Web3, hash: Union[str, bytes], timeout: float = 120, **kwargs: Any
+) -> TxReceipt:
+    """Wait for the receipt of the given transaction and return it;
+    raise TimeExhausted if it is not mined, or not confirmed, within
+    `timeout` seconds"""
+    for result in ReceiptTracker(w3, [hash], timeout=timeout, **kwargs).track():
+        if result["status"] in ("timeout", "unconfirmed"):
+            raise TimeExhausted(result["error"])
+        return result["receipt"]
+    raise RuntimeError("Should not be here")
@@ -21,7 +21,13 @@ def is_rpc_uri_valid(uri_string: str) -> bool:
         return False
 
 
+def is_ws_or_ipc(rpc_url: str) -> bool:
+    """Return True if the RPC URL is a websocket or an IPC file,
+    that is, if it supports subscriptions"""
+    return rpc_url.startswith("ws") or rpc_url.endswith(".ipc")
+
+
 def check_ws_or_raise(rpc_url: str) -> None:
     """Raise an error if the RPC URL is not a websocket or an IPC file"""
-    if not rpc_url.startswith("ws") and not rpc_url.endswith(".ipc"):
+    if not is_ws_or_ipc(rpc_url):
         raise Web3CoreError("RPC must be a websocket URL or an IPC file")
@@ -0,0 +1,246 @@
+"""Cache on disk the RPC responses that cannot change anymore, such as
+blocks by hash, mined transactions, and calls at old blocks"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from web3 import Web3
+from web3.types import Middleware, RPCEndpoint, RPCResponse
+
+BLOCK_PARAM_INDEX = {
+    "eth_getBlockByNumber": 0,
+    "eth_getBalance": 1,
+    "eth_getCode": 1,
+    "eth_getTransactionCount": 1,
+    "eth_call": 1,
+    "eth_getStorageAt": 2,
+}
+"""Methods that are immutable when called at a fixed past block, with
+the position of the block parameter"""
+
+RESULT_BLOCK_METHODS = {
+    "eth_getTransactionByHash",
+    "eth_getTransactionReceipt",
+}
+"""Methods whose result is immutable once it is included in a past block"""
+
+ALWAYS_CACHEABLE_METHODS = {"eth_chainId", "eth_getBlockByHash"}
+"""Methods whose non-null result never changes"""
+
+DEV_CHAIN_IDS = {1337, 31337}
+"""Chain IDs of local development chains, e.g. Ganache and Anvil"""
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1", "0.0.0.0"}
+"""Hosts of RPCs running on the local machine"""
+
+RPC_CACHES: Dict[str, "RpcCache"] = {}
+"""Open caches indexed by file path"""
+
+
+class RpcCache:
+    """Key-value store of RPC results, backed by a SQLite file and keyed
+    by (chain_id, method, params).  When the total size of the stored
+    results exceeds max_size bytes, the least recently used ones are
+    evicted.  Safe to use from multiple threads.
+
+    The access time of a result is updated on a hit only if it is older
+    than touch_interval seconds, so that most hits do not write to disk."""
+
+    def __init__(
+        self, path: str, max_size: int = 100_000_000, touch_interval: float = 3600
+    ) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.touch_interval = touch_interval
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, result TEXT NOT NULL, "
+            "size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+        )
+        self.db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(chain_id: int, method: str, params: Any) -> str:
+        return json.dumps([chain_id, method, params], sort_keys=True)
+
+    def get(self, chain_id: int, method: str, params: Any) -> Optional[Any]:
+        """Return the cached result, or None if it is not cached"""
+        key = self.get_key(chain_id, method, params)
+        with self.lock:
+            row = self.db.execute(
+                "SELECT result, accessed_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            now = time.time()
+            if now - row[1] >= self.touch_interval:
+                self.db.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                self.db.commit()
+        return json.loads(row[0])
+
+    def set(self, chain_id: int, method: str, params: Any, result: Any) -> None:
+        """Store the given result, evicting old results if needed"""
+        key = self.get_key(chain_id, method, params)
+        value = json.dumps(result)
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, result, size, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, len(key) + len(value), time.time()),
+            )
+            self.evict()
+            self.db.commit()
+
+    def get_size(self) -> int:
+        """Return the total size of the stored results, in bytes"""
+        row = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return row[0]
+
+    def evict(self) -> None:
+        """If the cache is larger than max_size, delete the least recently
+        used results until it is 10% smaller than max_size"""
+        size = self.get_size()
+        if size <= self.max_size:
+            return
+        target = size - int(self.max_size * 0.9)
+        rows = self.db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall()
+        keys: List[str] = []
+        for key, row_size in rows:
+            if target <= 0:
+                break
+            keys.append(key)
+            target -= row_size
+        self.db.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k in keys])
+
+    def clear(self) -> None:
+        with self.lock:
+            self.db.execute("DELETE FROM responses")
+            self.db.commit()
+
+
+def open_rpc_cache(path: str, max_size: int = 100_000_000) -> RpcCache:
+    """Return the cache stored in the given file, opening it only once
+    per process"""
+    path = os.path.abspath(os.path.expanduser(path))
+    if path not in RPC_CACHES:
+        RPC_CACHES[path] = RpcCache(path, max_size)
+    return RPC_CACHES[path]
+
+
+def is_dev_rpc(chain_id: int, rpc_url: str = None) -> bool:
+    """Whether the given chain is a local development chain, whose
+    responses should not be cached because it can be reset at any time"""
+    if chain_id in DEV_CHAIN_IDS:
+        return True
+    return bool(rpc_url) and urlparse(rpc_url).hostname in LOCAL_HOSTS
+
+
+def parse_block_number(value: Any) -> Optional[int]:
+    """Return the given block parameter as an integer, or None if it is
+    a tag such as 'latest' or a hash"""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.startswith("0x") and len(value) < 66:
+        return int(value, 16)
+    return None
+
+
+def get_result_block(method: str, params: Any, result: Any) -> Optional[int]:
+    """Return the number of the block that makes the given response
+    immutable, -1 if the response is always immutable, or None if the
+    response should not be cached"""
+    if result is None:
+        return None
+    if method in ALWAYS_CACHEABLE_METHODS:
+        return -1
+    if method in RESULT_BLOCK_METHODS:
+        return parse_block_number(result.get("blockNumber"))
+    if method in BLOCK_PARAM_INDEX:
+        index = BLOCK_PARAM_INDEX[method]
+        return parse_block_number(params[index]) if len(params) > index else None
+    if method == "eth_getLogs" and params:
+        filter = params[0]
+        if filter.get("blockHash"):
+            return -1
+        return parse_block_number(filter.get("toBlock"))
+    return None
+
+
+def construct_rpc_cache_middleware(
+    cache: RpcCache, chain_id: int, depth: int = 64, head_ttl: float = 60
+) -> Middleware:
+    """Return a middleware that serves immutable responses from the given
+    cache, and stores them there.
+
+    Responses that depend on a block are stored only if the block is at
+    least `depth` blocks behind the head of the chain, to be safe from
+    reorgs.  The head is fetched at most once every `head_ttl` seconds,
+    and only when there is a response to store.
+
+    The middleware must be the innermost one, so that it sees the raw
+    JSON responses of the node."""
+    head: Dict[str, float] = {"number": -1, "fetched_at": 0}
+
+    def middleware(
+        make_request: Callable[[RPCEndpoint, Any], RPCResponse], w3: Web3
+    ) -> Callable[[RPCEndpoint, Any], RPCResponse]:
+        def get_head() -> int:
+            if time.monotonic() - head["fetched_at"] > head_ttl:
+                response = make_request(RPCEndpoint("eth_blockNumber"), [])
+                if not response.get("result"):
+                    return -1
+                head["number"] = int(response["result"], 16)
+                head["fetched_at"] = time.monotonic()
+            return int(head["number"])
+
+        def is_cacheable(method: str) -> bool:
+            return (
+                method in ALWAYS_CACHEABLE_METHODS
+                or method in RESULT_BLOCK_METHODS
+                or method in BLOCK_PARAM_INDEX
+                or method == "eth_getLogs"
+            )
+
+        def cache_middleware(method: RPCEndpoint, params: Any) -> RPCResponse:
+            if not is_cacheable(method):
+                return make_request(method, params)
+            try:
+                params_key = json.loads(json.dumps(params))
+            except TypeError:
+                return make_request(method, params)
+            result = cache.get(chain_id, method, params_key)
+            if result is not None:
+                return {"jsonrpc": "2.0", "id": 0, "result": result}
+            response = make_request(method, params)
+            if "error" in response:
+                return response
+            block = get_result_block(method, params_key, response.get("result"))
+            if block is not None and (block == -1 or block <= get_head() - depth):
+                try:
+                    cache.set(chain_id, method, params_key, response["result"])
+                except (TypeError, sqlite3.Error):
+                    pass
+            return response
+
+        return cache_middleware
+
+    return middleware
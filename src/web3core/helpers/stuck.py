@@ -0,0 +1,251 @@
+"""Watch pending transactions, and replace those that are not mined
+after a few blocks with copies that pay higher fees"""
+
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypedDict,
+    Union,
+)
+
+from eth_typing import HexStr
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+from web3.types import TxParams, TxReceipt
+
+from web3core.helpers.head_cache import get_block_time
+from web3core.helpers.parallel import iter_parallel
+from web3core.types import Logger
+
+Replacer = Callable[[Dict[str, Any]], Tuple[Union[str, bytes], TxParams]]
+"""Function that signs and sends a replacement for the given pending
+transaction, and returns the hash and parameters of the replacement"""
+
+
+class WatchedTx(TypedDict):
+    """A transaction watched by StuckTxWatcher.
+
+    - original: the hash of the watched transaction.
+    - hash: the hash of the version that was mined or, while pending,
+      of the last version sent.
+    - hashes: all the versions sent, oldest first.
+    - tx: the parameters of the last version sent.
+    - sent_at: the block at which the last version was sent, or first
+      seen pending.
+    - bumps: the number of replacements sent.
+    - status: 'pending', 'success', 'reverted', 'dropped' if the nonce
+      was used by a transaction that we did not send, or 'timeout'.
+    """
+
+    original: str
+    hash: str
+    hashes: List[str]
+    sender: str
+    nonce: int
+    tx: Dict[str, Any]
+    sent_at: int
+    bumps: int
+    status: str
+    receipt: Optional[TxReceipt]
+    error: Optional[str]
+
+
+class StuckTxWatcher:
+    """Watch many pending transactions, and replace those that are stuck.
+
+    At each new block, the receipts of all the versions of the pending
+    transactions are fetched concurrently.  A transaction is stuck if
+    none of its versions is mined `stuck_blocks` blocks after the last
+    version was sent: if a `replace` function is given, it is called to
+    send a replacement with the same nonce and higher fees, up to
+    `max_bumps` times per transaction.  Transactions whose nonce was used
+    by a transaction that we did not send are 'dropped'; transactions
+    pending for more than `timeout` seconds are 'timeout'.
+
+    The head of the chain is polled every `poll_interval` seconds, by
+    default a quarter of the block time."""
+
+    def __init__(
+        self,
+        w3: Web3,
+        txs: Iterable[Any] = (),
+        stuck_blocks: int = 3,
+        max_bumps: int = 5,
+        replace: Replacer = None,
+        timeout: float = 600,
+        poll_interval: float = None,
+        concurrency: int = 8,
+        retries: int = 2,
+        logger: Logger = None,
+    ) -> None:
+        self.w3 = w3
+        self.stuck_blocks = max(stuck_blocks, 1)
+        self.max_bumps = max_bumps
+        self.replace = replace
+        self.timeout = timeout
+        if poll_interval is None:
+            poll_interval = get_block_time(w3.eth.chain_id) / 4
+        self.poll_interval = poll_interval
+        self.concurrency = concurrency
+        self.retries = retries
+        self.logger = logger or (lambda msg: None)
+        self.head: int = None
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.watched: Dict[str, WatchedTx] = {}
+        for tx in txs:
+            self.add(tx)
+
+    def add(self, tx: Any) -> None:
+        """Start watching the given transaction, as returned by
+        eth_getTransactionByHash"""
+        hash = tx["hash"] if isinstance(tx["hash"], str) else Web3.to_hex(tx["hash"])
+        self.watched[hash] = {
+            "original": hash,
+            "hash": hash,
+            "hashes": [hash],
+            "sender": tx["from"],
+            "nonce": tx["nonce"],
+            "tx": dict(tx),
+            "sent_at": self.head if self.head is not None else self.w3.eth.block_number,
+            "bumps": 0,
+            "status": "pending",
+            "receipt": None,
+            "error": None,
+        }
+
+    def __len__(self) -> int:
+        return len(self.watched)
+
+    def get_receipt(self, hash: str) -> Optional[TxReceipt]:
+        try:
+            return self.w3.eth.get_transaction_receipt(HexStr(hash))
+        except TransactionNotFound:
+            return None
+
+    def get_nonce(self, sender: str) -> int:
+        return self.w3.eth.get_transaction_count(
+            Web3.to_checksum_address(sender), "latest"
+        )
+
+    def poll(self) -> List[WatchedTx]:
+        """Check the pending transactions once, if there is a new block,
+        replace the stuck ones, and return those that are done"""
+        head = self.w3.eth.block_number
+        done: List[WatchedTx] = []
+        if head != self.head:
+            self.head = head
+            done += self.check_receipts()
+            done += self.check_nonces()
+            for watched in done:
+                del self.watched[watched["original"]]
+            for watched in self.watched.values():
+                if self.is_stuck(watched):
+                    self.bump(watched)
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            for watched in self.watched.values():
+                watched["status"] = "timeout"
+                watched["error"] = (
+                    f"Transaction {watched['original']} is not in the chain after {self.timeout} seconds"
+                )
+            done += self.watched.values()
+            self.watched = {}
+        return done
+
+    def check_receipts(self) -> List[WatchedTx]:
+        """Return the transactions with a mined version"""
+        versions = {h: w for w in self.watched.values() for h in w["hashes"]}
+        done: List[WatchedTx] = []
+        for hash, receipt, error in iter_parallel(
+            self.get_receipt, list(versions), self.concurrency, self.retries
+        ):
+            watched = versions[hash]
+            if error is not None:
+                watched["error"] = str(error)
+            if receipt is None or watched["status"] != "pending":
+                continue
+            self.set_mined(watched, hash, receipt)
+            done.append(watched)
+        return done
+
+    def check_nonces(self) -> List[WatchedTx]:
+        """Return the pending transactions whose nonce was used by a
+        transaction that we did not send.  The receipts are checked once
+        more, in case one of our versions was mined after check_receipts."""
+        pending = [w for w in self.watched.values() if w["status"] == "pending"]
+        senders = list(set(w["sender"] for w in pending))
+        nonces = {
+            sender: nonce
+            for sender, nonce, error in iter_parallel(
+                self.get_nonce, senders, self.concurrency, self.retries
+            )
+            if error is None
+        }
+        done: List[WatchedTx] = []
+        for watched in pending:
+            if watched["nonce"] >= nonces.get(watched["sender"], -1):
+                continue
+            for hash in watched["hashes"]:
+                receipt = self.get_receipt(hash)
+                if receipt is not None:
+                    self.set_mined(watched, hash, receipt)
+                    break
+            if watched["status"] == "pending":
+                watched["status"] = "dropped"
+                watched["error"] = (
+                    f"Nonce {watched['nonce']} of {watched['sender']} was used by another transaction"
+                )
+            done.append(watched)
+        return done
+
+    @staticmethod
+    def set_mined(watched: WatchedTx, hash: str, receipt: TxReceipt) -> None:
+        watched["hash"] = hash
+        watched["status"] = "success" if receipt["status"] == 1 else "reverted"
+        watched["receipt"] = receipt
+        watched["error"] = None
+
+    def is_stuck(self, watched: WatchedTx) -> bool:
+        return (
+            watched["status"] == "pending"
+            and self.head - watched["sent_at"] >= self.stuck_blocks
+        )
+
+    def bump(self, watched: WatchedTx) -> None:
+        """Send a replacement for the given stuck transaction, if allowed;
+        if the replacement cannot be sent, try again at the next block"""
+        if self.replace is None or watched["bumps"] >= self.max_bumps:
+            return
+        blocks = self.head - watched["sent_at"]
+        try:
+            hash, tx = self.replace(watched["tx"])
+        except Exception as e:
+            watched["error"] = str(e)
+            self.logger(
+                f"Could not replace tx {watched['hash']} with nonce {watched['nonce']}: {e}"
+            )
+            return
+        hash = hash if isinstance(hash, str) else Web3.to_hex(hash)
+        self.logger(
+            f"Tx {watched['hash']} with nonce {watched['nonce']} not mined after {blocks} blocks, replaced with {hash}"
+        )
+        watched["hash"] = hash
+        watched["hashes"].append(hash)
+        watched["tx"] = dict(tx)
+        watched["sent_at"] = self.head
+        watched["bumps"] += 1
+        watched["error"] = None
+
+    def watch(self) -> Iterator[WatchedTx]:
+        """Poll until all transactions are done, and yield each of them
+        as soon as it is done"""
+        while self.watched:
+            yield from self.poll()
+            if self.watched:
+                time.sleep(self.poll_interval)
@@ -0,0 +1,428 @@
+"""Run many eth_subscribe subscriptions in the same asyncio loop, sharing
+one websocket connection per RPC.
+
+Docs on the subscription types: https://geth.ethereum.org/docs/interacting-with-geth/rpc/pubsub
+"""
+
+import asyncio
+import copy
+import json
+import time
+from typing import Any, Callable, Dict, List, Set, Tuple, Union, cast
+from urllib.parse import urlparse
+
+import websockets
+from web3 import Web3
+from web3.types import TxData
+from web3client.base_client import BaseClient
+from web3client.types import AsyncSubscriptionCallback, SubscriptionType
+from websockets.client import WebSocketClientProtocol, connect
+
+from web3core.exceptions import Web3CoreError
+from web3core.helpers.heads import HeadTracker
+from web3core.helpers.lru import LruDict, LruSet
+from web3core.helpers.metrics import REGISTRY
+from web3core.helpers.misc import chunk
+from web3core.helpers.ratelimit import TokenBucket
+
+
+class Subscription:
+    """A single eth_subscribe subscription, together with the callback
+    to invoke each time one of its notifications is received.
+
+    The callback has the same signature used by web3client's
+    async_subscribe(): on_notification(data, subscription_type, tx).
+
+    To filter notifications by transaction sender, pass tx_from and a
+    client.  With full_txs, pending transactions are requested as full
+    objects (e.g. 'newPendingTransactions' with 'true' on geth) and
+    filtered without further requests.  Otherwise, or if the node sends
+    hashes anyway, transactions are fetched with the client: fetches run
+    concurrently, at most tx_fetch_concurrency at a time and at most
+    tx_fetch_rate per second, and an LRU of seen hashes ensures each
+    transaction is fetched only once.
+
+    For 'newHeads' subscriptions, pass reorgs to also receive a 'reorg'
+    notification when the chain reorganizes, and confirmations to
+    receive each block only once it has that many confirmations.  The
+    callback will be invoked with subscription_type set to 'reorg' for
+    the former.  See HeadTracker for details.
+
+    Subscriptions on the same RPC share a websocket connection, unless
+    they are given different connection indices.
+    """
+
+    def __init__(
+        self,
+        rpc_url: str,
+        type: SubscriptionType,
+        on_notification: AsyncSubscriptionCallback,
+        name: str = None,
+        logs_addresses: List[str] = None,
+        logs_topics: List[str] = None,
+        client: BaseClient = None,
+        tx_from: List[str] = None,
+        tx_on_fetch: Callable[[TxData, Any], None] = None,
+        tx_on_fetch_error: Callable[[Exception, Any], None] = None,
+        tx_fetch_timeout: int = 10,
+        full_txs: bool = False,
+        tx_fetch_concurrency: int = 10,
+        tx_fetch_rate: float = None,
+        tx_cache_size: int = 10000,
+        reorgs: bool = False,
+        confirmations: int = 0,
+        connection: int = 0,
+    ) -> None:
+        if tx_from and not client:
+            raise Web3CoreError("A client is needed to filter transactions by sender")
+        if full_txs and type != "newPendingTransactions":
+            raise Web3CoreError(
+                "Full transactions are supported only by pending subscriptions"
+            )
+        self.rpc_url = rpc_url
+        self.type = type
+        self.on_notification = on_notification
+        self.name = name or type
+        self.logs_addresses = logs_addresses or []
+        self.logs_topics = logs_topics or []
+        self.client = client
+        self.tx_from: Set[str] = {Web3.to_checksum_address(a) for a in tx_from or []}
+        self.tx_on_fetch = tx_on_fetch
+        self.tx_on_fetch_error = tx_on_fetch_error
+        self.tx_fetch_timeout = tx_fetch_timeout
+        self.full_txs = full_txs
+        self.tx_fetch_concurrency = tx_fetch_concurrency
+        self.tx_fetch_limiter = TokenBucket(tx_fetch_rate) if tx_fetch_rate else None
+        self.tx_cache = LruDict(tx_cache_size)
+        self._tx_fetch_semaphore: asyncio.Semaphore = None
+        self.reorgs = reorgs
+        self.head_tracker = (
+            HeadTracker(confirmations)
+            if type == "newHeads" and (reorgs or confirmations)
+            else None
+        )
+        self.connection = connection
+        self.id: str = None  # assigned by the node on subscription
+
+    def get_params(self) -> List[Any]:
+        """Return the params of the eth_subscribe request"""
+        params: List[Any] = [self.type]
+        if self.type == "logs":
+            logs_args: Dict[str, Any] = {}
+            if self.logs_addresses:
+                logs_args["address"] = self.logs_addresses
+            if self.logs_topics:
+                logs_args["topics"] = self.logs_topics
+            params.append(logs_args)
+        elif self.full_txs:
+            params.append(True)
+        return params
+
+    async def process(self, data: Any) -> None:
+        """Invoke the callback on the given notification data; if
+        transaction filters are set, get the transaction first, and
+        invoke the callback only if the transaction passes the filters."""
+        if self.head_tracker:
+            await self.process_head(data)
+            return
+        if not self.tx_from:
+            await self.on_notification(data, self.type, None)
+            return
+        tx = await self.get_tx(data)
+        if tx is not None and Web3.to_checksum_address(tx["from"]) in self.tx_from:
+            await self.on_notification(data, self.type, tx)
+
+    async def process_head(self, data: Any) -> None:
+        """Pass the header to the head tracker, and invoke the callback
+        for the blocks and reorgs it reports"""
+        for event_type, event_data in self.head_tracker.add(data):
+            if event_type == "reorg" and not self.reorgs:
+                continue
+            await self.on_notification(event_data, event_type, None)  # type: ignore
+
+    async def get_tx(self, data: Any) -> TxData:
+        """Return the transaction for the given notification, or None if
+        it cannot be fetched, or if it is a pending transaction that was
+        already processed.
+
+        Logs emitted by the same transaction share the same fetch."""
+        if isinstance(data, dict) and "from" in data:
+            return cast(TxData, data)  # full transaction object
+        is_pending = self.type == "newPendingTransactions"
+        tx_hash = data if is_pending else data["transactionHash"]
+        task = self.tx_cache.get(tx_hash)
+        if task is not None:
+            if is_pending:
+                return None  # duplicate notification
+            return await task
+        task = asyncio.ensure_future(self.fetch_tx(data))
+        self.tx_cache[tx_hash] = task
+        return await task
+
+    async def fetch_tx(self, data: Any) -> TxData:
+        """Fetch the transaction for the given notification in a worker
+        thread, respecting the concurrency and rate limits"""
+        if self._tx_fetch_semaphore is None:
+            self._tx_fetch_semaphore = asyncio.Semaphore(self.tx_fetch_concurrency)
+        async with self._tx_fetch_semaphore:
+            if self.tx_fetch_limiter:
+                await self.tx_fetch_limiter.acquire()
+            try:
+                tx = await asyncio.to_thread(
+                    self.client.get_tx_from_notification,
+                    self.type,
+                    data,
+                    poll_timeout=self.tx_fetch_timeout,
+                )
+            except Exception as e:
+                if self.tx_on_fetch_error:
+                    self.tx_on_fetch_error(e, data)
+                return None
+        if self.tx_on_fetch:
+            self.tx_on_fetch(tx, data)
+        return tx
+
+
+async def run_subscriptions(
+    subscriptions: List[Subscription],
+    on_subscribe: Callable[[Subscription], None] = None,
+    on_connection_closed: Callable[[Exception, str], None] = None,
+    ws_timeout: int = None,
+) -> None:
+    """Run the given subscriptions until cancelled.
+
+    Subscriptions are grouped by RPC url and connection index: each
+    group shares a single websocket connection, over which notifications
+    are routed to the right subscription via their subscription ID.
+    Each notification is processed in its own task, so that a callback
+    awaiting I/O does not hold back the others.  Callbacks run in the
+    event loop, though: blocking calls in them block all subscriptions,
+    and should be run in a worker thread, e.g. with asyncio.to_thread().
+
+    Connections are re-established, and subscriptions renewed, when
+    the node closes them.  To exit instead, raise an exception in the
+    on_connection_closed(e, rpc_url) callback.
+    """
+    groups: Dict[Tuple[str, int], List[Subscription]] = {}
+    for subscription in subscriptions:
+        key = (subscription.rpc_url, subscription.connection)
+        groups.setdefault(key, []).append(subscription)
+    await asyncio.gather(
+        *[
+            run_connection(
+                rpc_url, subs, on_subscribe, on_connection_closed, ws_timeout, index
+            )
+            for (rpc_url, index), subs in groups.items()
+        ]
+    )
+
+
+def shard_subscription(
+    subscription: Subscription,
+    max_size: int,
+    connections: int = 1,
+    merge_delay: float = 1,
+) -> List[Subscription]:
+    """Split a logs subscription with many contract addresses, or many
+    alternatives for topic0, into several subscriptions with at most
+    max_size of each, spread over the given number of connections.
+
+    The notifications of the shards are merged back into a single
+    stream, without duplicates and ordered by block and log index;
+    see LogMerger.  Return the subscription itself if it does not
+    need to be split."""
+    # topic0 is either a single topic or a list of alternatives
+    topic0: Any = subscription.logs_topics[0] if subscription.logs_topics else None
+    alternatives: List[Any] = topic0 if isinstance(topic0, list) else [topic0]
+    address_chunks = chunk(subscription.logs_addresses, max_size) or [[]]
+    topic0_chunks: List[Any] = (
+        chunk(alternatives, max_size) if len(alternatives) > 1 else [topic0]
+    )
+    if len(address_chunks) * len(topic0_chunks) == 1:
+        return [subscription]
+    merger = LogMerger(subscription.on_notification, merge_delay)
+    shards: List[Subscription] = []
+    for addresses in address_chunks:
+        for topic0_chunk in topic0_chunks:
+            shard = copy.copy(subscription)  # shares the tx fetch state
+            shard.logs_addresses = addresses
+            if subscription.logs_topics:
+                shard.logs_topics = [topic0_chunk] + subscription.logs_topics[1:]
+            shard.on_notification = merger.add
+            shard.name = f"{subscription.name} #{len(shards) + 1}"
+            shard.connection = len(shards) % max(connections, 1)
+            shards.append(shard)
+    return shards
+
+
+class LogMerger:
+    """Merge the logs received by many subscriptions into a single
+    stream, dropping duplicates (e.g. logs received again after a
+    reconnection) and sorting logs by block number and log index.
+
+    Logs are held for merge_delay seconds before being passed to the
+    callback, so that the logs of the same block received by different
+    subscriptions can be sorted together."""
+
+    def __init__(
+        self,
+        on_notification: AsyncSubscriptionCallback,
+        merge_delay: float = 1,
+        cache_size: int = 10000,
+    ) -> None:
+        self.on_notification = on_notification
+        self.merge_delay = merge_delay
+        self.seen = LruSet(cache_size)
+        self.buffer: List[Tuple[Tuple[int, int], Any, Any, Any]] = []
+        self.timer: asyncio.Task[None] = None
+
+    async def add(self, data: Any, sub_type: SubscriptionType, tx: TxData) -> None:
+        """Add a log to the stream; has the signature of a subscription
+        callback, so that it can be used as one"""
+        key = (
+            data.get("blockHash"),
+            data.get("transactionHash"),
+            data.get("logIndex"),
+            data.get("removed", False),
+        )
+        if not self.seen.add(key):
+            return
+        order = (hex_to_int(data.get("blockNumber")), hex_to_int(data.get("logIndex")))
+        self.buffer.append((order, data, sub_type, tx))
+        if self.timer is None:
+            self.timer = asyncio.create_task(self.flush_later())
+
+    async def flush_later(self) -> None:
+        await asyncio.sleep(self.merge_delay)
+        self.timer = None
+        items, self.buffer = self.buffer, []
+        for _, data, sub_type, tx in sorted(items, key=lambda item: item[0]):
+            await self.on_notification(data, sub_type, tx)
+
+
+def hex_to_int(value: Any) -> int:
+    """Convert a hex quantity from a notification to an integer"""
+    try:
+        return int(value, 16) if isinstance(value, str) else int(value or 0)
+    except ValueError:
+        return 0
+
+
+async def run_connection(
+    rpc_url: str,
+    subscriptions: List[Subscription],
+    on_subscribe: Callable[[Subscription], None] = None,
+    on_connection_closed: Callable[[Exception, str], None] = None,
+    ws_timeout: int = None,
+    index: int = 0,
+) -> None:
+    """Open a websocket connection to the given RPC, and multiplex
+    the given subscriptions over it.  See run_subscriptions().
+
+    Notification counts, queue depth, reconnections and head lag are
+    recorded in the metrics registry; `index` tells apart connections
+    to the same RPC."""
+    tasks: Set[asyncio.Task[None]] = set()
+    connection = get_connection_label(rpc_url, index)
+
+    def on_task_done(task: asyncio.Task[None]) -> None:
+        tasks.discard(task)
+        REGISTRY.set("w3_queue_depth", len(tasks), connection=connection)
+
+    async for ws in connect(rpc_url):
+        try:
+            pending = await send_subscribe_requests(ws, subscriptions)
+            routes: Dict[str, Subscription] = {}
+            while True:
+                message = parse_message(
+                    await asyncio.wait_for(ws.recv(), timeout=ws_timeout)
+                )
+                # Response to one of our eth_subscribe requests
+                if message.get("id") in pending:
+                    subscription = pending.pop(message["id"])
+                    if "result" not in message:
+                        raise Web3CoreError(
+                            f"Failed to subscribe to '{subscription.name}': {message.get('error')}"
+                        )
+                    subscription.id = message["result"]
+                    routes[subscription.id] = subscription
+                    if on_subscribe:
+                        on_subscribe(subscription)
+                    continue
+                # Notification for one of our subscriptions
+                if message.get("method") != "eth_subscription":
+                    continue
+                subscription = routes.get(message["params"]["subscription"])
+                if subscription is None:
+                    continue
+                data = message["params"]["result"]
+                record_notification(subscription, data)
+                task = asyncio.create_task(subscription.process(data))
+                tasks.add(task)
+                task.add_done_callback(on_task_done)
+                REGISTRY.set("w3_queue_depth", len(tasks), connection=connection)
+        except (
+            websockets.exceptions.ConnectionClosedError,
+            websockets.exceptions.ConnectionClosedOK,
+        ) as e:
+            REGISTRY.inc("w3_reconnects_total", connection=connection)
+            if on_connection_closed:
+                on_connection_closed(e, rpc_url)
+            continue
+
+
+def record_notification(subscription: Subscription, data: Any) -> None:
+    """Update the metrics on receiving a notification"""
+    REGISTRY.inc("w3_notifications_total", subscription=subscription.name)
+    if subscription.type == "newHeads" and isinstance(data, dict):
+        try:
+            lag = time.time() - int(data["timestamp"], 16)
+        except (KeyError, TypeError, ValueError):
+            return
+        REGISTRY.set("w3_head_lag_seconds", lag, subscription=subscription.name)
+
+
+def get_connection_label(rpc_url: str, index: int = 0) -> str:
+    """Identify a connection in metrics and logs without revealing the
+    path of the RPC url, which often contains an API key; the index
+    tells apart the connections to the same RPC"""
+    parsed = urlparse(rpc_url)
+    host = f"{parsed.scheme}://{parsed.netloc}" if parsed.netloc else parsed.scheme
+    return f"{host} #{index}"
+
+
+async def send_subscribe_requests(
+    ws: WebSocketClientProtocol, subscriptions: List[Subscription]
+) -> Dict[int, Subscription]:
+    """Send an eth_subscribe request for each of the given subscriptions,
+    all at once, and return a dictionary mapping the JSON-RPC request
+    IDs to the subscriptions."""
+    pending: Dict[int, Subscription] = {}
+    for request_id, subscription in enumerate(subscriptions, start=1):
+        pending[request_id] = subscription
+        await ws.send(
+            json.dumps(
+                {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "method": "eth_subscribe",
+                    "params": subscription.get_params(),
+                }
+            )
+        )
+    return pending
+
+
+def parse_message(message: Union[str, bytes]) -> Dict[str, Any]:
+    """Parse a message received from the websocket, making sure that
+    notifications contain the subscription ID and the result"""
+    try:
+        as_dict = json.loads(message)
+    except json.JSONDecodeError:
+        raise Web3CoreError(f"Message from websocket is malformed: {message!r}")
+    if as_dict.get("method") == "eth_subscription" and (
+        "subscription" not in as_dict.get("params", {})
+        or "result" not in as_dict.get("params", {})
+    ):
+        raise Web3CoreError(f"Notification from websocket is malformed: {message!r}")
+    return as_dict
@@ -1,8 +1,22 @@
+import asyncio
 import json
-from typing import Any
+import threading
+import time
+from typing import Any, Callable, Dict, List
 
 import requests
 
+from web3core.helpers.ratelimit import TokenBucket
+
+TG_MAX_MESSAGE_LENGTH = 4096
+"""Telegram refuses messages longer than this"""
+
+CHAT_LIMITERS: Dict[str, TokenBucket] = {}
+"""Rate limiters shared by all the messages sent to the same chat"""
+
+CHAT_LIMITERS_LOCK = threading.Lock()
+"""Guards CHAT_LIMITERS, since messages can be sent from worker threads"""
+
 
 def send_tg_message(
     body: str,
@@ -11,11 +25,18 @@ def send_tg_message(
     disable_notifications: bool = True,
     timeout: int = 1,
     parse_mode: str = "markdown",
+    rate_limit: float = None,
     **kwargs: Any,
 ) -> bool:
     """
     Send a Telegram message using the REST api.
 
+    If rate_limit is given, wait as needed to send at most that many
+    messages per second to the chat.  If Telegram answers that too many
+    requests were sent, wait for the requested time and retry once.
+    The function blocks while waiting: from async code, run it in a
+    worker thread, e.g. with asyncio.to_thread().
+
     Docs: https://core.telegram.org/bots/api#sendmessage
     """
     headers = {"Content-Type": "application/json"}
@@ -28,8 +49,97 @@ def send_tg_message(
 
     url = f"https://api.telegram.org/bot{api_key}/sendMessage"
 
+    if rate_limit:
+        get_chat_limiter(chat_id, rate_limit).acquire_sync()
+
     response = requests.post(
         url, data=json.dumps(data), headers=headers, timeout=timeout
     )
 
+    if response.status_code == 429:
+        try:
+            retry_after = response.json()["parameters"]["retry_after"]
+        except Exception:
+            retry_after = 1
+        time.sleep(retry_after)
+        response = requests.post(
+            url, data=json.dumps(data), headers=headers, timeout=timeout
+        )
+
     return response.ok
+
+
+def get_chat_limiter(chat_id: str, rate: float) -> TokenBucket:
+    """Return the rate limiter for the given chat, creating it if needed"""
+    key = str(chat_id)
+    with CHAT_LIMITERS_LOCK:
+        if key not in CHAT_LIMITERS or CHAT_LIMITERS[key].rate != rate:
+            CHAT_LIMITERS[key] = TokenBucket(rate)
+        return CHAT_LIMITERS[key]
+
+
+class Digest:
+    """Group many messages into a single one, to stay within the
+    Telegram rate limits during bursts of notifications.
+
+    Messages are collected until either `count` messages are collected
+    or `window` seconds have passed since the first one; then they are
+    joined and passed to the send function, which runs in a worker
+    thread.  Digests longer than Telegram allows are split in more
+    messages."""
+
+    def __init__(
+        self,
+        send: Callable[[str], Any],
+        window: float = None,
+        count: int = None,
+        separator: str = "\n\n",
+        max_length: int = TG_MAX_MESSAGE_LENGTH,
+    ) -> None:
+        self.send = send
+        self.window = window
+        self.count = count
+        self.separator = separator
+        self.max_length = max_length
+        self.messages: List[str] = []
+        self.timer: asyncio.Task[None] = None
+
+    async def add(self, message: str) -> None:
+        """Add a message to the digest, and send the digest if full"""
+        self.messages.append(message)
+        if self.count and len(self.messages) >= self.count:
+            await self.flush()
+        elif self.window and self.timer is None:
+            self.timer = asyncio.create_task(self.flush_later())
+
+    async def flush_later(self) -> None:
+        await asyncio.sleep(self.window)
+        self.timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Send the collected messages, if any"""
+        if self.timer is not None and self.timer is not asyncio.current_task():
+            self.timer.cancel()
+            self.timer = None
+        messages, self.messages = self.messages, []
+        for body in self.join(messages):
+            await asyncio.to_thread(self.send, body)
+
+    def join(self, messages: List[str]) -> List[str]:
+        """Join the messages in as few bodies as possible, each within
+        the maximum length; longer messages are truncated"""
+        bodies: List[str] = []
+        current = ""
+        for message in messages:
+            message = message[: self.max_length]
+            if not current:
+                current = message
+            elif len(current) + len(self.separator) + len(message) <= self.max_length:
+                current += self.separator + message
+            else:
+                bodies.append(current)
+                current = message
+        if current:
+            bodies.append(current)
+        return bodies
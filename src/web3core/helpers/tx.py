@@ -1,10 +1,18 @@
+import sqlite3
 import time
+from typing import Any, Dict, List, Optional, Sequence, cast
 
+from web3 import Web3
 from web3.contract.contract import ContractFunction
 from web3.exceptions import TransactionNotFound
-from web3.types import Nonce, TxData, Wei
+from web3.types import Nonce, TxData, TxParams, Wei
 from web3client.base_client import BaseClient
 
+from web3core.helpers.batch import SignedTxRecord, make_signed_tx_record
+from web3core.helpers.broadcast import broadcast_raw_tx, raise_if_not_accepted
+from web3core.helpers.gas_cache import GasCache, get_gas_key
+from web3core.helpers.nonce import NonceManager
+from web3core.helpers.receipts import wait_for_receipt
 from web3core.types import TxLife
 
 
@@ -20,6 +28,10 @@ def send_contract_tx(
     nonce: Nonce = None,
     gas_limit: int = None,
     max_priority_fee_in_gwei: float = None,
+    nonce_manager: NonceManager = None,
+    broadcast_urls: List[str] = None,
+    gas_cache: GasCache = None,
+    gas_cache_args: Dict[str, Any] = None,
 ) -> TxLife:
     """Send a transaction to a contract function, and return its details
 
@@ -47,6 +59,18 @@ def send_contract_tx(
     - gas_limit (int): The gas limit to use for the transaction.
     - max_priority_fee_in_gwei (float): The max priority fee per gas to use
       for the transaction.
+    - nonce_manager (NonceManager): If given, and no nonce is given, reserve
+      the nonce with the manager instead of fetching it from the chain.  If
+      the transaction cannot be sent, the nonce is released.
+    - broadcast_urls (List[str]): If given, send the signed transaction to
+      all these HTTP RPCs at the same time, instead of the RPC of the
+      client.  The transaction is sent if at least one RPC accepts it.
+    - gas_cache (GasCache): If given, and no gas limit is given, take the
+      gas limit from the gas used by past transactions to the same
+      function, skipping the gas estimate; the gas used by the transaction
+      is recorded in the cache if its receipt is fetched.
+    - gas_cache_args (Dict[str, Any]): Extra arguments for
+      GasCache.get_gas_limit, e.g. the percentile and the safety margin.
 
     RETURNS
     -------
@@ -60,6 +84,7 @@ def send_contract_tx(
     call is True.
     - data: The transaction data, if fetch_data is True.
     - receipt: The transaction receipt, if fetch_receipt is True.
+    - broadcast: The outcome for each RPC, if broadcast_urls is given.
     """
     # Prepare output
     tx_life: TxLife = {
@@ -69,35 +94,88 @@ def send_contract_tx(
         "output": None,
         "data": None,
         "receipt": None,
+        "broadcast": None,
     }
-    # Build transaction
-    tx_life["params"] = client.build_contract_tx(
-        function,
-        value_in_wei=value_in_wei,
-        nonce=nonce,
-        gas_limit=gas_limit,
-        max_priority_fee_in_gwei=max_priority_fee_in_gwei,
-    )
-    # Sign transaction
-    signed_tx = client.sign_tx(tx_life["params"])
-    tx_life["sig"] = signed_tx._asdict()
-    # Call function
-    if call:
-        tx_life["output"] = function.call({"from": from_address or client.user_address})
-    # Send transaction
+    # Take the gas limit from past transactions
+    chain_id = getattr(client, "chain_id", None)
+    if gas_cache and chain_id is None:
+        gas_cache = None
+    if gas_cache and gas_limit is None:
+        gas_limit = get_cached_gas_limit(
+            gas_cache, chain_id, function, **(gas_cache_args or {})
+        )
+    # Reserve nonce
+    reserved = nonce is None and nonce_manager is not None and not dry_run
+    if reserved:
+        nonce = Nonce(nonce_manager.reserve())
+    try:
+        # Build transaction
+        tx_life["params"] = client.build_contract_tx(
+            function,
+            value_in_wei=value_in_wei,
+            nonce=nonce,
+            gas_limit=gas_limit,
+            max_priority_fee_in_gwei=max_priority_fee_in_gwei,
+        )
+        # Sign transaction
+        signed_tx = client.sign_tx(tx_life["params"])
+        tx_life["sig"] = signed_tx._asdict()
+        # Call function
+        if call:
+            tx_life["output"] = function.call(
+                {"from": from_address or client.user_address}
+            )
+        # Send transaction
+        if not dry_run and broadcast_urls:
+            tx_life["broadcast"] = broadcast_raw_tx(
+                signed_tx.rawTransaction, broadcast_urls
+            )
+            raise_if_not_accepted(tx_life["broadcast"])
+            tx_life["hash"] = Web3.to_hex(signed_tx.hash)
+        elif not dry_run:
+            tx_life["hash"] = client.send_signed_tx(signed_tx)
+    except Exception as e:
+        if reserved:
+            nonce_manager.fail(nonce, e)
+        raise
     if not dry_run:
-        tx_life["hash"] = client.send_signed_tx(signed_tx)
         if fetch_data:
             tx_life["data"] = poll_transaction(client, tx_life["hash"])
         if fetch_receipt:
-            tx_life["receipt"] = client.get_tx_receipt(tx_life["hash"])
+            tx_life["receipt"] = wait_for_receipt(client.w3, tx_life["hash"])
+            if gas_cache and tx_life["receipt"]["status"] == 1:
+                try:
+                    gas_cache.add_tx(
+                        chain_id, tx_life["params"], tx_life["receipt"]["gasUsed"]
+                    )
+                except sqlite3.Error:
+                    pass
     else:
         tx_life["hash"] = signed_tx.hash.hex()
     return tx_life
 
 
+def get_cached_gas_limit(
+    gas_cache: GasCache, chain_id: int, function: ContractFunction, **kwargs: Any
+) -> Optional[int]:
+    """Return a gas limit for a call to the given contract function,
+    based on the gas used by past calls, or None if there is not enough
+    history or the cache cannot be read; see GasCache.get_gas_limit for
+    the other arguments"""
+    key = get_gas_key(function._encode_transaction_data())
+    if not key:
+        return None
+    try:
+        return gas_cache.get_gas_limit(chain_id, function.address, key, **kwargs)
+    except sqlite3.Error:
+        return None
+
+
 def poll_transaction(
-    client: BaseClient, tx_hash: str, poll_interval: int = 1, poll_timeout: int = 30
+    client: BaseClient,
+    tx_hash: str,
+    poll_interval: float = 1,
+    poll_timeout: float = 30,
 ) -> TxData:
     """Get a transaction from the blockchain. If the transaction is not
     found, poll until it is found. If it is not found after poll_timeout
@@ -107,9 +185,10 @@ def poll_transaction(
     ---------
     - client (BaseClient): The client to use to send the transaction.
     - tx_hash (str): The transaction hash.
-    - poll_interval (int): The number of seconds to wait between polls. Set
+    - poll_interval (float): The number of seconds to wait before the first
+      retry; the wait doubles at each retry, up to 8 times this value. Set
       to None to disable polling.
-    - poll_timeout (int): The number of seconds to wait before timing out,
+    - poll_timeout (float): The number of seconds to wait before timing out,
       and returning None. Set to None to wait indefinitely. Set to zero
       to disable polling.
 
@@ -120,11 +199,133 @@ def poll_transaction(
     if poll_interval is None:
         return client.get_tx(tx_hash)
 
-    start_time = time.time()
+    deadline = time.monotonic() + poll_timeout if poll_timeout is not None else None
+    interval: float = poll_interval
     while True:
         try:
             return client.get_tx(tx_hash)
         except TransactionNotFound:
-            time.sleep(poll_interval)
-            if time.time() - start_time > poll_timeout:
+            if deadline is not None and time.monotonic() >= deadline:
                 return None
+            if deadline is not None:
+                interval = min(interval, max(deadline - time.monotonic(), 0))
+            time.sleep(interval)
+            interval = min(interval * 2, poll_interval * 8)
+
+
+def bump_fees(tx: TxParams, multiplier: float) -> TxParams:
+    """Return the fee fields of the given transaction multiplied by the
+    given factor: maxFeePerGas and maxPriorityFeePerGas for EIP-1559
+    transactions, gasPrice for legacy transactions"""
+    fees: Dict[str, Any] = {}
+    for key in ("maxFeePerGas", "maxPriorityFeePerGas", "gasPrice"):
+        if tx.get(key) is not None:
+            fees[key] = Wei(int(int(tx[key]) * multiplier))  # type: ignore
+    return cast(TxParams, fees)
+
+
+def get_fee_fields(tx: Any) -> TxParams:
+    """Return the fee fields that the given transaction pays with:
+    maxFeePerGas and maxPriorityFeePerGas for EIP-1559 transactions,
+    gasPrice for legacy transactions.  Fetched EIP-1559 transactions
+    also have a gasPrice field, which is ignored."""
+    if tx.get("maxFeePerGas") or tx.get("maxPriorityFeePerGas"):
+        keys = ["maxFeePerGas", "maxPriorityFeePerGas"]
+    else:
+        keys = ["gasPrice"]
+    return cast(TxParams, {k: tx[k] for k in keys if tx.get(k) is not None})
+
+
+def build_replay_tx(
+    original_tx: Any,
+    base_tx: TxParams,
+    fee_multiplier: float = 0,
+    gas_multiplier: float = 1.2,
+) -> TxParams:
+    """Return a transaction that does the same as the given one: same
+    recipient, input data, value and type.
+
+    The other fields, such as the nonce, are taken from the given base
+    transaction, as built by BaseClient.build_base_tx.  The gas limit is
+    the one of the original transaction times `gas_multiplier`.  The
+    fees are those of the original transaction times `fee_multiplier`;
+    set it to zero to keep the fees of the base transaction."""
+    tx = cast(Dict[str, Any], dict(base_tx))
+    # Make sure you call the same contract
+    tx["to"] = original_tx["to"]
+    # Make sure you call the same method with same args
+    data = original_tx.get("input") or original_tx.get("data")
+    if data:
+        tx["data"] = data
+    # Make sure you pay the same amount
+    tx["value"] = original_tx["value"]
+    # Make sure you send the same type of transaction
+    if original_tx.get("type"):
+        tx["type"] = original_tx["type"]
+    # Make sure you use the right amount of gas
+    tx["gas"] = int(int(original_tx["gas"]) * gas_multiplier)
+    # Use the same fees, possibly multiplied
+    if fee_multiplier != 0:
+        tx |= bump_fees(get_fee_fields(original_tx), fee_multiplier)
+    return cast(TxParams, tx)
+
+
+def build_replacement_tx(
+    tx: Any, base_tx: TxParams, fee_bump: float = 1.125
+) -> TxParams:
+    """Return a transaction that replaces the given pending transaction:
+    same nonce, recipient, data, value and gas limit, with the fees
+    multiplied by `fee_bump`.  If the fees of the given base transaction,
+    as built by BaseClient.build_base_tx, are higher, they are used
+    instead, so that the replacement is priced for the current chain
+    conditions.
+
+    Nodes accept a replacement only if all its fees are at least 10%
+    higher than those of the pending transaction."""
+    replacement = cast(Dict[str, Any], build_replay_tx(tx, base_tx, gas_multiplier=1))
+    replacement["nonce"] = tx["nonce"]
+    for key in ("maxFeePerGas", "maxPriorityFeePerGas", "gasPrice"):
+        replacement.pop(key, None)
+    bumped = cast(Dict[str, int], bump_fees(get_fee_fields(tx), fee_bump))
+    for key, fee in bumped.items():
+        replacement[key] = max(fee, int(base_tx.get(key) or 0))  # type: ignore
+    if "gasPrice" in bumped:
+        replacement.pop("type", None)
+    elif replacement.get("maxFeePerGas", 0) < replacement.get(
+        "maxPriorityFeePerGas", 0
+    ):
+        replacement["maxFeePerGas"] = replacement["maxPriorityFeePerGas"]
+    return cast(TxParams, replacement)
+
+
+def sign_contract_txs(
+    client: BaseClient,
+    functions: Sequence[ContractFunction],
+    nonces: Sequence[int],
+    gas_limit: int,
+    max_priority_fee_in_gwei: float = None,
+    fee_bump: float = 1,
+) -> List[SignedTxRecord]:
+    """Build and sign a transaction for each of the given contract
+    functions, with the given nonces and a fixed gas limit, so that they
+    can be sent later with no further request.
+
+    The gas fees are fetched only once; the fees of each transaction are
+    `fee_bump` times the fees of the previous one."""
+    base_tx = client.build_base_tx(
+        nonce=Nonce(0),
+        gas_limit=gas_limit,
+        max_priority_fee_in_gwei=max_priority_fee_in_gwei,
+    )
+    records: List[SignedTxRecord] = []
+    for i, (function, nonce) in enumerate(zip(functions, nonces)):
+        params = function.build_transaction(
+            base_tx | {"nonce": Nonce(nonce)} | bump_fees(base_tx, fee_bump**i)
+        )
+        signed_tx = client.sign_tx(params)
+        records.append(
+            make_signed_tx_record(
+                params, signed_tx.rawTransaction, signed_tx.hash, function.fn_name
+            )
+        )
+    return records
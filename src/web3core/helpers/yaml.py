@@ -42,3 +42,10 @@ def set(
 
     if logger:
         logger(f"Updated file '{filepath}' with setting '{setting}={value}'")
+
+
+def load(filepath: str) -> Any:
+    """Parse a YAML file in a python object"""
+    yaml = ruamel.yaml.YAML(typ="safe", pure=True)
+    with open(filepath, "r", encoding="utf-8") as file:
+        return yaml.load(file)
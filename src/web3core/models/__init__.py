@@ -3,8 +3,10 @@ from typing import List, Type
 from peewee import Model
 
 from web3core.models.address import Address
+from web3core.models.block_sample import BlockSample
 from web3core.models.chain import Chain, ChainRpc, Rpc
 from web3core.models.contract import Contract, ContractType
+from web3core.models.log import IndexedContract, Log
 from web3core.models.signer import Signer
 from web3core.models.tx import Tx
 
@@ -17,4 +19,7 @@ MODELS: List[Type[Model]] = [
     Tx,
     ContractType,
     Contract,
+    Log,
+    IndexedContract,
+    BlockSample,
 ]
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+from peewee import BigIntegerField, TextField
+
+from web3core.models.base_model import BaseModel
+
+
+class BlockSample(BaseModel):
+    """Timestamp of a block, cached to speed up the search of blocks
+    by time; see `w3 block-at`"""
+
+    class Meta:
+        table_name = "block_samples"
+        indexes = (
+            (("chain", "block"), True),
+            (("chain", "timestamp"), False),
+        )
+
+    chain = TextField()
+    block = BigIntegerField()
+    timestamp = BigIntegerField()
+
+    @classmethod
+    def save_sample(cls, chain: str, block: int, timestamp: int) -> None:
+        """Store the timestamp of the given block, if not stored already"""
+        cls.insert(
+            chain=chain, block=block, timestamp=timestamp
+        ).on_conflict_ignore().execute()
+
+    @classmethod
+    def get_bounds(cls, chain: str, timestamp: int) -> Tuple[BlockSample, BlockSample]:
+        """Return the cached samples closest to the given timestamp: the
+        last one before it, and the first one at or after it.  Either
+        can be None."""
+        before = (
+            cls.select()
+            .where((cls.chain == chain) & (cls.timestamp < timestamp))
+            .order_by(cls.timestamp.desc(), cls.block.desc())
+            .first()
+        )
+        after = (
+            cls.select()
+            .where((cls.chain == chain) & (cls.timestamp >= timestamp))
+            .order_by(cls.timestamp, cls.block)
+            .first()
+        )
+        return before, after
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import List, Type
 
-from peewee import TextField
+from peewee import TextField, fn
 from playhouse.signals import pre_save
 from playhouse.sqlite_ext import JSONField
 from web3._utils.validation import validate_abi
@@ -62,6 +62,15 @@ class Contract(BaseModel):
                 f"Contract '{name}' on chain '{chain}' does not exist"
             )
 
+    @classmethod
+    def get_by_address_and_chain(cls, address: str, chain: str) -> Contract:
+        """Return the first contract with the given address on the given
+        chain, or None if it does not exist.  The address is compared
+        case-insensitively."""
+        return cls.get_or_none(
+            (fn.LOWER(cls.address) == address.lower()) & (cls.chain == chain)
+        )
+
     @classmethod
     def get_by_name_chain_and_types_or_raise(
         cls, name: str, chain: str, types: List[str]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import List
+
+from peewee import BigIntegerField, IntegerField, TextField
+from playhouse.sqlite_ext import JSONField
+
+from web3core.models.base_model import BaseModel
+
+
+class Log(BaseModel):
+    """Event log stored in the local index; see `w3 index`"""
+
+    class Meta:
+        table_name = "logs"
+        indexes = (
+            (("chain", "tx_hash", "log_index"), True),
+            (("chain", "address", "block"), False),
+            (("chain", "topic0", "block"), False),
+            (("chain", "event", "block"), False),
+        )
+
+    chain = TextField()
+    block = BigIntegerField()
+    block_hash = TextField()
+    tx_hash = TextField()
+    log_index = IntegerField()
+    address = TextField()  # lowercase
+    topic0 = TextField(null=True)
+    topic1 = TextField(null=True)
+    topic2 = TextField(null=True)
+    topic3 = TextField(null=True)
+    data = TextField()
+    event = TextField(null=True)
+    decoded = JSONField(null=True)
+
+
+class IndexedContract(BaseModel):
+    """Contract whose logs are synced to the local index"""
+
+    class Meta:
+        table_name = "indexed_contracts"
+        indexes = ((("chain", "address"), True),)
+
+    chain = TextField()
+    address = TextField()  # lowercase
+    from_block = BigIntegerField()
+    last_block = BigIntegerField()
+
+    @classmethod
+    def get_by_chain(
+        cls, chain: str, addresses: List[str] = None
+    ) -> List[IndexedContract]:
+        """Return the indexed contracts on the given chain, optionally
+        only those with the given addresses"""
+        query = cls.select().where(cls.chain == chain)
+        if addresses:
+            query = query.where(cls.address << [a.lower() for a in addresses])
+        return list(query.order_by(cls.address))
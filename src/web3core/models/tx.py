@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import re
-from typing import Type
+from typing import List, Type
 
-from peewee import BigIntegerField, DateTimeField, IntegerField, TextField
+from peewee import BigIntegerField, DateTimeField, IntegerField, TextField, fn
 from playhouse.signals import pre_save
 
 from web3core.exceptions import AddressIsInvalid, TxIsInvalid, TxNotFound
@@ -48,6 +48,15 @@ class Tx(TimestampsModel):
         except:
             raise TxNotFound(f"Transaction '{hash}' does not exist")
 
+    @classmethod
+    def get_pending(cls, chain: str, from_: str = None) -> List[Tx]:
+        """Return the transactions on the given chain that have no
+        receipt yet, optionally only those sent from the given address"""
+        query = cls.select().where((cls.chain == chain) & (cls.receipt.is_null()))
+        if from_:
+            query = query.where(fn.LOWER(cls.from_) == from_.lower())
+        return list(query.order_by(cls.nonce, cls.created_at))
+
     @classmethod
     def is_valid_hash(cls, hash: str) -> bool:
         """Is the hash a valid EVM tx hash?"""
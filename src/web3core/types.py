@@ -1,11 +1,22 @@
-from typing import Any, Callable, Literal, TypedDict
+from typing import Any, Callable, List, Literal, TypedDict
 
 from eth_account.datastructures import SignedTransaction
+from eth_typing import HexStr
 from web3.types import TxData, TxParams, TxReceipt
 
 Logger = Callable[[str], None]
 
 
+class BroadcastResult(TypedDict):
+    """Outcome of sending a raw transaction to one RPC"""
+
+    url: str
+    accepted: bool
+    hash: HexStr
+    error: str
+    elapsed: float
+
+
 class TxLife(TypedDict):
     """A dictionary containing the life cylce of a transaction.
 
@@ -26,6 +37,8 @@ class TxLife(TypedDict):
             This is only present if the transaction was sent.
         - receipt: The transaction receipt. This is only present if the
             transaction was sent.
+        - broadcast: The outcome of sending the transaction to each RPC,
+            if it was broadcast to many RPCs.
     """
 
     params: TxParams
@@ -34,8 +47,11 @@ class TxLife(TypedDict):
     output: Any
     data: TxData
     receipt: TxReceipt
+    broadcast: List[BroadcastResult]
 
 
 TX_LIFE_PROPERTIES = list(TxLife.__annotations__.keys())
 
-TxLifeProperty = Literal["params", "hash", "sig", "output", "data", "receipt"]
+TxLifeProperty = Literal[
+    "params", "hash", "sig", "output", "data", "receipt", "broadcast"
+]
@@ -0,0 +1,65 @@
+import json
+import os
+from typing import Any
+
+import pytest
+
+import ape
+from tests.web3cli.main import Web3CliTest
+from web3cli.exceptions import Web3CliError
+
+
+def sign_transfers(app: Web3CliTest, to: str, amounts: list[int], dir: Any) -> str:
+    """Sign transfers of the given amounts of wei from alice, without
+    sending them, and return the path of the file with the signed txs"""
+    batch = os.path.join(dir, "batch.csv")
+    with open(batch, "w") as file:
+        file.write("to,amount,ticker,unit\n")
+        for amount in amounts:
+            file.write(f"{to},{amount},ETH,wei\n")
+    signed = os.path.join(dir, "txs.jsonl")
+    app.set_args(
+        ["send", "--batch", batch, "--sign-to", signed, "--signer", "alice", "--force"]
+    ).run()
+    return signed
+
+
+@pytest.mark.local
+def test_broadcast(
+    app: Web3CliTest,
+    alice: ape.api.AccountAPI,
+    bob: ape.api.AccountAPI,
+    tmp_path: Any,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    bob_balance = bob.balance
+    signed = sign_transfers(app, bob.address, [1, 2, 3], tmp_path)
+    assert bob.balance == bob_balance
+    capsys.readouterr()
+    app.set_args(["broadcast", signed, "--wait", "--at-block", "+0"]).run()
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [r["status"] for r in records] == ["success"] * 3
+    assert all(r["gas_used"] > 0 for r in records)
+    nonces = [r["nonce"] for r in records]
+    assert nonces == list(range(nonces[0], nonces[0] + 3))
+    assert bob.balance == bob_balance + 6
+
+
+@pytest.mark.local
+def test_broadcast_invalid_block_offset(
+    app: Web3CliTest,
+    alice: ape.api.AccountAPI,
+    bob: ape.api.AccountAPI,
+    tmp_path: Any,
+) -> None:
+    bob_balance = bob.balance
+    signed = sign_transfers(app, bob.address, [1], tmp_path)
+    with pytest.raises(Web3CliError, match="Block offset must be"):
+        app.set_args(["broadcast", signed, "--at-block", "+x"]).run()
+    assert bob.balance == bob_balance
+
+
+@pytest.mark.local
+def test_broadcast_missing_file(app: Web3CliTest, tmp_path: Any) -> None:
+    with pytest.raises(Web3CliError, match="Could not read signed transactions"):
+        app.set_args(["broadcast", os.path.join(tmp_path, "missing.jsonl")]).run()
@@ -0,0 +1,52 @@
+import json
+from typing import Any
+
+import pytest
+
+import ape
+from tests.seed import seed_local_token
+from tests.web3cli.main import Web3CliTest
+from web3cli.exceptions import Web3CliError
+
+
+@pytest.mark.local
+def test_index_sync_and_query(
+    app: Web3CliTest,
+    alice: ape.api.AccountAPI,
+    bob: ape.api.AccountAPI,
+    TST: ape.contracts.ContractInstance,
+    ape_chain: ape.managers.chain.ChainManager,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    seed_local_token(app, TST)
+    from_block = ape_chain.blocks.height + 1
+    TST.transfer(bob, 100, sender=alice)
+    TST.transfer(bob, 200, sender=alice)
+    app.set_args(["index", "add", "tst", "--from-block", str(from_block)]).run()
+    app.set_args(["index", "sync"]).run()
+    capsys.readouterr()
+    app.set_args(["index", "query", "--event", "Transfer"]).run()
+    logs: list[dict[str, Any]] = [
+        json.loads(line) for line in capsys.readouterr().out.splitlines()
+    ]
+    assert len(logs) == 2
+    assert all(log["address"] == TST.address.lower() for log in logs)
+    assert [log["decoded"]["args"]["to"] for log in logs] == [bob.address] * 2
+    assert [log["decoded"]["args"]["value"] for log in logs] == [100, 200]
+    assert logs[0]["block"] < logs[1]["block"]
+    # Sync again: new events only are added
+    TST.transfer(bob, 300, sender=alice)
+    app.set_args(["index", "sync"]).run()
+    capsys.readouterr()
+    app.set_args(["index", "query", "--event", "Transfer", "--limit", "5"]).run()
+    values = [
+        json.loads(line)["decoded"]["args"]["value"]
+        for line in capsys.readouterr().out.splitlines()
+    ]
+    assert values == [100, 200, 300]
+
+
+@pytest.mark.local
+def test_index_sync_without_contracts(app: Web3CliTest) -> None:
+    with pytest.raises(Web3CliError, match="No contracts to sync"):
+        app.set_args(["index", "sync"]).run()
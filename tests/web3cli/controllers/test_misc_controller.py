@@ -178,6 +178,68 @@ def test_base_fee(app: Web3CliTest, is_eip1559: bool) -> None:
     assert data >= 0
 
 
+@pytest.mark.local
+def test_fees(
+    app: Web3CliTest,
+    alice: ape.api.AccountAPI,
+    bob: ape.api.AccountAPI,
+    ape_chain: ape.managers.chain.ChainManager,
+    is_eip1559: bool,
+) -> None:
+    if not is_eip1559:
+        pytest.skip("Local chain does not have fee history")
+    alice.transfer(bob, 10000)
+    ape_chain.mine(3)
+    app.set_args(["fees", "--blocks", "3", "--percentiles", "90", "10"]).run()
+    data, output = app.last_rendered
+    assert data["newest_block"] == ape_chain.blocks.height
+    assert data["oldest_block"] == ape_chain.blocks.height - 2
+    assert len(data["base_fees"]) == 3
+    assert data["next_base_fee"] >= 0
+    assert list(data["priority_fees"]) == ["p10", "p90"]
+
+
+@pytest.mark.local
+def test_fees_invalid_percentile(app: Web3CliTest) -> None:
+    with pytest.raises(Web3CliError, match="between 0 and 100"):
+        app.set_args(["fees", "--percentiles", "50", "101"]).run()
+
+
+@pytest.mark.local
+def test_block_at(app: Web3CliTest, ape_chain: ape.managers.chain.ChainManager) -> None:
+    # Leave a gap of 1000 seconds before the last block
+    ape_chain.mine(deltatime=1000)
+    block = ape_chain.blocks.head
+    app.set_args(["block-at", str(block.timestamp)]).run()
+    data, output = app.last_rendered
+    assert data == block.number
+    # The gap is before the last block
+    app.set_args(["block-at", str(block.timestamp - 500)]).run()
+    data, output = app.last_rendered
+    assert data == block.number
+    app.set_args(["block-at", str(block.timestamp - 500), "--before"]).run()
+    data, output = app.last_rendered
+    assert data == block.number - 1
+
+
+@pytest.mark.local
+def test_block_at_after_the_latest_block(
+    app: Web3CliTest, ape_chain: ape.managers.chain.ChainManager
+) -> None:
+    timestamp = ape_chain.blocks.head.timestamp + 10**6
+    with pytest.raises(Web3CliError, match="after the latest block"):
+        app.set_args(["block-at", str(timestamp)]).run()
+    app.set_args(["block-at", str(timestamp), "--before"]).run()
+    data, output = app.last_rendered
+    assert data == ape_chain.blocks.head.number
+
+
+@pytest.mark.local
+def test_block_at_invalid_date(app: Web3CliTest) -> None:
+    with pytest.raises(Web3CliError, match="Invalid date"):
+        app.set_args(["block-at", "yesterday"]).run()
+
+
 @pytest.mark.parametrize(
     ["input", "expected"],
     [
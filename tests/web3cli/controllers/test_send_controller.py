@@ -1,8 +1,14 @@
+import csv
+import json
+import os
+from typing import Any
+
 import pytest
 
 import ape
 from tests.seed import seed_local_token
 from tests.web3cli.main import Web3CliTest
+from web3cli.exceptions import Web3CliError
 
 
 @pytest.mark.local
@@ -127,3 +133,80 @@ def test_send_token6_smallest(
         ]
     ).run()
     assert TST6.balanceOf(bob.address) == bob_balance + 1
+
+
+@pytest.mark.local
+@pytest.mark.parametrize(
+    "option", [["--dry-run"], ["--sign-to", "txs.jsonl"], ["--broadcast"]]
+)
+def test_send_options_require_batch(
+    app: Web3CliTest,
+    alice: ape.api.AccountAPI,
+    bob: ape.api.AccountAPI,
+    option: list[str],
+    tmp_path: Any,
+) -> None:
+    bob_balance = bob.balance
+    args = ["send", bob.address, "1", "ETH", "--signer", "alice", "--force"]
+    if option[0] == "--sign-to":
+        option = [option[0], os.path.join(tmp_path, option[1])]
+    with pytest.raises(Web3CliError, match="requires --batch"):
+        app.set_args(args + option).run()
+    assert bob.balance == bob_balance
+    assert not os.path.exists(os.path.join(tmp_path, "txs.jsonl"))
+
+
+@pytest.mark.local
+def test_send_batch(
+    app: Web3CliTest,
+    alice: ape.api.AccountAPI,
+    bob: ape.api.AccountAPI,
+    TST: ape.contracts.ContractInstance,
+    tmp_path: Any,
+) -> None:
+    bob_balance = bob.balance
+    bob_token_balance = TST.balanceOf(bob.address)
+    seed_local_token(app, TST)
+    batch = os.path.join(tmp_path, "batch.csv")
+    with open(batch, "w") as file:
+        file.write("to,amount,ticker,unit\n")
+        file.write(f"{bob.address},1,ETH,\n")
+        file.write(f"bob,2,{TST.symbol()},\n")
+        file.write(f"{bob.address},3,ETH,wei\n")
+    app.set_args(["send", "--batch", batch, "--signer", "alice", "--force"]).run()
+    data, output = app.last_rendered
+    assert data == {"success": 3}
+    assert bob.balance == bob_balance + 10**18 + 3
+    assert TST.balanceOf(bob.address) == bob_token_balance + 2 * 10**18
+    with open(os.path.join(tmp_path, "batch.results.csv")) as file:
+        results = list(csv.DictReader(file))
+    assert [r["status"] for r in results] == ["success"] * 3
+    nonces = [int(r["nonce"]) for r in results]
+    assert nonces == list(range(nonces[0], nonces[0] + 3))
+
+
+@pytest.mark.local
+def test_send_batch_dry_run_and_sign_to(
+    app: Web3CliTest,
+    alice: ape.api.AccountAPI,
+    bob: ape.api.AccountAPI,
+    tmp_path: Any,
+) -> None:
+    bob_balance = bob.balance
+    batch = os.path.join(tmp_path, "batch.csv")
+    with open(batch, "w") as file:
+        file.write("to,amount,ticker\n")
+        file.write(f"{bob.address},1,ETH\n")
+        file.write(f"{bob.address},2,ETH\n")
+    app.set_args(
+        ["send", "--batch", batch, "--dry-run", "--signer", "alice", "--force"]
+    ).run()
+    signed = os.path.join(tmp_path, "txs.jsonl")
+    app.set_args(
+        ["send", "--batch", batch, "--sign-to", signed, "--signer", "alice", "--force"]
+    ).run()
+    assert bob.balance == bob_balance
+    with open(signed) as file:
+        records = [json.loads(line) for line in file]
+    assert [r["to"] for r in records] == [bob.address] * 2
+    assert records[1]["nonce"] == records[0]["nonce"] + 1
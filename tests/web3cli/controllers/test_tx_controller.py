@@ -1,7 +1,9 @@
 import json
+import os
 from typing import Any
 
 import pytest
+from web3.exceptions import TimeExhausted
 
 import ape
 from tests.web3cli.main import Web3CliTest
@@ -38,3 +40,128 @@ def test_tx_get_receipt(
     assert receipt.get("to") == bob.address
     assert type(receipt.get("gasUsed")) == int
     assert receipt.get("gasUsed") > 0
+
+
+@pytest.mark.local
+def test_tx_get_many(
+    app: Web3CliTest,
+    alice: ape.api.AccountAPI,
+    bob: ape.api.AccountAPI,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    hashes = [str(alice.transfer(bob, value).txn_hash) for value in [1, 2]]
+    unknown = "0x" + "ab" * 32
+    app.set_args(["tx", "get", hashes[0], unknown, hashes[1]]).run()
+    txs = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    # Printed in the same order as the hashes
+    assert [tx["hash"] for tx in txs] == [hashes[0], unknown, hashes[1]]
+    assert [txs[0]["value"], txs[2]["value"]] == [1, 2]
+    assert "error" in txs[1]
+
+
+@pytest.mark.local
+def test_tx_get_receipt_from_file(
+    app: Web3CliTest,
+    alice: ape.api.AccountAPI,
+    bob: ape.api.AccountAPI,
+    tmp_path: Any,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    hashes = [str(alice.transfer(bob, value).txn_hash) for value in [1, 2]]
+    path = os.path.join(tmp_path, "hashes.txt")
+    with open(path, "w") as f:
+        f.write("\n".join(hashes) + "\n")
+    app.set_args(["tx", "get-receipt", "--file", path]).run()
+    receipts = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted(r["transactionHash"] for r in receipts) == sorted(hashes)
+    assert all(r["confirmations"] >= 1 for r in receipts)
+    assert all(r["gasUsed"] > 0 for r in receipts)
+
+
+@pytest.mark.local
+def test_tx_get_receipt_single_hash_from_file(
+    app: Web3CliTest,
+    alice: ape.api.AccountAPI,
+    bob: ape.api.AccountAPI,
+    tmp_path: Any,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    # A single hash in a file is printed as a JSON line, too
+    hash = str(alice.transfer(bob, 10000).txn_hash)
+    path = os.path.join(tmp_path, "hashes.txt")
+    with open(path, "w") as f:
+        f.write(hash + "\n")
+    app.set_args(["tx", "get-receipt", "--file", path]).run()
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["transactionHash"] == hash
+
+
+@pytest.mark.local
+def test_tx_get_receipt_timeout(
+    app: Web3CliTest,
+    alice: ape.api.AccountAPI,
+    bob: ape.api.AccountAPI,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    hash = str(alice.transfer(bob, 10000).txn_hash)
+    unknown = "0x" + "ab" * 32
+    # Single hash: the error is raised
+    with pytest.raises(TimeExhausted):
+        app.set_args(["tx", "get-receipt", unknown, "--timeout", "0.5"]).run()
+    # Many hashes: the error is printed
+    app.set_args(["tx", "get-receipt", hash, unknown, "--timeout", "0.5"]).run()
+    records = {
+        r.get("transactionHash", r.get("hash")): r
+        for r in map(json.loads, capsys.readouterr().out.splitlines())
+    }
+    assert records[hash]["gasUsed"] > 0
+    assert "error" not in records[hash]
+    assert "not in the chain" in records[unknown]["error"]
+
+
+@pytest.mark.local
+def test_tx_get_receipt_no_wait(
+    app: Web3CliTest,
+    alice: ape.api.AccountAPI,
+    bob: ape.api.AccountAPI,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    hash = str(alice.transfer(bob, 10000).txn_hash)
+    unknown = "0x" + "ab" * 32
+    app.set_args(["tx", "get-receipt", hash, unknown, "--no-wait"]).run()
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert records[0]["transactionHash"] == hash
+    assert records[1]["hash"] == unknown
+    assert "error" in records[1]
+
+
+@pytest.mark.local
+def test_tx_watch(
+    app: Web3CliTest,
+    alice: ape.api.AccountAPI,
+    bob: ape.api.AccountAPI,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    sent_tx = alice.transfer(bob, 10000)
+    hash = str(sent_tx.txn_hash)
+    unknown = "0x" + "ab" * 32
+    app.set_args(["tx", "watch", hash, unknown, "-s", "alice", "--timeout", "10"]).run()
+    records = {
+        r["original"]: r for r in map(json.loads, capsys.readouterr().out.splitlines())
+    }
+    assert records[unknown]["status"] == "not_found"
+    assert records[hash]["status"] == "success"
+    assert records[hash]["hash"] == hash
+    assert records[hash]["nonce"] == sent_tx.transaction.nonce
+    assert records[hash]["bumps"] == 0
+    assert records[hash]["gas_used"] > 0
+
+
+@pytest.mark.local
+def test_tx_watch_without_pending_txs(
+    app: Web3CliTest, capsys: pytest.CaptureFixture[str]
+) -> None:
+    # Nothing to watch in the history of the signer
+    app.set_args(["tx", "watch", "-s", "alice"]).run()
+    assert capsys.readouterr().out == ""
@@ -14,6 +14,10 @@ CONFIG["web3cli"]["db_file"] = os.path.join(
     os.path.expanduser("~"), ".web3cli", "database", "web3cli_test.sqlite"
 )
 CONFIG["web3cli"]["populate_db"] = False
+# Local test chains are reset at each run, so their responses cannot be cached
+CONFIG["web3cli"]["rpc_cache"] = False
+CONFIG["web3cli"]["gas_cache"] = False
+CONFIG["web3cli"]["nonce_manager"] = False
 
 
 class Web3CliTest(TestApp, Web3Cli):
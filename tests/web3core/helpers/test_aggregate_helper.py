@@ -0,0 +1,88 @@
+import asyncio
+from typing import Any, Dict, List
+
+from eth_abi import encode
+
+from web3core.helpers.aggregate import WindowAggregator
+from web3core.helpers.events import LogDecoder
+from web3core.helpers.seed import seed_contract_types
+from web3core.seeds import contract_type_seeds
+
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+TOKEN = "0x1111111111111111111111111111111111111111"
+
+
+def transfer_log(value: int) -> Dict[str, Any]:
+    return {
+        "address": TOKEN,
+        "topics": [TRANSFER_TOPIC, "0x" + "00" * 32, "0x" + "00" * 32],
+        "data": "0x" + encode(["uint256"], [value]).hex(),
+    }
+
+
+def test_aggregate_logs(db: Any) -> None:
+    seed_contract_types([contract_type_seeds.erc20])
+    emitted: List[Dict[str, Any]] = []
+
+    async def emit(aggregates: Dict[str, Any]) -> None:
+        emitted.append(aggregates)
+
+    aggregator = WindowAggregator(
+        emit, window=10, sum_args=["value"], decoder=LogDecoder("eth")
+    )
+
+    async def main() -> None:
+        for value in [1, 2, 3]:
+            await aggregator.add(transfer_log(value), "logs", {"from": "0xA"})
+        await aggregator.add(transfer_log(4), "logs", {"from": "0xB"})
+        aggregator.timer.cancel()
+
+    asyncio.run(main())
+    aggregates = aggregator.get_aggregates()
+    assert aggregates["count"] == 4
+    assert aggregates["counts"] == {f"{TOKEN}:Transfer": 4}
+    assert aggregates["sums"] == {f"{TOKEN}:Transfer.value": 10}
+    assert aggregates["top_senders"][0] == {"address": "0xA", "count": 3}
+
+
+def test_sliding_window() -> None:
+    emitted: List[int] = []
+
+    async def emit(aggregates: Dict[str, Any]) -> None:
+        emitted.append(aggregates["count"])
+
+    aggregator = WindowAggregator(emit, window=0.2, slide=0.1)
+
+    async def main() -> None:
+        await aggregator.add("0x1", "newPendingTransactions", None)
+        await asyncio.sleep(0.15)
+        await aggregator.add("0x2", "newPendingTransactions", None)
+        await asyncio.sleep(0.2)
+        aggregator.timer.cancel()
+
+    asyncio.run(main())
+    # Each transaction is counted in two consecutive windows
+    assert emitted[:3] == [1, 2, 1]
+
+
+def test_emit_errors_do_not_stop_aggregation() -> None:
+    emitted: List[int] = []
+    errors: List[str] = []
+
+    async def emit(aggregates: Dict[str, Any]) -> None:
+        emitted.append(aggregates["count"])
+        if len(emitted) == 1:
+            raise OSError("Telegram is down")
+
+    aggregator = WindowAggregator(emit, window=0.05, logger=errors.append)
+
+    async def main() -> None:
+        await aggregator.add("0x1", "newPendingTransactions", None)
+        await asyncio.sleep(0.08)
+        await aggregator.add("0x2", "newPendingTransactions", None)
+        await asyncio.sleep(0.05)
+        aggregator.timer.cancel()
+
+    asyncio.run(main())
+    assert errors == ["Could not emit aggregates: Telegram is down"]
+    assert emitted == [1, 1]
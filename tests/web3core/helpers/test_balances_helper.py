@@ -0,0 +1,60 @@
+import io
+import time
+
+import pytest
+
+from web3core.helpers.balances import (
+    get_block_range,
+    iter_balances,
+    make_coin_balance_getter,
+    write_balances_csv,
+)
+
+ALICE = "0x0c2010dc4736bab060740D3968cf1dDF86196D81"
+BOB = "0xde0B295669a9FD93d5F28D9Ec85E40f4cb697BAe"
+
+
+def test_get_block_range() -> None:
+    assert get_block_range(10, 20, 5) == [10, 15, 20]
+    assert get_block_range(10, 21, 5) == [10, 15, 20, 21]
+    assert get_block_range(10, 10) == [10]
+    with pytest.raises(ValueError):
+        get_block_range(20, 10)
+    with pytest.raises(ValueError):
+        get_block_range(10, 20, 0)
+
+
+def test_iter_balances_is_ordered() -> None:
+    def get_balance(address: str, block: int) -> int:
+        # Make earlier requests slower, so that they complete out of order
+        time.sleep(0.01 * (3 - block))
+        return block * (1 if address == ALICE else 10)
+
+    balances = list(iter_balances(get_balance, [ALICE, BOB.lower()], [1, 2], 4))
+    assert balances == [(1, ALICE, 1), (1, BOB, 10), (2, ALICE, 2), (2, BOB, 20)]
+
+
+def test_coin_balance_getter_checksums_addresses() -> None:
+    class FakeEth:
+        def get_balance(self, address: str, block_identifier: int) -> int:
+            assert address == ALICE
+            return block_identifier
+
+    class FakeW3:
+        eth = FakeEth()
+
+    get_balance = make_coin_balance_getter(FakeW3())  # type: ignore
+    assert get_balance(ALICE.lower(), 5) == 5
+
+
+def test_write_balances_csv() -> None:
+    file = io.StringIO()
+    n_rows = write_balances_csv(
+        file, iter([(1, ALICE, 10**18), (2, ALICE, 2 * 10**18)]), lambda b: b // 10**18
+    )
+    assert n_rows == 2
+    assert file.getvalue().splitlines() == [
+        "block,address,balance",
+        f"1,{ALICE},1",
+        f"2,{ALICE},2",
+    ]
@@ -0,0 +1,186 @@
+import csv
+import os
+from typing import Any, Dict, List
+
+import pytest
+from web3.exceptions import TransactionNotFound
+
+from web3core.helpers.batch import (
+    SignedBatchTx,
+    broadcast_batch,
+    get_next_signed_nonce,
+    make_signed_tx_record,
+    read_batch_csv,
+    read_signed_txs,
+    summarize_batch,
+    track_receipts,
+    wait_for_block,
+    write_batch_results_csv,
+    write_signed_txs,
+)
+from web3core.helpers.nonce import NonceManager
+
+
+class FakeEth:
+    block_number = 10
+
+    def __init__(self, receipts: Dict[str, Any]) -> None:
+        self.receipts = receipts
+
+    def get_transaction_receipt(self, hash: str) -> Any:
+        if hash not in self.receipts:
+            raise TransactionNotFound(f"Tx {hash} not mined")
+        return self.receipts[hash]
+
+
+class FakeW3:
+    def __init__(self, receipts: Dict[str, Any] = {}) -> None:
+        self.eth = FakeEth(receipts)
+
+
+def make_txs(count: int) -> List[SignedBatchTx]:
+    return [
+        {
+            "row": {"to": f"bob{i}", "amount": "1", "ticker": "eth", "unit": ""},
+            "params": {},
+            "nonce": i,
+            "hash": f"0x{i:02x}",  # type: ignore
+            "raw": f"0xraw{i}",  # type: ignore
+            "status": "signed",
+            "gas_used": None,
+            "error": None,
+        }
+        for i in range(count)
+    ]
+
+
+def test_read_batch_csv(tmp_path: Any) -> None:
+    path = os.path.join(tmp_path, "payouts.csv")
+    with open(path, "w") as file:
+        file.write("to,amount,ticker\nbob, 1.5 ,eth\n\ncharlie,10,usdc\n")
+    rows = read_batch_csv(path)
+    assert rows == [
+        {"to": "bob", "amount": "1.5", "ticker": "eth", "unit": ""},
+        {"to": "charlie", "amount": "10", "ticker": "usdc", "unit": ""},
+    ]
+
+
+def test_read_batch_csv_missing_columns(tmp_path: Any) -> None:
+    path = os.path.join(tmp_path, "payouts.csv")
+    with open(path, "w") as file:
+        file.write("to,amount\nbob,1\n")
+    with pytest.raises(ValueError, match="ticker"):
+        read_batch_csv(path)
+
+
+def test_broadcast_batch() -> None:
+    sent: List[str] = []
+
+    def send(raw: str) -> None:
+        sent.append(raw)
+        if raw == "0xraw1":
+            raise ValueError("already known")
+        if raw == "0xraw2":
+            raise ValueError("insufficient funds for gas")
+
+    txs = list(
+        broadcast_batch(FakeW3(), make_txs(3)[::-1], concurrency=1, retries=0, send=send)  # type: ignore
+    )
+    # Sent in nonce order
+    assert sent == ["0xraw0", "0xraw1", "0xraw2"]
+    assert [tx["status"] for tx in txs] == ["sent", "sent", "failed"]
+    assert "insufficient funds" in txs[2]["error"]
+
+
+def test_track_receipts() -> None:
+    w3 = FakeW3(
+        {
+            "0x00": {"status": 1, "gasUsed": 21000, "blockNumber": 10},
+            "0x01": {"status": 0, "gasUsed": 30000, "blockNumber": 9},
+        }
+    )
+    txs = list(track_receipts(w3, make_txs(3), timeout=0, poll_interval=0.01))  # type: ignore
+    assert [tx["status"] for tx in txs] == ["success", "reverted", "timeout"]
+    assert [tx["gas_used"] for tx in txs] == [21000, 30000, None]
+    assert summarize_batch(txs) == {"success": 1, "reverted": 1, "timeout": 1}
+
+
+def test_write_batch_results_csv(tmp_path: Any) -> None:
+    path = os.path.join(tmp_path, "payouts.results.csv")
+    txs = make_txs(2)
+    txs[0] |= {"status": "success", "gas_used": 21000}
+    write_batch_results_csv(path, txs)
+    with open(path) as file:
+        rows = list(csv.DictReader(file))
+    assert len(rows) == 2
+    assert rows[0]["hash"] == "0x00"
+    assert rows[0]["status"] == "success"
+    assert rows[0]["gas_used"] == "21000"
+    assert rows[1]["nonce"] == "1"
+
+
+def test_signed_txs_file(tmp_path: Any) -> None:
+    path = os.path.join(tmp_path, "signed.jsonl")
+    params = {
+        "chainId": 1,
+        "from": "0x0c2010dc4736bab060740D3968cf1dDF86196D81",
+        "to": "0x1111111111111111111111111111111111111111",
+        "nonce": 7,
+        "gas": 21000,
+        "maxFeePerGas": 3 * 10**9,
+        "maxPriorityFeePerGas": 10**9,
+    }
+    record = make_signed_tx_record(params, b"\x02\xf8", b"\xab" * 32, "transfer")  # type: ignore
+    assert record["raw"] == "0x02f8"
+    assert record["gas_price"] is None
+    # Records are appended
+    write_signed_txs(path, [record])
+    write_signed_txs(path, [record | {"nonce": 8}])  # type: ignore
+    records = read_signed_txs(path)
+    assert [r["nonce"] for r in records] == [7, 8]
+    assert records[0]["hash"] == "0x" + "ab" * 32
+    assert records[0]["status"] == "signed"
+    # Signed transactions can be broadcast
+    sent: List[str] = []
+    txs = list(broadcast_batch(FakeW3(), records[::-1], send=sent.append))  # type: ignore
+    assert sent == ["0x02f8", "0x02f8"]
+    assert [tx["status"] for tx in txs] == ["sent", "sent"]
+
+
+def test_wait_for_block() -> None:
+    class Eth:
+        head = 10
+
+        @property
+        def block_number(self) -> int:
+            self.head += 1
+            return self.head
+
+    w3 = FakeW3()
+    w3.eth = Eth()  # type: ignore
+    assert wait_for_block(w3, 14, poll_interval=0) == 14  # type: ignore
+
+
+def test_signing_twice_to_a_file_uses_distinct_nonces(tmp_path: Any) -> None:
+    path = os.path.join(tmp_path, "signed.jsonl")
+    sender = "0x0c2010dc4736bab060740D3968cf1dDF86196D81"
+    w3 = FakeW3()
+    w3.eth.get_transaction_count = lambda address, block: 7  # type: ignore
+    # Signed txs are not sent, so the pending nonce does not move, and
+    # the state of the nonce manager goes stale
+    manager = NonceManager(w3, "eth", sender, str(tmp_path), stale_after=0)  # type: ignore
+    assert get_next_signed_nonce(path, 1, sender) is None
+    signed: List[int] = []
+    for _ in range(2):
+        nonces = manager.reserve_many(3, get_next_signed_nonce(path, 1, sender))
+        params = {"chainId": 1, "from": sender, "to": sender, "gas": 21000}
+        write_signed_txs(
+            path,
+            [make_signed_tx_record(params | {"nonce": n}, b"\x02", b"\x01", None) for n in nonces],  # type: ignore
+        )
+        signed += nonces
+    assert signed == [7, 8, 9, 10, 11, 12]
+    # Nonces of other senders and chains do not count
+    assert get_next_signed_nonce(path, 1, sender.lower()) == 13
+    assert get_next_signed_nonce(path, 56, sender) is None
+    assert get_next_signed_nonce(path, 1, "0x" + "11" * 20) is None
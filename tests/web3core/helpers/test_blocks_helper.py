@@ -0,0 +1,49 @@
+from typing import Any, Dict, List, Union
+
+import pytest
+
+from web3core.helpers.blocks import find_block_at
+from web3core.helpers.misc import to_timestamp
+
+
+class FakeEth:
+    """Chain with irregular block times: 2 seconds for the first
+    half of the blocks, 12 seconds for the second half"""
+
+    def __init__(self, n_blocks: int) -> None:
+        self.block_number = n_blocks - 1
+        self.calls: List[Any] = []
+
+    def get_block(self, identifier: Union[str, int]) -> Dict[str, int]:
+        self.calls.append(identifier)
+        n = self.block_number if identifier == "latest" else int(identifier)
+        half = (self.block_number + 1) // 2
+        timestamp = 1000 + 2 * min(n, half) + 12 * max(n - half, 0)
+        return {"number": n, "timestamp": timestamp}
+
+
+class FakeWeb3:
+    def __init__(self, n_blocks: int) -> None:
+        self.eth = FakeEth(n_blocks)
+
+
+def test_find_block_at(db: Any) -> None:
+    w3 = FakeWeb3(100_000)
+    half_ts = 1000 + 2 * 50_000
+    # Exact match, and between two blocks
+    assert find_block_at(w3, "eth", 1000 + 2 * 1234) == 1234  # type: ignore
+    assert find_block_at(w3, "eth", half_ts + 12 * 100 - 5) == 50_100  # type: ignore
+    assert find_block_at(w3, "eth", 0) == 0  # type: ignore
+    with pytest.raises(ValueError):
+        find_block_at(w3, "eth", 10**12)  # type: ignore
+    # Nearby searches benefit from the cache
+    w3.eth.calls = []
+    assert find_block_at(w3, "eth", half_ts + 12 * 101) == 50_101  # type: ignore
+    assert len(w3.eth.calls) <= 3
+
+
+def test_to_timestamp() -> None:
+    assert to_timestamp("1700000000") == 1700000000
+    assert to_timestamp("2026-01-01") == 1767225600
+    assert to_timestamp("2026-01-01T02:00:00+02:00") == 1767225600
+    assert to_timestamp("2026-01-01T00:00:00Z") == 1767225600
@@ -0,0 +1,78 @@
+import time
+from typing import Any, Iterator
+
+import pytest
+from web3 import Web3
+
+from web3core.exceptions import Web3CoreError
+from web3core.helpers.broadcast import (
+    BROADCAST_W3S,
+    broadcast_raw_tx,
+    raise_if_not_accepted,
+    rank_rpcs,
+)
+
+RAW_TX = "0x02f86b"
+
+
+class FakeEth:
+    def __init__(self, error: str = None, latency: float = 0) -> None:
+        self.error = error
+        self.latency = latency
+        self.received: list = []
+
+    @property
+    def block_number(self) -> int:
+        time.sleep(self.latency)
+        if self.error:
+            raise ConnectionError(self.error)
+        return 100
+
+    def send_raw_transaction(self, raw: bytes) -> bytes:
+        self.received.append(raw)
+        if self.error:
+            raise ValueError({"code": -32000, "message": self.error})
+        return Web3.keccak(raw)
+
+
+class FakeW3:
+    def __init__(self, **kwargs: Any) -> None:
+        self.eth = FakeEth(**kwargs)
+
+
+@pytest.fixture
+def rpcs() -> Iterator[None]:
+    BROADCAST_W3S.update(
+        {
+            "https://ok": FakeW3(latency=0.05),  # type: ignore
+            "https://known": FakeW3(error="already known"),  # type: ignore
+            "https://low": FakeW3(error="nonce too low"),  # type: ignore
+            "https://fast": FakeW3(),  # type: ignore
+        }
+    )
+    yield
+    BROADCAST_W3S.clear()
+
+
+def test_broadcast_raw_tx(rpcs: None) -> None:
+    results = broadcast_raw_tx(RAW_TX, ["https://ok", "https://known", "https://low"])
+    assert [r["url"] for r in results] == ["https://ok", "https://known", "https://low"]
+    assert [r["accepted"] for r in results] == [True, True, False]
+    assert "nonce too low" in results[2]["error"]
+    assert all(r["hash"] == Web3.to_hex(Web3.keccak(hexstr=RAW_TX)) for r in results)
+    assert BROADCAST_W3S["https://ok"].eth.received == [bytes.fromhex(RAW_TX[2:])]
+    raise_if_not_accepted(results)
+
+
+def test_raise_if_not_accepted(rpcs: None) -> None:
+    results = broadcast_raw_tx(RAW_TX, ["https://low"])
+    with pytest.raises(Web3CoreError, match="nonce too low"):
+        raise_if_not_accepted(results)
+
+
+def test_rank_rpcs(rpcs: None) -> None:
+    # RPCs that do not respond are left out
+    assert rank_rpcs(["https://ok", "https://low", "https://fast"]) == [
+        "https://fast",
+        "https://ok",
+    ]
@@ -0,0 +1,62 @@
+from typing import Any
+
+from eth_abi import encode
+
+from web3core.helpers.events import LogDecoder
+from web3core.helpers.seed import seed_contract_types
+from web3core.seeds import contract_type_seeds
+
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+ALICE = "0x0c2010dc4736bab060740D3968cf1dDF86196D81"
+BOB = "0xde0B295669a9FD93d5F28D9Ec85E40f4cb697BAe"
+
+
+def address_topic(address: str) -> str:
+    return "0x" + "0" * 24 + address[2:].lower()
+
+
+def test_decode_erc20_transfer(db: Any) -> None:
+    seed_contract_types([contract_type_seeds.erc20])
+    log = {
+        "address": "0x1111111111111111111111111111111111111111",
+        "topics": [TRANSFER_TOPIC, address_topic(ALICE), address_topic(BOB)],
+        "data": "0x" + encode(["uint256"], [10**18]).hex(),
+    }
+    decoded = LogDecoder("eth").decode(log)
+    assert decoded["event"] == "Transfer"
+    assert decoded["signature"] == "Transfer(address,address,uint256)"
+    assert list(decoded["args"].values()) == [ALICE, BOB, 10**18]
+
+
+def test_decode_erc721_transfer(db: Any) -> None:
+    """ERC721 Transfer has the same topic0 as ERC20 Transfer, but
+    the token ID is indexed"""
+    seed_contract_types(
+        [
+            contract_type_seeds.erc20,
+            contract_type_seeds.uniswap_v3_nonfungible_position_manager,
+        ]
+    )
+    log = {
+        "address": "0x1111111111111111111111111111111111111111",
+        "topics": [
+            TRANSFER_TOPIC,
+            address_topic(ALICE),
+            address_topic(BOB),
+            "0x" + encode(["uint256"], [42]).hex(),
+        ],
+        "data": "0x",
+    }
+    decoded = LogDecoder("eth").decode(log)
+    assert decoded["event"] == "Transfer"
+    assert list(decoded["args"].values()) == [ALICE, BOB, 42]
+
+
+def test_decode_unknown_event(db: Any) -> None:
+    seed_contract_types([contract_type_seeds.erc20])
+    log = {
+        "address": "0x1111111111111111111111111111111111111111",
+        "topics": ["0x" + "ab" * 32],
+        "data": "0x",
+    }
+    assert LogDecoder("eth").decode(log) is None
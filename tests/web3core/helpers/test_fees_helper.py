@@ -0,0 +1,77 @@
+from typing import Any, List
+
+import pytest
+
+from web3core.helpers.fees import (
+    FEE_HISTORY_CACHE,
+    get_fee_stats,
+    get_priority_fee,
+    parse_percentile,
+)
+
+GWEI = 10**9
+
+
+class FakeEth:
+    """Return a fixed fee history, counting calls"""
+
+    def __init__(self) -> None:
+        self.calls: List[Any] = []
+
+    def fee_history(self, blocks: int, newest: str, percentiles: List[int]) -> Any:
+        self.calls.append((blocks, newest, percentiles))
+        return {
+            "oldestBlock": 100,
+            "baseFeePerGas": [10 * GWEI, 11 * GWEI, 12 * GWEI, 15 * GWEI],
+            "gasUsedRatio": [0.9, 0.0, 0.6],
+            "reward": [
+                [i * GWEI for i in range(1, len(percentiles) + 1)],
+                [0] * len(percentiles),  # empty block
+                [3 * i * GWEI for i in range(1, len(percentiles) + 1)],
+            ],
+        }
+
+
+class FakeW3:
+    def __init__(self) -> None:
+        self.eth = FakeEth()
+
+
+def test_get_fee_stats() -> None:
+    FEE_HISTORY_CACHE.clear()
+    stats = get_fee_stats(FakeW3(), "eth", 3, [50, 10])  # type: ignore
+    assert stats["oldest_block"] == 100
+    assert stats["newest_block"] == 102
+    assert stats["base_fees"] == [10, 11, 12]
+    assert stats["next_base_fee"] == 15
+    assert stats["base_fee_trend"] == 50
+    assert stats["gas_used_ratio"] == 0.5
+    # Empty blocks are ignored
+    assert stats["priority_fees"] == {"p10": 2, "p50": 4}
+
+
+def test_get_fee_stats_is_cached() -> None:
+    FEE_HISTORY_CACHE.clear()
+    w3 = FakeW3()
+    get_fee_stats(w3, "eth", 3)  # type: ignore
+    get_fee_stats(w3, "eth", 3)  # type: ignore
+    assert len(w3.eth.calls) == 1
+    get_fee_stats(w3, "eth", 3, ttl=0)  # type: ignore
+    assert len(w3.eth.calls) == 2
+
+
+def test_get_priority_fee() -> None:
+    FEE_HISTORY_CACHE.clear()
+    w3 = FakeW3()
+    # Percentiles: 10, 25, 33, 50, 75, 90
+    assert get_priority_fee(w3, "eth", 33, 3) == 6  # type: ignore
+    assert w3.eth.calls[0][2] == [10, 25, 33, 50, 75, 90]
+
+
+def test_parse_percentile() -> None:
+    assert parse_percentile("p50") == 50
+    assert parse_percentile("P0") == 0
+    assert parse_percentile("0.1") is None
+    assert parse_percentile(1.5) is None
+    with pytest.raises(ValueError):
+        parse_percentile("p101")
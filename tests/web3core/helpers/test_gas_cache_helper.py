@@ -0,0 +1,85 @@
+import os
+from typing import Any
+
+from eth_abi import encode
+
+from web3core.helpers.gas_cache import (
+    NEW_SLOT_GAS,
+    GasCache,
+    get_gas_key,
+    get_percentile,
+    get_selector,
+    open_gas_cache,
+)
+
+TOKEN = "0x1111111111111111111111111111111111111111"
+TRANSFER = "0xa9059cbb"
+UNKNOWN = "0x12345678"
+
+
+def test_get_selector() -> None:
+    assert get_selector("0xA9059CBB" + "00" * 64) == TRANSFER
+    assert get_selector(bytes.fromhex("a9059cbb")) == TRANSFER
+    assert get_selector("0x") is None
+    assert get_selector(None) is None
+
+
+def test_get_percentile() -> None:
+    values = list(range(1, 101))
+    assert get_percentile(values, 95) == 95
+    assert get_percentile(values, 100) == 100
+    assert get_percentile(values, 0) == 1
+    assert get_percentile([3, 1, 2], 50) == 2
+
+
+def test_get_gas_key() -> None:
+    assert get_gas_key(TRANSFER + "00" * 64) == TRANSFER
+    # Swaps are keyed by path length
+    args = encode(
+        ["uint256", "uint256", "address[]", "address", "uint256"],
+        [1, 2, [TOKEN] * 3, TOKEN, 5],
+    )
+    assert get_gas_key("0x38ed1739" + args.hex()) == "0x38ed1739:3"
+    assert get_gas_key("0x38ed1739") is None
+
+
+def test_gas_limit(tmp_path: Any) -> None:
+    cache = GasCache(os.path.join(tmp_path, "gas.sqlite"))
+    # No history
+    assert cache.get_gas_limit(1, TOKEN, UNKNOWN) is None
+    for gas in [100000, 120000]:
+        cache.add(1, TOKEN.upper(), UNKNOWN, gas)
+    assert cache.get_gas_limit(1, TOKEN, UNKNOWN, min_samples=3) is None
+    cache.add(1, TOKEN, UNKNOWN, 110000)
+    assert cache.get_gas_limit(1, TOKEN, UNKNOWN, min_samples=3, margin=1) == 120000
+    # History is per chain
+    assert cache.get_gas_limit(56, TOKEN, UNKNOWN, min_samples=3) is None
+
+
+def test_gas_limit_of_transfers(tmp_path: Any) -> None:
+    cache = GasCache(os.path.join(tmp_path, "gas.sqlite"))
+    # A single transfer is not enough
+    cache.add(1, TOKEN, TRANSFER, 51000)
+    assert cache.get_gas_limit(1, TOKEN, TRANSFER, min_samples=3) is None
+    # Transfers to existing holders are cheap, but the next one may go
+    # to a new holder
+    for gas in [35000] * 10:
+        cache.add(1, TOKEN, TRANSFER, gas)
+    limit = cache.get_gas_limit(1, TOKEN, TRANSFER, min_samples=3, margin=1.25)
+    assert limit == int((51000 + NEW_SLOT_GAS) * 1.25)
+    assert limit > 51000 * 1.25
+
+
+def test_max_samples(tmp_path: Any) -> None:
+    cache = GasCache(os.path.join(tmp_path, "gas.sqlite"), max_samples=3)
+    for gas in [90000, 10, 20, 30]:
+        cache.add(1, TOKEN, UNKNOWN, gas)
+    assert sorted(cache.get_samples(1, TOKEN, UNKNOWN)) == [10, 20, 30]
+
+
+def test_add_tx(tmp_path: Any) -> None:
+    cache = open_gas_cache(os.path.join(tmp_path, "gas.sqlite"))
+    assert cache is open_gas_cache(os.path.join(tmp_path, "gas.sqlite"))
+    assert cache.add_tx(1, {"to": TOKEN, "data": TRANSFER + "00" * 64}, 51000)
+    assert not cache.add_tx(1, {"to": TOKEN, "value": 1}, 21000)
+    assert cache.get_samples(1, TOKEN, TRANSFER) == [51000]
@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import sqlite3
+import time
+from typing import Any, List
+
+from web3core.helpers.head_cache import (
+    HeadCache,
+    construct_head_cache_middleware,
+    is_head_request,
+)
+
+
+class FakeNode:
+    """Answer requests with an increasing block number, logging them"""
+
+    def __init__(self) -> None:
+        self.requests: List[str] = []
+
+    def __call__(self, method: str, params: Any) -> Any:
+        self.requests.append(method)
+        return {"jsonrpc": "2.0", "id": 1, "result": hex(len(self.requests))}
+
+
+def test_is_head_request() -> None:
+    assert is_head_request("eth_blockNumber", [])
+    assert is_head_request("eth_getBlockByNumber", ["latest", False])
+    assert is_head_request("eth_getTransactionCount", ["0x1", "pending"])
+    assert not is_head_request("eth_getTransactionCount", ["0x1", "0x10"])
+    assert not is_head_request("eth_sendRawTransaction", ["0x1"])
+
+
+def test_responses_expire(tmp_path: Any) -> None:
+    path = os.path.join(tmp_path, "head.sqlite")
+    node = FakeNode()
+    request = construct_head_cache_middleware(HeadCache(path), 1, ttl=0.2)(node, None)  # type: ignore
+    assert request("eth_blockNumber", [])["result"] == "0x1"
+    # Another process reads the same response
+    other = construct_head_cache_middleware(HeadCache(path), 1, ttl=0.2)(node, None)  # type: ignore
+    assert other("eth_blockNumber", [])["result"] == "0x1"
+    assert request("eth_getBalance", ["0x1", "latest"])["result"] == "0x2"
+    time.sleep(0.3)
+    assert request("eth_blockNumber", [])["result"] == "0x3"
+
+
+def fetch_in_process(path: str, log: str) -> None:
+    def request() -> Any:
+        with open(log, "a") as file:
+            file.write("request\n")
+        time.sleep(0.2)
+        return "0x1"
+
+    assert HeadCache(path).fetch("key", 10, request) == "0x1"
+
+
+def test_concurrent_processes_share_one_request(tmp_path: Any) -> None:
+    path = os.path.join(tmp_path, "head.sqlite")
+    log = os.path.join(tmp_path, "requests.log")
+    HeadCache(path)  # create the table
+    processes = [
+        multiprocessing.Process(target=fetch_in_process, args=(path, log))
+        for _ in range(4)
+    ]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    assert all(p.exitcode == 0 for p in processes)
+    with open(log) as file:
+        assert file.read().splitlines() == ["request"]
+
+
+def test_database_is_not_locked_during_requests(tmp_path: Any) -> None:
+    path = os.path.join(tmp_path, "head.sqlite")
+    other = HeadCache(path, timeout=0)
+
+    def request() -> Any:
+        # Another process can take a lease on another key meanwhile
+        assert other.acquire_lease("other", "owner") == (None, True)
+        # ...but not on the key being fetched
+        assert other.acquire_lease("key", "owner") == (None, False)
+        return "0x1"
+
+    assert HeadCache(path).fetch("key", 10, request) == "0x1"
+    assert other.acquire_lease("key", "owner") == ("0x1", False)
+
+
+def test_expired_leases_are_taken_over(tmp_path: Any) -> None:
+    path = os.path.join(tmp_path, "head.sqlite")
+    # A process took the lease, then died
+    assert HeadCache(path, lease=0.1).acquire_lease("key", "dead") == (None, True)
+    assert HeadCache(path).fetch("key", 10, lambda: "0x1") == "0x1"
+
+
+def test_requests_are_not_repeated_on_errors(tmp_path: Any) -> None:
+    cache = HeadCache(os.path.join(tmp_path, "head.sqlite"))
+    node = FakeNode()
+    request = construct_head_cache_middleware(cache, 1)(node, None)  # type: ignore
+
+    def store(*args: Any) -> None:
+        raise sqlite3.OperationalError("database is locked")
+
+    cache.store = store  # type: ignore
+    assert request("eth_blockNumber", [])["result"] == "0x1"
+    assert node.requests == ["eth_blockNumber"]
+    # The lease was released
+    assert cache.acquire_lease(cache.get_key(1, "eth_blockNumber", []), "owner")[1]
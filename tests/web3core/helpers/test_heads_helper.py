@@ -0,0 +1,62 @@
+from typing import Any, Dict
+
+from web3core.helpers.heads import HeadTracker
+
+
+def header(number: int, fork: str = "a", parent_fork: str = None) -> Dict[str, Any]:
+    return {
+        "number": hex(number),
+        "hash": f"0x{fork}{number}",
+        "parentHash": f"0x{parent_fork or fork}{number - 1}",
+    }
+
+
+def test_blocks_are_released_immediately() -> None:
+    tracker = HeadTracker()
+    assert tracker.add(header(1)) == [("newHeads", header(1))]
+    assert tracker.add(header(2)) == [("newHeads", header(2))]
+    assert tracker.add(header(2)) == []  # duplicate
+
+
+def test_reorg_is_detected() -> None:
+    tracker = HeadTracker()
+    for n in range(1, 4):
+        tracker.add(header(n))
+    # Block 3 is replaced by a sibling
+    events = tracker.add(header(3, "b", parent_fork="a"))
+    assert [e[0] for e in events] == ["reorg", "newHeads"]
+    reorg = events[0][1]
+    assert reorg["depth"] == 1
+    assert reorg["orphaned"] == [{"number": "0x3", "hash": "0xa3"}]
+    assert reorg["newHead"] == {"number": "0x3", "hash": "0xb3"}
+    # Block 4 on the new fork, with parent not matching the buffer
+    events = tracker.add(header(4, "c", parent_fork="c"))
+    assert events[0][0] == "reorg"
+    assert [o["hash"] for o in events[0][1]["orphaned"]] == ["0xb3"]
+
+
+def test_blocks_wait_for_confirmations() -> None:
+    tracker = HeadTracker(confirmations=2)
+    assert tracker.add(header(1)) == []
+    assert tracker.add(header(2)) == []
+    assert tracker.add(header(3)) == [("newHeads", header(1))]
+    # Block 3 is orphaned before being confirmed, block 2 stays
+    events = tracker.add(header(3, "b", parent_fork="a"))
+    assert [e[0] for e in events] == ["reorg"]
+    events = tracker.add(header(4, "b"))
+    assert events == [("newHeads", header(2))]
+    events = tracker.add(header(5, "b"))
+    assert events == [("newHeads", header(3, "b", parent_fork="a"))]
+
+
+def test_reorg_depth_is_proven_from_the_buffer() -> None:
+    tracker = HeadTracker()
+    for n in range(1, 6):
+        tracker.add(header(n))
+    # Fork b replaced blocks 3 to 5, but only its block 5 is received
+    events = tracker.add(header(5, "b"))
+    assert [e[0] for e in events] == ["reorg", "newHeads"]
+    reorg = events[0][1]
+    assert reorg["depth"] == 2
+    assert [o["hash"] for o in reorg["orphaned"]] == ["0xa4", "0xa5"]
+    assert tracker.add(header(6, "b")) == [("newHeads", header(6, "b"))]
@@ -0,0 +1,64 @@
+from typing import Any, Dict, List
+
+from eth_abi import encode
+from hexbytes import HexBytes
+
+from web3core.helpers.events import LogDecoder
+from web3core.helpers.index import add_contracts, query_index, sync_index
+from web3core.helpers.seed import seed_contract_types
+from web3core.models.log import IndexedContract
+from web3core.seeds import contract_type_seeds
+
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+TOKEN = "0x1111111111111111111111111111111111111111"
+
+
+class FakeEth:
+    """Node with a Transfer log in every block; the fork letter
+    goes in the block hash"""
+
+    def __init__(self, block_number: int) -> None:
+        self.block_number = block_number
+        self.fork = "a"
+
+    def get_logs(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "address": TOKEN,
+                "blockNumber": b,
+                "blockHash": HexBytes(f"0x{self.fork}{b:063x}"),
+                "transactionHash": HexBytes(f"0x{b:064x}"),
+                "logIndex": 0,
+                "topics": [
+                    HexBytes(TRANSFER_TOPIC),
+                    HexBytes(b"\0" * 32),
+                    HexBytes(b"\0" * 32),
+                ],
+                "data": HexBytes(encode(["uint256"], [b])),
+            }
+            for b in range(params["fromBlock"], params["toBlock"] + 1)
+        ]
+
+
+class FakeWeb3:
+    def __init__(self, block_number: int) -> None:
+        self.eth = FakeEth(block_number)
+
+
+def test_sync_and_query(db: Any) -> None:
+    seed_contract_types([contract_type_seeds.erc20])
+    w3 = FakeWeb3(block_number=100)
+    assert add_contracts("eth", [TOKEN], from_block=51) == 1
+    n = sync_index(w3, "eth", reorg_depth=5, chunk_size=10, decoder=LogDecoder("eth"))  # type: ignore
+    assert n == 50
+    assert IndexedContract.get_by_chain("eth")[0].last_block == 100
+    logs = query_index("eth", addresses=[TOKEN], event="Transfer", from_block=91)
+    assert [log.block for log in logs] == list(range(91, 101))
+    assert logs[0].decoded["args"]["value"] == 91
+    # The last blocks are replaced on the next sync
+    w3.eth.fork = "b"
+    w3.eth.block_number = 102
+    assert sync_index(w3, "eth", reorg_depth=5) == 7  # type: ignore
+    logs = query_index("eth", from_block=96)
+    assert [log.block_hash[2] for log in logs] == ["b"] * 7
+    assert len(query_index("eth")) == 52
@@ -0,0 +1,47 @@
+import asyncio
+import gzip
+import json
+import os
+from typing import Any
+
+from hexbytes import HexBytes
+
+from web3core.helpers.jsonl import JsonlWriter
+
+
+def test_write_and_rotate(tmp_path: Any) -> None:
+    path = os.path.join(tmp_path, "notifications.jsonl")
+    writer = JsonlWriter(path, max_bytes=30, compress=True)
+    writer.write({"hash": HexBytes("0x01")})
+    assert len(os.listdir(tmp_path)) == 1
+    writer.write({"hash": HexBytes("0x02")})  # exceeds the size
+    writer.write({"hash": HexBytes("0x03")})
+    writer.close()
+    rotated = [f for f in os.listdir(tmp_path) if f.endswith(".jsonl.gz")]
+    assert len(rotated) == 1
+    with gzip.open(os.path.join(tmp_path, rotated[0]), "rt") as f:
+        assert [json.loads(line)["hash"] for line in f] == ["0x01", "0x02"]
+    with open(path) as f:
+        assert [json.loads(line)["hash"] for line in f] == ["0x03"]
+
+
+def test_write_async(tmp_path: Any) -> None:
+    path = os.path.join(tmp_path, "notifications.jsonl")
+    writer = JsonlWriter(path, fsync_interval=0, max_bytes=30)
+
+    async def main() -> None:
+        await asyncio.gather(
+            *[writer.write_async({"n": n, "text": "ünicode"}) for n in range(3)]
+        )
+
+    asyncio.run(main())
+    writer.close()
+    # Each line is longer than max_bytes, so each ends in its own file
+    rotated = sorted(f for f in os.listdir(tmp_path) if f != "notifications.jsonl")
+    assert len(rotated) == 3
+    records = []
+    for name in rotated:
+        with open(os.path.join(tmp_path, name), encoding="utf-8") as f:
+            records += [json.loads(line) for line in f]
+    assert sorted(r["n"] for r in records) == [0, 1, 2]
+    assert os.path.getsize(path) == 0
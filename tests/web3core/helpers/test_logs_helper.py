@@ -0,0 +1,63 @@
+import os
+from typing import Any, Dict, List
+
+import pytest
+
+from web3core.exceptions import Web3CoreError
+from web3core.helpers.logs import LogFetcher, read_checkpoint, write_checkpoint
+
+
+class FakeEth:
+    """Return one log per block, and refuse ranges with more than
+    max_results logs, like many RPCs do"""
+
+    def __init__(self, max_results: int, error: Exception = None) -> None:
+        self.max_results = max_results
+        self.error = error
+        self.requests: List[Any] = []
+
+    def get_logs(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        self.requests.append((params["fromBlock"], params["toBlock"]))
+        if self.error:
+            raise self.error
+        n_blocks = params["toBlock"] - params["fromBlock"] + 1
+        if n_blocks > self.max_results:
+            raise ValueError("query returned more than 10000 results")
+        return [
+            {"blockNumber": b, "logIndex": 0}
+            for b in range(params["fromBlock"], params["toBlock"] + 1)
+        ]
+
+
+class FakeWeb3:
+    def __init__(self, max_results: int, error: Exception = None) -> None:
+        self.eth = FakeEth(max_results, error)
+
+
+def test_fetch_logs_in_order_halving_chunks() -> None:
+    w3 = FakeWeb3(max_results=25)
+    fetcher = LogFetcher(w3, chunk_size=100, concurrency=3)  # type: ignore
+    chunks = list(fetcher.iter_chunks(1, 250))
+    blocks = [log["blockNumber"] for _, _, logs in chunks for log in logs]
+    assert blocks == list(range(1, 251))
+    assert fetcher.chunk_size <= 25
+
+
+def test_other_errors_are_raised() -> None:
+    error = ValueError({"code": -32000, "message": "header not found"})
+    w3 = FakeWeb3(max_results=25, error=error)
+    with pytest.raises(ValueError) as e:
+        list(LogFetcher(w3, chunk_size=100).iter_chunks(1, 10))  # type: ignore
+    assert e.value is error
+    # The range was not halved
+    assert w3.eth.requests == [(1, 10)]
+
+
+def test_checkpoint(tmp_path: Any) -> None:
+    path = os.path.join(tmp_path, "checkpoint.json")
+    query = {"chain": "eth", "from_block": 1}
+    assert read_checkpoint(path, query) is None
+    write_checkpoint(path, query, 100)
+    assert read_checkpoint(path, query) == 100
+    with pytest.raises(Web3CoreError):
+        read_checkpoint(path, {"chain": "bnb", "from_block": 1})
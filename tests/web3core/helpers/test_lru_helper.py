@@ -0,0 +1,20 @@
+from web3core.helpers.lru import LruDict, LruSet
+
+
+def test_lru_dict_evicts_least_recently_used() -> None:
+    d = LruDict(2)
+    d["a"] = 1
+    d["b"] = 2
+    assert d.get("a") == 1  # now 'b' is the least recently used
+    d["c"] = 3
+    assert list(d.keys()) == ["a", "c"]
+
+
+def test_lru_set() -> None:
+    s = LruSet(2)
+    assert s.add("a") is True
+    assert s.add("a") is False
+    s.add("b")
+    s.add("c")
+    assert "a" not in s
+    assert len(s) == 2
@@ -0,0 +1,25 @@
+from web3core.helpers.metrics import Metrics, summarize
+
+
+def test_render_prometheus_text() -> None:
+    metrics = Metrics()
+    metrics.inc("w3_notifications_total", subscription="blocks")
+    metrics.inc("w3_notifications_total", subscription="blocks")
+    metrics.set("w3_queue_depth", 3, connection="wss://node")
+    metrics.observe("w3_callback_duration_seconds", 0.02, action="print")
+    text = metrics.render()
+    assert "# TYPE w3_notifications_total counter" in text
+    assert 'w3_notifications_total{subscription="blocks"} 2' in text
+    assert 'w3_queue_depth{connection="wss://node"} 3' in text
+    assert 'w3_callback_duration_seconds_bucket{action="print",le="0.01"} 0' in text
+    assert 'w3_callback_duration_seconds_bucket{action="print",le="0.025"} 1' in text
+    assert 'w3_callback_duration_seconds_count{action="print"} 1' in text
+
+
+def test_summarize_computes_rates() -> None:
+    metrics = Metrics()
+    last_counts: dict = {}
+    metrics.inc("w3_notifications_total", 10, subscription="blocks")
+    assert "blocks: 1.00/s" in summarize(metrics, last_counts, 10)
+    metrics.inc("w3_notifications_total", 5, subscription="blocks")
+    assert "blocks: 0.50/s" in summarize(metrics, last_counts, 10)
@@ -0,0 +1,130 @@
+import multiprocessing
+import os
+from typing import Any, List
+
+import pytest
+
+from web3core.helpers.nonce import NonceManager, is_nonce_taken_error
+
+ALICE = "0x0c2010dc4736bab060740D3968cf1dDF86196D81"
+
+
+class FakeEth:
+    def __init__(self, pending: int) -> None:
+        self.pending = pending
+        self.requests = 0
+
+    def get_transaction_count(self, address: str, block: str) -> int:
+        assert block == "pending"
+        self.requests += 1
+        return self.pending
+
+
+class FakeW3:
+    def __init__(self, pending: int = 0) -> None:
+        self.eth = FakeEth(pending)
+
+
+def make_manager(tmp_path: Any, pending: int = 0, **kwargs: Any) -> NonceManager:
+    return NonceManager(FakeW3(pending), "eth", ALICE, str(tmp_path), **kwargs)  # type: ignore
+
+
+def test_reserve_is_sequential(tmp_path: Any) -> None:
+    manager = make_manager(tmp_path, pending=5)
+    assert [manager.reserve() for _ in range(3)] == [5, 6, 7]
+    # The local state is trusted while fresh
+    manager.w3.eth.pending = 10  # type: ignore
+    assert manager.reserve() == 8
+    assert manager.w3.eth.requests == 1  # type: ignore
+
+
+def test_released_nonces_fill_gaps(tmp_path: Any) -> None:
+    manager = make_manager(tmp_path, pending=5)
+    nonces = [manager.reserve() for _ in range(3)]
+    manager.release(nonces[1])
+    assert manager.reserve() == 6
+    assert manager.reserve() == 8
+    # Releasing the last nonce shrinks the sequence
+    manager.release(8)
+    assert manager.reserve() == 8
+
+
+def test_reserve_many(tmp_path: Any) -> None:
+    manager = make_manager(tmp_path, pending=5)
+    manager.reserve_many(3)
+    manager.release(6)
+    assert manager.reserve_many(3) == [6, 8, 9]
+    # Nonces below the minimum are skipped, even if released
+    manager.release(9)
+    assert manager.reserve_many(2, min_nonce=12) == [12, 13]
+    assert manager.reserve() == 14
+
+
+def test_use_handles_failures(tmp_path: Any) -> None:
+    manager = make_manager(tmp_path, pending=0)
+    with pytest.raises(ValueError):
+        with manager.use():
+            raise ValueError("insufficient funds")
+    assert manager.reserve() == 0  # released
+    # The nonce was taken by a tx sent elsewhere: restart from the
+    # pending nonce
+    manager.w3.eth.pending = 3  # type: ignore
+    with pytest.raises(ValueError):
+        with manager.use() as nonce:
+            assert nonce == 1
+            raise ValueError("nonce too low")
+    assert manager.reserve() == 3
+    # Failures reconcile the state with the pending nonce
+    manager.w3.eth.pending = 6  # type: ignore
+    manager.fail(4, ValueError("insufficient funds"))
+    assert manager.reserve() == 6
+
+
+def test_fail_when_the_node_is_down(tmp_path: Any) -> None:
+    manager = make_manager(tmp_path, pending=0)
+    manager.reserve_many(3)
+
+    def get_transaction_count(address: str, block: str) -> int:
+        raise ConnectionError("node is down")
+
+    manager.w3.eth.get_transaction_count = get_transaction_count  # type: ignore
+    manager.fail(1, ValueError("insufficient funds"))
+    assert manager.reserve() == 1
+    # Without a state to reset, the next reservation reconciles
+    manager.fail(3, ValueError("nonce too low"))
+    assert manager.read() is None
+
+
+def test_stale_state_is_discarded(tmp_path: Any) -> None:
+    manager = make_manager(tmp_path, pending=0, stale_after=0)
+    assert [manager.reserve() for _ in range(2)] == [0, 0]
+
+
+def test_is_nonce_taken_error() -> None:
+    assert is_nonce_taken_error(ValueError({"message": "nonce too low"}))
+    assert is_nonce_taken_error(ValueError("already known"))
+    assert is_nonce_taken_error(
+        ValueError("Nonce provided for the transaction is lower than the current nonce")
+    )
+    assert not is_nonce_taken_error(ValueError("insufficient funds for gas"))
+
+
+def reserve_in_process(tmp_path: str, queue: Any) -> None:
+    manager = make_manager(tmp_path, pending=0)
+    queue.put([manager.reserve() for _ in range(5)])
+
+
+def test_parallel_processes_get_distinct_nonces(tmp_path: Any) -> None:
+    queue: Any = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=reserve_in_process, args=(tmp_path, queue))
+        for _ in range(4)
+    ]
+    for p in processes:
+        p.start()
+    nonces: List[int] = []
+    for _ in processes:
+        nonces += queue.get(timeout=10)
+    for p in processes:
+        p.join()
+    assert sorted(nonces) == list(range(20))
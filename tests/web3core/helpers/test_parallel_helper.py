@@ -0,0 +1,66 @@
+import time
+from typing import Iterator, List
+
+import pytest
+
+from web3core.helpers.parallel import call_with_retry, iter_parallel
+
+
+class Flaky:
+    """Function that fails the given number of times before succeeding"""
+
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, x: int) -> int:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("flaky")
+        return x * 2
+
+
+def test_call_with_retry() -> None:
+    fn = Flaky(2)
+    assert call_with_retry(fn, 3, retries=2, backoff=0) == 6
+    assert fn.calls == 3
+    with pytest.raises(ConnectionError):
+        call_with_retry(Flaky(3), 3, retries=2, backoff=0)
+
+
+def test_call_with_retry_no_retry() -> None:
+    fn = Flaky(1)
+    with pytest.raises(ConnectionError):
+        call_with_retry(fn, 3, retries=2, backoff=0, no_retry=ConnectionError)
+    assert fn.calls == 1
+
+
+def test_iter_parallel_is_ordered() -> None:
+    def fn(x: int) -> int:
+        time.sleep(0.01 * (5 - x))  # earlier items complete later
+        if x == 2:
+            raise ValueError("two")
+        return x * 10
+
+    results = list(iter_parallel(fn, range(5), concurrency=5))
+    assert [(item, result) for item, result, _ in results] == [
+        (0, 0),
+        (1, 10),
+        (2, None),
+        (3, 30),
+        (4, 40),
+    ]
+    assert isinstance(results[2][2], ValueError)
+
+
+def test_iter_parallel_is_lazy() -> None:
+    consumed: List[int] = []
+
+    def items() -> Iterator[int]:
+        for i in range(100):
+            consumed.append(i)
+            yield i
+
+    iterator = iter_parallel(lambda x: x, items(), concurrency=2)
+    next(iterator)
+    assert len(consumed) < 100
@@ -0,0 +1,100 @@
+from typing import Any, Dict, List
+
+import pytest
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from web3core.helpers.receipts import ReceiptTracker, wait_for_receipt
+
+
+class FakeEth:
+    """Chain that advances by one block every `polls_per_block` reads of
+    the block number, and where each transaction is mined at a given block"""
+
+    def __init__(self, mined_at: Dict[str, int], polls_per_block: int = 1) -> None:
+        self.mined_at = mined_at
+        self.polls_per_block = polls_per_block
+        self.polls = 0
+        self.receipt_requests: List[str] = []
+
+    @property
+    def block_number(self) -> int:
+        self.polls += 1
+        return 100 + self.polls // self.polls_per_block
+
+    @property
+    def head(self) -> int:
+        return 100 + self.polls // self.polls_per_block
+
+    def get_transaction_receipt(self, hash: str) -> Any:
+        self.receipt_requests.append(hash)
+        block = self.mined_at.get(hash)
+        if block is None or block > self.head:
+            raise TransactionNotFound(hash)
+        return {"transactionHash": hash, "blockNumber": block, "status": 1}
+
+
+class FakeW3:
+    def __init__(self, mined_at: Dict[str, int], polls_per_block: int = 1) -> None:
+        self.eth = FakeEth(mined_at, polls_per_block)
+
+
+def test_track_many() -> None:
+    w3 = FakeW3({"0xa": 101, "0xb": 103, "0xc": 102})
+    tracker = ReceiptTracker(w3, ["0xa", "0xb", "0xc"], poll_interval=0.001)  # type: ignore
+    results = list(tracker.track())
+    # Yielded as soon as they are mined
+    assert [r["hash"] for r in results] == ["0xa", "0xc", "0xb"]
+    assert all(r["status"] == "success" for r in results)
+    assert all(r["confirmations"] == 1 for r in results)
+
+
+def test_confirmations() -> None:
+    w3 = FakeW3({"0xa": 101, "0xb": 102})
+    tracker = ReceiptTracker(w3, ["0xa", "0xb"], confirmations=3, poll_interval=0.001)  # type: ignore
+    results = list(tracker.track())
+    assert [r["hash"] for r in results] == ["0xa", "0xb"]
+    assert [r["confirmations"] for r in results] == [3, 3]
+    assert tracker.head == 104
+
+
+def test_receipts_fetched_once_per_block() -> None:
+    w3 = FakeW3({"0xa": 102}, polls_per_block=5)
+    wait_for_receipt(w3, "0xa", poll_interval=0.001)  # type: ignore
+    # Polled 10 times, but only three blocks were seen
+    assert w3.eth.polls == 10
+    assert len(w3.eth.receipt_requests) == 3
+
+
+def test_timeout() -> None:
+    w3 = FakeW3({"0xa": 101})
+    tracker = ReceiptTracker(w3, ["0xa", "0xb"], timeout=0.05, poll_interval=0.001)  # type: ignore
+    results = {r["hash"]: r for r in tracker.track()}
+    assert results["0xa"]["status"] == "success"
+    assert results["0xb"]["status"] == "timeout"
+    assert results["0xb"]["receipt"] is None
+    with pytest.raises(TimeExhausted):
+        wait_for_receipt(w3, "0xb", timeout=0.05, poll_interval=0.001)  # type: ignore
+
+
+def test_timeout_of_each_transaction() -> None:
+    w3 = FakeW3({})
+    tracker = ReceiptTracker(w3, [], timeout=10, poll_interval=0.001)  # type: ignore
+    tracker.add("0xa", timeout=0.01)
+    [result] = tracker.track()
+    assert result["status"] == "timeout"
+    assert result["error"] == "Transaction 0xa is not in the chain after 0.01 seconds"
+
+
+def test_unconfirmed() -> None:
+    w3 = FakeW3({"0xa": 100}, polls_per_block=1000)
+    tracker = ReceiptTracker(w3, ["0xa"], confirmations=3, timeout=0.05, poll_interval=0.001)  # type: ignore
+    [result] = tracker.track()
+    # Mined, but short of confirmations: the last receipt is kept
+    assert result["status"] == "unconfirmed"
+    assert result["receipt"]["blockNumber"] == 100  # type: ignore
+    assert result["confirmations"] == 1
+    assert (
+        result["error"] == "Transaction 0xa has 1 of 3 confirmations after 0.05 seconds"
+    )
+    with pytest.raises(TimeExhausted):
+        wait_for_receipt(w3, "0xa", confirmations=3, timeout=0.05, poll_interval=0.001)  # type: ignore
@@ -0,0 +1,101 @@
+import os
+from typing import Any, List
+
+from web3core.helpers.rpc_cache import (
+    RpcCache,
+    construct_rpc_cache_middleware,
+    is_dev_rpc,
+)
+
+HASH = "0x" + "aa" * 32
+
+
+class FakeNode:
+    """Answer requests with a fixed head, logging them"""
+
+    def __init__(self, head: int = 100) -> None:
+        self.head = head
+        self.requests: List[str] = []
+
+    def __call__(self, method: str, params: Any) -> Any:
+        self.requests.append(method)
+        if method == "eth_blockNumber":
+            result: Any = hex(self.head)
+        elif method == "eth_getTransactionReceipt":
+            result = {"transactionHash": params[0], "blockNumber": "0x1"}
+        elif method == "eth_getBalance":
+            result = "0x10"
+        else:
+            result = None
+        return {"jsonrpc": "2.0", "id": 1, "result": result}
+
+
+def make_request(node: FakeNode, cache: RpcCache) -> Any:
+    return construct_rpc_cache_middleware(cache, 1, depth=10)(node, None)  # type: ignore
+
+
+def test_immutable_responses_are_cached(tmp_path: Any) -> None:
+    node = FakeNode()
+    request = make_request(node, RpcCache(os.path.join(tmp_path, "rpc.sqlite")))
+    for _ in range(2):
+        assert (
+            request("eth_getTransactionReceipt", [HASH])["result"]["blockNumber"]
+            == "0x1"
+        )
+        assert request("eth_getBalance", ["0x1", "0x5"])["result"] == "0x10"
+    assert node.requests == [
+        "eth_getTransactionReceipt",
+        "eth_blockNumber",
+        "eth_getBalance",
+    ]
+    # A new process finds the responses on disk
+    node = FakeNode()
+    request = make_request(node, RpcCache(os.path.join(tmp_path, "rpc.sqlite")))
+    request("eth_getTransactionReceipt", [HASH])
+    assert node.requests == []
+
+
+def test_mutable_responses_are_not_cached(tmp_path: Any) -> None:
+    node = FakeNode(head=5)
+    request = make_request(node, RpcCache(os.path.join(tmp_path, "rpc.sqlite")))
+    for _ in range(2):
+        request("eth_getBalance", ["0x1", "latest"])
+        request("eth_getBalance", ["0x1", "0x1"])  # too close to the head
+        request("eth_getTransactionByHash", [HASH])  # null result
+        request("eth_blockNumber", [])
+    assert node.requests.count("eth_getBalance") == 4
+    assert node.requests.count("eth_getTransactionByHash") == 2
+
+
+def test_eviction(tmp_path: Any) -> None:
+    cache = RpcCache(os.path.join(tmp_path, "rpc.sqlite"), max_size=1000)
+    for i in range(20):
+        cache.set(1, "eth_getBlockByHash", [f"0x{i}"], "x" * 100)
+    assert cache.get_size() <= 1000
+    assert cache.get(1, "eth_getBlockByHash", ["0x19"]) == "x" * 100
+    assert cache.get(1, "eth_getBlockByHash", ["0x0"]) is None
+    assert cache.get(2, "eth_getBlockByHash", ["0x19"]) is None
+
+
+def test_hits_touch_old_results_only(tmp_path: Any) -> None:
+    cache = RpcCache(os.path.join(tmp_path, "rpc.sqlite"), touch_interval=3600)
+    cache.set(1, "eth_getBlockByHash", ["0x1"], "a")
+    cache.set(1, "eth_getBlockByHash", ["0x2"], "b")
+    cache.db.execute("UPDATE responses SET accessed_at = 0 WHERE result = '\"b\"'")
+    get_accessed_at = lambda: dict(
+        cache.db.execute("SELECT result, accessed_at FROM responses").fetchall()
+    )
+    before = get_accessed_at()
+    assert cache.get(1, "eth_getBlockByHash", ["0x1"]) == "a"
+    assert cache.get(1, "eth_getBlockByHash", ["0x2"]) == "b"
+    after = get_accessed_at()
+    assert after['"a"'] == before['"a"']
+    assert after['"b"'] > 0
+
+
+def test_dev_rpcs() -> None:
+    assert is_dev_rpc(31337, "https://rpc.example.com")
+    assert is_dev_rpc(1, "http://127.0.0.1:8545")
+    assert is_dev_rpc(1, "ws://localhost:8546")
+    assert not is_dev_rpc(1, "https://rpc.example.com")
+    assert not is_dev_rpc(1)
@@ -0,0 +1,109 @@
+from typing import Any, Dict, List, Tuple
+
+from web3.exceptions import TransactionNotFound
+
+from web3core.helpers.stuck import StuckTxWatcher
+
+SENDER = "0x0c2010dc4736bab060740D3968cf1dDF86196D81"
+
+
+class FakeEth:
+    """Chain that mines a new block at each call to block_number"""
+
+    chain_id = 1
+
+    def __init__(self) -> None:
+        self.head = 100
+        self.receipts: Dict[str, Any] = {}
+        self.nonce = 0
+
+    @property
+    def block_number(self) -> int:
+        self.head += 1
+        return self.head
+
+    def get_transaction_receipt(self, hash: str) -> Any:
+        if hash not in self.receipts:
+            raise TransactionNotFound(f"Tx {hash} not mined")
+        return self.receipts[hash]
+
+    def get_transaction_count(self, address: str, block: str) -> int:
+        return self.nonce
+
+
+class FakeW3:
+    def __init__(self) -> None:
+        self.eth = FakeEth()
+
+
+def make_tx(nonce: int) -> Dict[str, Any]:
+    return {
+        "hash": f"0x{nonce:02x}",
+        "from": SENDER,
+        "nonce": nonce,
+        "maxFeePerGas": 100,
+        "maxPriorityFeePerGas": 10,
+    }
+
+
+def test_watch() -> None:
+    w3 = FakeW3()
+    w3.eth.receipts["0x00"] = {"status": 1, "gasUsed": 21000, "blockNumber": 101}
+    w3.eth.receipts["0x01"] = {"status": 0, "gasUsed": 30000, "blockNumber": 101}
+    watcher = StuckTxWatcher(w3, [make_tx(0), make_tx(1)], poll_interval=0)  # type: ignore
+    done = list(watcher.watch())
+    assert [w["status"] for w in done] == ["success", "reverted"]
+    assert all(w["bumps"] == 0 for w in done)
+
+
+def test_watch_replaces_stuck_txs() -> None:
+    w3 = FakeW3()
+    replaced: List[Dict[str, Any]] = []
+
+    def replace(tx: Dict[str, Any]) -> Tuple[str, Any]:
+        replaced.append(tx)
+        hash = f"0x{tx['nonce']:02x}{len(replaced):02x}"
+        # The second replacement gets mined
+        if len(replaced) == 2:
+            w3.eth.receipts[hash] = {"status": 1, "gasUsed": 21000}
+        return hash, tx | {"maxFeePerGas": tx["maxFeePerGas"] * 2}
+
+    watcher = StuckTxWatcher(
+        w3, [make_tx(0)], stuck_blocks=2, replace=replace, poll_interval=0  # type: ignore
+    )
+    done = list(watcher.watch())
+    assert len(done) == 1
+    assert done[0]["status"] == "success"
+    assert done[0]["original"] == "0x00"
+    assert done[0]["hash"] == "0x0002"
+    assert done[0]["hashes"] == ["0x00", "0x0001", "0x0002"]
+    assert done[0]["bumps"] == 2
+    # Each replacement bumps the last version
+    assert [tx["maxFeePerGas"] for tx in replaced] == [100, 200]
+
+
+def test_watch_max_bumps_and_dropped() -> None:
+    w3 = FakeW3()
+    n_replaced = []
+
+    def replace(tx: Dict[str, Any]) -> Tuple[str, Any]:
+        n_replaced.append(1)
+        if len(n_replaced) == 3:
+            # Someone else used the nonce
+            w3.eth.nonce = 1
+        return f"0x{len(n_replaced):04x}", tx
+
+    watcher = StuckTxWatcher(
+        w3, [make_tx(0)], stuck_blocks=1, max_bumps=3, replace=replace, poll_interval=0  # type: ignore
+    )
+    done = list(watcher.watch())
+    assert len(n_replaced) == 3
+    assert done[0]["status"] == "dropped"
+    assert "Nonce 0" in done[0]["error"]
+
+
+def test_watch_timeout() -> None:
+    watcher = StuckTxWatcher(FakeW3(), [make_tx(0)], timeout=0, poll_interval=0)  # type: ignore
+    done = list(watcher.watch())
+    assert done[0]["status"] == "timeout"
+    assert done[0]["bumps"] == 0
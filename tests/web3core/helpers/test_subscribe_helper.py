@@ -0,0 +1,242 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+
+import pytest
+import websockets
+from websockets.server import WebSocketServerProtocol
+
+from web3core.exceptions import Web3CoreError
+from web3core.helpers.subscribe import (
+    Subscription,
+    get_connection_label,
+    run_subscriptions,
+    shard_subscription,
+)
+
+
+async def run_fake_node(
+    notifications: Dict[str, List[Any]], connections: List[int]
+) -> websockets.WebSocketServer:
+    """Start a websocket server that acknowledges each eth_subscribe request
+    and then sends the given notifications, indexed by subscription type"""
+
+    async def handler(ws: WebSocketServerProtocol) -> None:
+        connections.append(1)
+        async for message in ws:
+            request = json.loads(message)
+            type = request["params"][0]
+            subscription_id = f"0x{request['id']:x}"
+            await ws.send(
+                json.dumps(
+                    {"jsonrpc": "2.0", "id": request["id"], "result": subscription_id}
+                )
+            )
+            for data in notifications[type]:
+                await ws.send(
+                    json.dumps(
+                        {
+                            "jsonrpc": "2.0",
+                            "method": "eth_subscription",
+                            "params": {"subscription": subscription_id, "result": data},
+                        }
+                    )
+                )
+
+    return await websockets.serve(handler, "127.0.0.1", 0)
+
+
+def test_run_subscriptions_multiplexes_over_one_connection() -> None:
+    notifications = {
+        "newHeads": [{"number": "0x1"}, {"number": "0x2"}],
+        "logs": [{"logIndex": "0x0"}],
+    }
+    received: Dict[str, List[Any]] = {"newHeads": [], "logs": []}
+    connections: List[int] = []
+
+    async def main() -> None:
+        server = await run_fake_node(notifications, connections)
+        port = server.sockets[0].getsockname()[1]
+        done = asyncio.Event()
+
+        async def callback(data: Any, type: Any, tx: Any) -> None:
+            received[type].append(data)
+            if sum(len(v) for v in received.values()) == 3:
+                done.set()
+
+        runner = asyncio.create_task(
+            run_subscriptions(
+                [
+                    Subscription(f"ws://127.0.0.1:{port}", "newHeads", callback),
+                    Subscription(f"ws://127.0.0.1:{port}", "logs", callback),
+                ]
+            )
+        )
+        await asyncio.wait_for(done.wait(), timeout=5)
+        runner.cancel()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(main())
+    assert received == notifications
+    assert len(connections) == 1
+
+
+def test_connection_label() -> None:
+    # No API key in the label, and one label per connection to the RPC
+    assert get_connection_label("wss://node.io/v3/KEY") == "wss://node.io #0"
+    assert get_connection_label("wss://node.io/v3/KEY", 1) == "wss://node.io #1"
+
+
+def test_subscription_params() -> None:
+    async def callback(data: Any, type: Any, tx: Any) -> None:
+        pass
+
+    sub = Subscription(
+        "ws://localhost", "logs", callback, logs_addresses=["0x1"], logs_topics=["0x2"]
+    )
+    assert sub.get_params() == ["logs", {"address": ["0x1"], "topics": ["0x2"]}]
+    assert Subscription("ws://localhost", "newHeads", callback).get_params() == [
+        "newHeads"
+    ]
+
+
+ALICE = "0x0c2010dc4736bab060740D3968cf1dDF86196D81"
+BOB = "0xde0B295669a9FD93d5F28D9Ec85E40f4cb697BAe"
+
+
+def test_full_txs_are_filtered_without_fetching() -> None:
+    async def callback(data: Any, type: Any, tx: Any) -> None:
+        received.append(tx["hash"])
+
+    received: List[str] = []
+    sub = Subscription(
+        "ws://localhost",
+        "newPendingTransactions",
+        callback,
+        client=FakeClient({}),  # type: ignore
+        tx_from=[ALICE.lower()],
+        full_txs=True,
+    )
+    assert sub.get_params() == ["newPendingTransactions", True]
+
+    async def main() -> None:
+        await sub.process({"hash": "0x1", "from": ALICE.lower()})
+        await sub.process({"hash": "0x2", "from": BOB.lower()})
+
+    asyncio.run(main())
+    assert received == ["0x1"]
+    # Nodes that do not support full transactions send hashes anyway
+    with pytest.raises(Web3CoreError):
+        Subscription(
+            "ws://localhost",
+            "newPendingTransactions",
+            callback,
+            tx_from=[ALICE],
+            full_txs=True,
+        )
+
+
+class FakeClient:
+    """Client returning transactions from a dictionary, counting fetches"""
+
+    def __init__(self, txs: Dict[str, Any]) -> None:
+        self.txs = txs
+        self.fetches: List[str] = []
+
+    def get_tx_from_notification(self, type: Any, data: Any, **kwargs: Any) -> Any:
+        tx_hash = data if type == "newPendingTransactions" else data["transactionHash"]
+        self.fetches.append(tx_hash)
+        return self.txs[tx_hash]
+
+
+def test_pending_hashes_are_fetched_once() -> None:
+    async def callback(data: Any, type: Any, tx: Any) -> None:
+        received.append(data)
+
+    received: List[str] = []
+    client = FakeClient({"0x1": {"from": ALICE}, "0x2": {"from": BOB}})
+    sub = Subscription(
+        "ws://localhost",
+        "newPendingTransactions",
+        callback,
+        client=client,  # type: ignore
+        tx_from=[ALICE],
+        tx_fetch_rate=100,
+    )
+
+    async def main() -> None:
+        await asyncio.gather(*[sub.process(h) for h in ["0x1", "0x2", "0x1", "0x1"]])
+
+    asyncio.run(main())
+    assert received == ["0x1"]
+    assert sorted(client.fetches) == ["0x1", "0x2"]
+
+
+def test_logs_of_the_same_tx_share_one_fetch() -> None:
+    async def callback(data: Any, type: Any, tx: Any) -> None:
+        received.append(data["logIndex"])
+
+    received: List[str] = []
+    client = FakeClient({"0x1": {"from": ALICE}})
+    sub = Subscription(
+        "ws://localhost", "logs", callback, client=client, tx_from=[ALICE]  # type: ignore
+    )
+    logs = [{"transactionHash": "0x1", "logIndex": f"0x{i}"} for i in range(3)]
+
+    async def main() -> None:
+        await asyncio.gather(*[sub.process(log) for log in logs])
+
+    asyncio.run(main())
+    assert sorted(received) == ["0x0", "0x1", "0x2"]
+    assert client.fetches == ["0x1"]
+
+
+def test_shard_subscription_merges_logs() -> None:
+    async def callback(data: Any, type: Any, tx: Any) -> None:
+        received.append((data["blockNumber"], data["logIndex"]))
+
+    received: List[Any] = []
+    addresses = [f"0x{i:040x}" for i in range(5)]
+    sub = Subscription("ws://localhost", "logs", callback, logs_addresses=addresses)
+    shards = shard_subscription(sub, max_size=2, connections=2, merge_delay=0.05)
+    assert [s.logs_addresses for s in shards] == [
+        addresses[0:2],
+        addresses[2:4],
+        addresses[4:5],
+    ]
+    assert [s.connection for s in shards] == [0, 1, 0]
+    assert shard_subscription(sub, max_size=5) == [sub]
+
+    def log(block: int, index: int) -> Dict[str, Any]:
+        return {
+            "blockHash": f"0x{block}",
+            "blockNumber": hex(block),
+            "transactionHash": "0x1",
+            "logIndex": hex(index),
+        }
+
+    async def main() -> None:
+        await shards[1].process(log(2, 0))
+        await shards[0].process(log(1, 1))
+        await shards[2].process(log(1, 0))
+        await shards[0].process(log(1, 1))  # duplicate
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert received == [("0x1", "0x0"), ("0x1", "0x1"), ("0x2", "0x0")]
+
+
+def test_shard_subscription_by_topic0() -> None:
+    async def callback(data: Any, type: Any, tx: Any) -> None:
+        pass
+
+    topics = [f"0x{i:064x}" for i in range(3)]
+    sub = Subscription(
+        "ws://localhost", "logs", callback, logs_topics=[topics, None]  # type: ignore
+    )
+    shards = shard_subscription(sub, max_size=2)
+    assert [s.logs_topics for s in shards] == [[topics[0:2], None], [topics[2:3], None]]
+    # A single topic0 is not split
+    sub.logs_topics = [topics[0], topics[1]]
+    assert shard_subscription(sub, max_size=1) == [sub]
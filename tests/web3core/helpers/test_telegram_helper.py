@@ -0,0 +1,50 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from web3core.helpers.telegram import Digest, get_chat_limiter
+
+
+def test_digest_flushes_by_count() -> None:
+    sent: List[str] = []
+    digest = Digest(sent.append, count=2)
+
+    async def main() -> None:
+        for msg in ["a", "b", "c"]:
+            await digest.add(msg)
+
+    asyncio.run(main())
+    assert sent == ["a\n\nb"]
+    assert digest.messages == ["c"]
+
+
+def test_digest_flushes_by_window() -> None:
+    sent: List[str] = []
+    digest = Digest(sent.append, window=0.05)
+
+    async def main() -> None:
+        await digest.add("a")
+        await digest.add("b")
+        assert sent == []
+        await asyncio.sleep(0.2)
+
+    asyncio.run(main())
+    assert sent == ["a\n\nb"]
+
+
+def test_digest_splits_long_messages() -> None:
+    digest = Digest(print, max_length=5)
+    assert digest.join(["ab", "cd", "efghij"]) == ["ab", "cd", "efghi"]
+    digest = Digest(print, separator="|", max_length=5)
+    assert digest.join(["ab", "cd", "e"]) == ["ab|cd", "e"]
+
+
+def test_chat_limiter_is_shared_among_threads() -> None:
+    with ThreadPoolExecutor(8) as executor:
+        limiters = list(
+            executor.map(lambda _: get_chat_limiter("123", 0.001), range(8))
+        )
+        acquired = list(executor.map(lambda l: l.try_acquire(), limiters * 4))
+    assert all(limiter is limiters[0] for limiter in limiters)
+    # The bucket holds one token, which is refilled in ~17 minutes
+    assert acquired.count(True) == 1
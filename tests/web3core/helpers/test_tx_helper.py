@@ -0,0 +1,112 @@
+from typing import Any
+
+from eth_account import Account
+from web3.types import TxParams
+
+from web3core.helpers.tx import (
+    build_replacement_tx,
+    build_replay_tx,
+    bump_fees,
+    sign_contract_txs,
+)
+
+PRIVATE_KEY = "0x" + "ab" * 32
+POOL = "0x1111111111111111111111111111111111111111"
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.n_base_txs = 0
+
+    def build_base_tx(self, **kwargs: Any) -> TxParams:
+        self.n_base_txs += 1
+        return {
+            "chainId": 1,
+            "from": Account.from_key(PRIVATE_KEY).address,
+            "type": "0x2",
+            "maxFeePerGas": 100,
+            "maxPriorityFeePerGas": 10,
+            "nonce": kwargs["nonce"],
+            "gas": kwargs["gas_limit"],
+        }
+
+    def sign_tx(self, tx: TxParams) -> Any:
+        return Account.sign_transaction(tx, PRIVATE_KEY)
+
+
+class FakeFunction:
+    def __init__(self, fn_name: str) -> None:
+        self.fn_name = fn_name
+
+    def build_transaction(self, tx: TxParams) -> TxParams:
+        return tx | {"to": POOL, "data": "0x1234", "value": 0}
+
+
+def test_bump_fees() -> None:
+    assert bump_fees({"maxFeePerGas": 100, "maxPriorityFeePerGas": 10}, 1.5) == {
+        "maxFeePerGas": 150,
+        "maxPriorityFeePerGas": 15,
+    }
+    assert bump_fees({"gasPrice": 100, "gas": 21000}, 2) == {"gasPrice": 200}
+
+
+def test_sign_contract_txs() -> None:
+    client = FakeClient()
+    functions = [FakeFunction("repayBorrow")] + [FakeFunction("redeemUnderlying")] * 3
+    txs = sign_contract_txs(client, functions, [5, 6, 7, 8], 300000, fee_bump=2)  # type: ignore
+    # Fees are fetched only once
+    assert client.n_base_txs == 1
+    assert [tx["nonce"] for tx in txs] == [5, 6, 7, 8]
+    assert [tx["label"] for tx in txs] == ["repayBorrow"] + ["redeemUnderlying"] * 3
+    assert all(tx["gas"] == 300000 for tx in txs)
+    assert [tx["max_priority_fee_per_gas"] for tx in txs] == [10, 20, 40, 80]
+    assert len(set(tx["hash"] for tx in txs)) == 4
+    # The raw transaction can be decoded back
+    assert Account.recover_transaction(txs[0]["raw"]) == txs[0]["sender"]
+
+
+ORIGINAL_TX = {
+    "hash": "0x" + "01" * 32,
+    "from": "0x0c2010dc4736bab060740D3968cf1dDF86196D81",
+    "to": POOL,
+    "input": "0x1234",
+    "value": 5,
+    "type": 2,
+    "nonce": 7,
+    "gas": 100000,
+    "maxFeePerGas": 200,
+    "maxPriorityFeePerGas": 10,
+    "gasPrice": 150,
+}
+
+
+def test_build_replay_tx() -> None:
+    base_tx: TxParams = {"nonce": 9, "maxFeePerGas": 50, "maxPriorityFeePerGas": 1}
+    tx = build_replay_tx(ORIGINAL_TX, base_tx)
+    assert tx["nonce"] == 9
+    assert tx["to"] == POOL
+    assert tx["data"] == "0x1234"
+    assert tx["value"] == 5
+    assert tx["gas"] == 120000
+    assert tx["maxFeePerGas"] == 50
+    # Fees relative to the original tx; its gasPrice is ignored
+    tx = build_replay_tx(ORIGINAL_TX, base_tx, fee_multiplier=2, gas_multiplier=1)
+    assert tx["gas"] == 100000
+    assert tx["maxFeePerGas"] == 400
+    assert tx["maxPriorityFeePerGas"] == 20
+    assert "gasPrice" not in tx
+
+
+def test_build_replacement_tx() -> None:
+    base_tx: TxParams = {"nonce": 9, "maxFeePerGas": 300, "maxPriorityFeePerGas": 1}
+    tx = build_replacement_tx(ORIGINAL_TX, base_tx, fee_bump=1.5)
+    assert tx["nonce"] == 7
+    assert tx["gas"] == 100000
+    # Each fee is the highest between the bumped and the current one
+    assert tx["maxFeePerGas"] == 300
+    assert tx["maxPriorityFeePerGas"] == 15
+    # Legacy transactions are replaced with legacy transactions
+    legacy_tx = {k: v for k, v in ORIGINAL_TX.items() if not k.startswith("max")}
+    tx = build_replacement_tx(legacy_tx | {"type": 0}, base_tx, fee_bump=1.5)
+    assert tx["gasPrice"] == 225
+    assert "type" not in tx and "maxFeePerGas" not in tx